@@ -1,15 +1,20 @@
 import re
 from functools import partial
 
-from azure.mgmt.network import models
 from msrestazure.azure_exceptions import CloudError
-from netaddr import IPNetwork
 
 from cloudshell.cp.azure.exceptions import (
     MultipleResourceFoundException,
     NetworkNotFoundException,
     ResourceNotFoundException,
 )
+from cloudshell.cp.azure.utils.lazy_import import LazyModule
+from cloudshell.cp.azure.utils.vnet_address_index import (
+    VirtualNetworkAddressIndexCache,
+)
+from cloudshell.cp.azure.utils.vnet_subnets_writer import VirtualNetworkSubnetsWriter
+
+models = LazyModule("azure.mgmt.network.models")
 
 
 class NetworkActions:
@@ -32,6 +37,22 @@ class NetworkActions:
         self._azure_client = azure_client
         self._logger = logger
 
+    @property
+    def subscription_id(self):
+        """Subscription of the managed networks.
+
+        :rtype: str
+        """
+        return self._azure_client.cache_namespace
+
+    @property
+    def credentials_id(self):
+        """Identity of the credentials used to manage the networks.
+
+        :rtype: tuple[str, str, str]
+        """
+        return self._azure_client.credentials_id
+
     def _get_virtual_network_by_tag(self, virtual_networks, tag_key, tag_value):
         """Get vNET from Azure by tag.
 
@@ -68,15 +89,19 @@ class NetworkActions:
         return True
 
     def get_mgmt_virtual_network(
-        self, resource_group_name: str, mgmt_vnet_name: str = None
+        self, resource_group_name: str, mgmt_vnet_name: str = None, fresh: bool = False
     ):
-        """Get management vNET from the management resource group."""
+        """Get management vNET from the management resource group.
+
+        :param fresh: don't use the cached vNet
+        """
         if mgmt_vnet_name:
             self._logger.info(f"Getting management vNet by name '{mgmt_vnet_name}'")
 
             return self._azure_client.get_virtual_network(
                 virtual_network_name=mgmt_vnet_name,
                 resource_group_name=resource_group_name,
+                fresh=fresh,
             )
 
         # deprecated
@@ -95,15 +120,22 @@ class NetworkActions:
         )
 
     def get_sandbox_virtual_network(
-        self, resource_group_name: str, sandbox_vnet_name: str = None
+        self,
+        resource_group_name: str,
+        sandbox_vnet_name: str = None,
+        fresh: bool = False,
     ):
-        """Get sandbox vNET from the management resource group."""
+        """Get sandbox vNET from the management resource group.
+
+        :param fresh: don't use the cached vNet
+        """
         if sandbox_vnet_name:
             self._logger.info(f"Getting sandbox vNet by name '{sandbox_vnet_name}'")
 
             return self._azure_client.get_virtual_network(
                 virtual_network_name=sandbox_vnet_name,
                 resource_group_name=resource_group_name,
+                fresh=fresh,
             )
 
         # deprecated
@@ -126,17 +158,22 @@ class NetworkActions:
         resource_group_name: str,
         mgmt_resource_group_name: str,
         sandbox_vnet_name: str,
+        fresh: bool = False,
     ):
-        """Get all subnets from the Sandbox vNET for a specific Resource Group."""
+        """Get all subnets from the Sandbox vNET for a specific Resource Group.
+
+        :param fresh: don't use the cached vNet
+        """
         sandbox_vnet = self.get_sandbox_virtual_network(
             resource_group_name=mgmt_resource_group_name,
             sandbox_vnet_name=sandbox_vnet_name,
+            fresh=fresh,
+        )
+        return (
+            VirtualNetworkAddressIndexCache()
+            .get_index(sandbox_vnet)
+            .get_reservation_subnets(resource_group_name)
         )
-        return [
-            subnet
-            for subnet in sandbox_vnet.subnets
-            if resource_group_name in subnet.name
-        ]
 
     def find_sandbox_subnet_by_name(self, sandbox_subnets, name_reqexp):
         """Get sandbox subnet by its regexp name.
@@ -181,14 +218,25 @@ class NetworkActions:
             f"Creating subnet {subnet_name} under: {resource_group_name}/{vnet.name}..."
         )
 
+        index = VirtualNetworkAddressIndexCache().get_index(vnet)
+
+        if any(
+            subnet.name.lower() != subnet_name.lower()
+            for subnet in index.find_overlapping(cidr)
+        ):
+            self._cleanup_stale_subnet(
+                vnet=vnet, subnet_cidr=cidr, resource_group_name=resource_group_name
+            )
+
         create_subnet_cmd = partial(
-            self._azure_client.create_subnet,
-            subnet_name=subnet_name,
-            cidr=cidr,
+            self._write_subnet,
             vnet_name=vnet.name,
             resource_group_name=resource_group_name,
-            network_security_group=network_security_group,
-            wait_for_result=True,
+            subnet=models.Subnet(
+                name=subnet_name,
+                address_prefix=cidr,
+                network_security_group=network_security_group,
+            ),
         )
 
         try:
@@ -219,13 +267,26 @@ class NetworkActions:
         self._logger.info(
             f"Updating subnet {subnet_name} under: {resource_group_name}/{vnet_name}..."
         )
-        self._azure_client.update_subnet(
-            subnet_name=subnet_name,
+        self._write_subnet(
+            vnet_name=vnet_name, resource_group_name=resource_group_name, subnet=subnet
+        )
+
+    def _write_subnet(self, vnet_name, resource_group_name, subnet):
+        """Create or update subnet through the vNet write queue.
+
+        :param str vnet_name:
+        :param str resource_group_name:
+        :param subnet:
+        :return:
+        """
+        return VirtualNetworkSubnetsWriter().write_subnets(
+            network_actions=self,
             vnet_name=vnet_name,
             resource_group_name=resource_group_name,
-            subnet=subnet,
-            wait_for_result=True,
-        )
+            subnets=[subnet],
+            logger=self._logger,
+            replace_overlapping=False,
+        )[0]
 
     def get_subnet(self, subnet_name, vnet_name, resource_group_name):
         """Get subnet.
@@ -255,10 +316,12 @@ class NetworkActions:
         self._logger.info(
             f"Deleting subnet {subnet_name} under: {resource_group_name}/{vnet_name}..."
         )
-        self._azure_client.delete_subnet(
-            subnet_name=subnet_name,
+        VirtualNetworkSubnetsWriter().delete_subnets(
+            network_actions=self,
             vnet_name=vnet_name,
             resource_group_name=resource_group_name,
+            subnet_names=[subnet_name],
+            logger=self._logger,
         )
 
     def create_sandbox_subnet(
@@ -289,6 +352,63 @@ class NetworkActions:
             network_security_group=network_security_group,
         )
 
+    def create_sandbox_subnets(
+        self,
+        cidrs,
+        vnet,
+        resource_group_name,
+        mgmt_resource_group_name,
+        network_security_group,
+    ):
+        """Create Sandbox subnets with a single vNet update.
+
+        :param list[str] cidrs:
+        :param vnet:
+        :param str resource_group_name:
+        :param str mgmt_resource_group_name:
+        :param network_security_group:
+        :return: created subnets in the order of the CIDRs
+        :rtype: list[Subnet]
+        """
+        subnets = [
+            models.Subnet(
+                name=self.prepare_sandbox_subnet_name(
+                    resource_group_name=resource_group_name, cidr=cidr
+                ),
+                address_prefix=cidr,
+                network_security_group=network_security_group,
+            )
+            for cidr in cidrs
+        ]
+        self._logger.info(
+            f"Creating subnets {[subnet.name for subnet in subnets]} under: "
+            f"{mgmt_resource_group_name}/{vnet.name}..."
+        )
+
+        return VirtualNetworkSubnetsWriter().write_subnets(
+            network_actions=self,
+            vnet_name=vnet.name,
+            resource_group_name=mgmt_resource_group_name,
+            subnets=subnets,
+            logger=self._logger,
+        )
+
+    def update_virtual_network(self, vnet, resource_group_name, etag=None):
+        """Update virtual network.
+
+        :param vnet:
+        :param str resource_group_name:
+        :param str etag:
+        :return:
+        """
+        self._logger.info(f"Updating virtual network {vnet.name}...")
+        return self._azure_client.update_virtual_network(
+            virtual_network_name=vnet.name,
+            virtual_network=vnet,
+            resource_group_name=resource_group_name,
+            etag=etag,
+        )
+
     def get_sandbox_subnet(
         self, cidr, vnet_name, resource_group_name, mgmt_resource_group_name
     ):
@@ -335,12 +455,10 @@ class NetworkActions:
         :param VirtualNetwork vnet:
         :param str subnet_cidr:
         """
-        stale_network = IPNetwork(subnet_cidr)
+        index = VirtualNetworkAddressIndexCache().get_index(vnet)
 
-        for subnet in vnet.subnets:
-            subnet_network = IPNetwork(subnet.address_prefix)
-            if any([stale_network in subnet_network, subnet_network in stale_network]):
-                return subnet
+        for subnet in index.find_overlapping(subnet_cidr):
+            return subnet
 
         raise Exception(f"Unable to find stale subnet for CIDR {subnet_cidr}")
 
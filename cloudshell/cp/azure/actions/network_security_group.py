@@ -5,6 +5,11 @@ from azure.mgmt.network.models import (
     SecurityRuleProtocol,
 )
 
+from cloudshell.cp.azure.utils.nsg_rules_priority_generator import (
+    NSGRulesPriorityAllocatorsCache,
+)
+from cloudshell.cp.azure.utils.nsg_rules_writer import NSGRulesWriter
+
 
 class NetworkSecurityGroupActions:
     VM_NSG_NAME_TPL = "NSG_{vm_name}"
@@ -24,6 +29,22 @@ class NetworkSecurityGroupActions:
         self._azure_client = azure_client
         self._logger = logger
 
+    @property
+    def subscription_id(self):
+        """Subscription of the managed NSGs.
+
+        :rtype: str
+        """
+        return self._azure_client.cache_namespace
+
+    @property
+    def credentials_id(self):
+        """Identity of the credentials used to manage the NSGs.
+
+        :rtype: tuple[str, str, str]
+        """
+        return self._azure_client.credentials_id
+
     def prepare_vm_nsg_name(self, vm_name):
         """Prepare name for the VM Network Security Group.
 
@@ -33,7 +54,7 @@ class NetworkSecurityGroupActions:
         return self.VM_NSG_NAME_TPL.format(vm_name=vm_name)
 
     def create_network_security_group(
-        self, nsg_name, resource_group_name, region, tags
+        self, nsg_name, resource_group_name, region, tags, security_rules=None
     ):
         """Create Network Security Group.
 
@@ -41,6 +62,7 @@ class NetworkSecurityGroupActions:
         :param str resource_group_name:
         :param str region:
         :param dict tags:
+        :param list[SecurityRule] security_rules:
         :return:
         """
         self._logger.info(f"Creating network security group {nsg_name}...")
@@ -49,6 +71,7 @@ class NetworkSecurityGroupActions:
             resource_group_name=resource_group_name,
             region=region,
             tags=tags,
+            security_rules=security_rules,
         )
 
     def get_network_security_group(self, nsg_name, resource_group_name):
@@ -64,6 +87,21 @@ class NetworkSecurityGroupActions:
             resource_group_name=resource_group_name,
         )
 
+    def update_network_security_group(self, nsg, resource_group_name, etag=None):
+        """Update Network Security Group.
+
+        :param nsg:
+        :param str resource_group_name:
+        :param str etag:
+        :return:
+        """
+        self._logger.info(f"Updating network security group {nsg.name}...")
+        return self._azure_client.update_network_security_group(
+            network_security_group=nsg,
+            resource_group_name=resource_group_name,
+            etag=etag,
+        )
+
     def network_security_group_exists(self, nsg_name: str, resource_group_name: str):
         """Check if the network security group exists."""
         self._logger.info(
@@ -87,6 +125,11 @@ class NetworkSecurityGroupActions:
             network_security_group_name=nsg_name,
             resource_group_name=resource_group_name,
         )
+        NSGRulesPriorityAllocatorsCache().remove_allocator(
+            subscription_id=self.subscription_id,
+            nsg_name=nsg_name,
+            resource_group_name=resource_group_name,
+        )
 
     def create_vm_network_security_group(
         self, vm_name, resource_group_name, region, tags
@@ -225,8 +268,8 @@ class NetworkSecurityGroupActions:
             protocol=protocol,
         )
 
-        self._azure_client.create_nsg_rule(
-            resource_group_name=resource_group_name, nsg_name=nsg_name, rule=rule
+        return self._create_nsg_rule(
+            rule=rule, nsg_name=nsg_name, resource_group_name=resource_group_name
         )
 
     def create_nsg_deny_rule(
@@ -266,9 +309,28 @@ class NetworkSecurityGroupActions:
             protocol=SecurityRuleProtocol.asterisk,
         )
 
-        self._azure_client.create_nsg_rule(
+        return self._create_nsg_rule(
+            rule=rule, nsg_name=nsg_name, resource_group_name=resource_group_name
+        )
+
+    def _create_nsg_rule(self, rule, nsg_name, resource_group_name):
+        """Create NSG Rule.
+
+        :param SecurityRule rule:
+        :param str nsg_name:
+        :param str resource_group_name:
+        :return:
+        """
+        rule = self._azure_client.create_nsg_rule(
             resource_group_name=resource_group_name, nsg_name=nsg_name, rule=rule
         )
+        NSGRulesPriorityAllocatorsCache().add_rule(
+            subscription_id=self.subscription_id,
+            nsg_name=nsg_name,
+            resource_group_name=resource_group_name,
+            rule=rule,
+        )
+        return rule
 
     def delete_nsg_rule(self, rule_name, nsg_name, resource_group_name):
         """Delete NSG Rule.
@@ -284,6 +346,12 @@ class NetworkSecurityGroupActions:
             nsg_name=nsg_name,
             rule_name=rule_name,
         )
+        NSGRulesPriorityAllocatorsCache().remove_rule(
+            subscription_id=self.subscription_id,
+            nsg_name=nsg_name,
+            resource_group_name=resource_group_name,
+            rule_name=rule_name,
+        )
 
     def get_nsg_rules(self, nsg_name, resource_group_name):
         """Get NSG Rule.
@@ -317,3 +385,94 @@ class NetworkSecurityGroupActions:
                 nsg_name=nsg_name,
                 resource_group_name=resource_group_name,
             )
+
+
+class NSGRulesSetBuilder(NetworkSecurityGroupActions):
+    """Collect NSG Rules to create them together with the Network Security Group.
+
+    Rules are not created one by one, they are sent within the single
+    Network Security Group request instead.
+    """
+
+    def __init__(self, azure_client, logger):
+        """Init command.
+
+        :param cloudshell.cp.azure.client.AzureAPIClient azure_client:
+        :param logging.Logger logger:
+        """
+        super().__init__(azure_client=azure_client, logger=logger)
+        self.security_rules = []
+        self._rules_applied = False
+
+    def _create_nsg_rule(self, rule, nsg_name, resource_group_name):
+        """Add NSG Rule to the rules set.
+
+        :param SecurityRule rule:
+        :param str nsg_name:
+        :param str resource_group_name:
+        :return:
+        """
+        self._logger.info(f"Adding security rule {rule.name} to NSG {nsg_name} set")
+        self.security_rules.append(rule)
+        return rule
+
+    def create_network_security_group(
+        self, nsg_name, resource_group_name, region, tags, security_rules=None
+    ):
+        """Create Network Security Group with all collected NSG Rules.
+
+        :param str nsg_name:
+        :param str resource_group_name:
+        :param str region:
+        :param dict tags:
+        :param list[SecurityRule] security_rules:
+        :return:
+        """
+        nsg = super().create_network_security_group(
+            nsg_name=nsg_name,
+            resource_group_name=resource_group_name,
+            region=region,
+            tags=tags,
+            security_rules=[*self.security_rules, *(security_rules or [])],
+        )
+        self._rules_applied = True
+        return nsg
+
+    def create_nsg_rules(self, nsg_name, resource_group_name):
+        """Create all collected NSG Rules in the existing Network Security Group.
+
+        Rules from the concurrent requests for the same NSG are merged into the
+        single NSG update, priorities of the rules are assigned on the update.
+
+        :param str nsg_name:
+        :param str resource_group_name:
+        :return:
+        """
+        rules = NSGRulesWriter().write_rules(
+            nsg_actions=self,
+            nsg_name=nsg_name,
+            resource_group_name=resource_group_name,
+            rules=self.security_rules,
+        )
+        self._rules_applied = True
+        return rules
+
+    def delete_nsg_rule(self, rule_name, nsg_name, resource_group_name):
+        """Delete NSG Rule or remove it from the rules set if it wasn't applied.
+
+        :param str rule_name:
+        :param str nsg_name:
+        :param str resource_group_name:
+        :return:
+        """
+        if self._rules_applied:
+            return super().delete_nsg_rule(
+                rule_name=rule_name,
+                nsg_name=nsg_name,
+                resource_group_name=resource_group_name,
+            )
+
+        self._logger.info(f"Removing security rule {rule_name} from NSG {nsg_name} set")
+        self.security_rules = [
+            rule for rule in self.security_rules if rule.name != rule_name
+        ]
@@ -1,4 +1,6 @@
-from azure.mgmt.network.models import Route, RouteTable
+from cloudshell.cp.azure.utils.lazy_import import LazyModule
+
+network_models = LazyModule("azure.mgmt.network.models")
 
 
 class RouteTablesActions:
@@ -23,10 +25,10 @@ class RouteTablesActions:
         :return:
         """
         self._logger.info(f"Creating Route Table: {route_table_name}")
-        route_table = RouteTable(
+        route_table = network_models.RouteTable(
             location=region,
             routes=[
-                Route(
+                network_models.Route(
                     name=route.name,
                     next_hop_ip_address=route.next_hop_address,
                     next_hop_type=route.next_hop_type,
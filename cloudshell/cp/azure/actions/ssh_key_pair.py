@@ -1,28 +1,96 @@
-from cloudshell.cp.core.utils import generate_ssh_key_pair
+from cloudshell.cp.azure.utils.ssh_key_pair_pool import RSA_KEY_TYPE, SSHKeyPairPool
 
 
 class SSHKeyPairActions:
     SSH_FILE_SHARE_NAME = "sshkeypair"
     SSH_FILE_SHARE_DIRECTORY = ""
+    # keys of any type are saved with these names, so the deployment and the
+    # access key flows find them without knowing the key type of the resource
     SSH_PUB_KEY_NAME = "id_rsa.pub"
     SSH_PRIVATE_KEY_NAME = "id_rsa"
+    SSH_KEY_TYPE = RSA_KEY_TYPE
+    SSH_KEY_POOL_LOW_WATERMARK = 2
+    SSH_KEY_POOL_HIGH_WATERMARK = 5
 
-    def __init__(self, azure_client, logger):
+    def __init__(
+        self,
+        azure_client,
+        logger,
+        key_type=None,
+        key_pool_low_watermark=None,
+        key_pool_high_watermark=None,
+    ):
         """Init command.
 
         :param cloudshell.cp.azure.client.AzureAPIClient azure_client:
         :param logging.Logger logger:
+        :param str key_type: type of the generated SSH keys, "rsa" or "ed25519"
+        :param int key_pool_low_watermark: min number of the pre-generated keys
+        :param int key_pool_high_watermark: max number of the pre-generated keys
         """
         self._azure_client = azure_client
         self._logger = logger
+        self._key_type = key_type or self.SSH_KEY_TYPE
+        self._key_pool_low_watermark = (
+            key_pool_low_watermark
+            if key_pool_low_watermark is not None
+            else self.SSH_KEY_POOL_LOW_WATERMARK
+        )
+        self._key_pool_high_watermark = (
+            key_pool_high_watermark
+            if key_pool_high_watermark is not None
+            else self.SSH_KEY_POOL_HIGH_WATERMARK
+        )
+
+    @classmethod
+    def from_resource_config(cls, azure_client, resource_config, logger):
+        """Create actions with the SSH keys settings of the resource.
+
+        :param cloudshell.cp.azure.client.AzureAPIClient azure_client:
+        :param cloudshell.cp.azure.resource_config.AzureResourceConfig resource_config:  # noqa: E501
+        :param logging.Logger logger:
+        :rtype: SSHKeyPairActions
+        """
+        return cls(
+            azure_client=azure_client,
+            logger=logger,
+            key_type=resource_config.ssh_key_type,
+            key_pool_low_watermark=resource_config.ssh_key_pool_low_watermark,
+            key_pool_high_watermark=resource_config.ssh_key_pool_high_watermark,
+        )
+
+    def _get_ssh_key_pair_pool(self):
+        """Get process-wide pool of the pre-generated SSH key pairs.
+
+        :rtype: SSHKeyPairPool
+        """
+        return SSHKeyPairPool(
+            key_type=self._key_type,
+            low_watermark=self._key_pool_low_watermark,
+            high_watermark=self._key_pool_high_watermark,
+        )
 
     def create_ssh_key_pair(self):
         """Create SSH Key Pair.
 
-        :return:
+        Key pair is taken from the pool of the pre-generated ones if it is ready.
+
+        :return: private and public keys
+        :rtype: tuple[str, str]
         """
         self._logger.info("Creating SSH key pair...")
-        return generate_ssh_key_pair()
+        return self._get_ssh_key_pair_pool().get_key_pair(logger=self._logger)
+
+    def fill_ssh_key_pair_pool(self):
+        """Start pre-generating SSH key pairs in the background.
+
+        Should be called on the driver initialization, so the key pairs are ready
+        by the first sandbox preparation. Azure client isn't used by the pool, so
+        the actions could be created without it here.
+
+        :return:
+        """
+        self._get_ssh_key_pair_pool().fill()
 
     def save_ssh_public_key(
         self, resource_group_name, storage_account_name, public_key
@@ -1,13 +1,15 @@
 import typing
 
 import requests
-from azure.mgmt.compute.models import OperatingSystemTypes
 from msrestazure.azure_exceptions import CloudError
 from requests.utils import is_valid_cidr
 
 from cloudshell.cp.azure.actions.network import NetworkActions
+from cloudshell.cp.azure.utils.lazy_import import LazyModule
 from cloudshell.cp.azure.utils.tags import get_default_tags_count
 
+compute_models = LazyModule("azure.mgmt.compute.models")
+
 
 class ValidationActions(NetworkActions):
     MAX_VM_DISK_SIZE_GB = 1023
@@ -205,7 +207,7 @@ class ValidationActions(NetworkActions):
         if not deploy_app.extension_script_file:
             return
 
-        if image_os == OperatingSystemTypes.windows:
+        if image_os == compute_models.OperatingSystemTypes.windows:
             if not deploy_app.extension_script_file.endswith("ps1"):
                 raise Exception(
                     "Invalid format for the PowerShell script. "
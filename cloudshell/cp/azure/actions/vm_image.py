@@ -1,9 +1,14 @@
-from functools import lru_cache
-
+from cloudshell.cp.azure.utils.marketplace_images_warmer import (
+    MarketplaceImagesWarmer,
+)
 from cloudshell.cp.azure.utils.singleton_utils import SingletonByArgsMeta
 
 
 class VMImageActions(metaclass=SingletonByArgsMeta):
+    LATEST_IMAGE_VERSION = "latest"
+    SINGLETON_MAX_INSTANCES = 100
+    SINGLETON_IDLE_TIMEOUT = 60 * 60
+
     def __init__(self, azure_client, logger):
         """Init command.
 
@@ -26,11 +31,26 @@ class VMImageActions(metaclass=SingletonByArgsMeta):
             f"Getting Marketplace Image OS for Publisher: {publisher_name}, "
             f"Offer: {offer}, SKU: {sku}"
         )
-        image = self._azure_client.get_latest_virtual_machine_image(
-            region=region, publisher_name=publisher_name, offer=offer, sku=sku
+        image = self._get_marketplace_image(
+            region=region,
+            publisher_name=publisher_name,
+            offer=offer,
+            sku=sku,
+            version=self.LATEST_IMAGE_VERSION,
         )
         return image.os_disk_image.operating_system
 
+    def warm_marketplace_images(self, region):
+        """Resolve latest versions of the used Marketplace images in advance.
+
+        :param str region:
+        :return:
+        """
+        self._logger.info(f"Warming Marketplace images cache for the region {region}")
+        MarketplaceImagesWarmer(self._azure_client.cache_namespace).warm(
+            region=region, fresh=False
+        )
+
     def get_custom_image_os(self, image_resource_group_name, image_name):
         """Get custom image OS.
 
@@ -39,8 +59,8 @@ class VMImageActions(metaclass=SingletonByArgsMeta):
         :return:
         """
         self._logger.info(f"Getting Custom Image OS for Image: {image_name}")
-        image = self._azure_client.get_custom_virtual_machine_image(
-            image_name=image_name, resource_group_name=image_resource_group_name
+        image = self._get_custom_image(
+            image_resource_group_name=image_resource_group_name, image_name=image_name
         )
         return image.storage_profile.os_disk.os_type
 
@@ -52,8 +72,8 @@ class VMImageActions(metaclass=SingletonByArgsMeta):
         :return:
         """
         self._logger.info(f"Getting Custom Image ID for Image: {image_name}")
-        image = self._azure_client.get_custom_virtual_machine_image(
-            image_name=image_name, resource_group_name=image_resource_group_name
+        image = self._get_custom_image(
+            image_resource_group_name=image_resource_group_name, image_name=image_name
         )
         return image.id
 
@@ -132,7 +152,6 @@ class VMImageActions(metaclass=SingletonByArgsMeta):
         )
         return image.purchase_plan
 
-    @lru_cache()
     def _get_gallery_image(
         self, gallery_name, gallery_image_name, resource_group, subscription_id
     ):
@@ -150,3 +169,147 @@ class VMImageActions(metaclass=SingletonByArgsMeta):
             gallery_image_name=gallery_image_name,
             subscription_id=subscription_id,
         )
+
+    def _get_marketplace_image(self, region, publisher_name, offer, sku, version):
+        """Get marketplace image.
+
+        :param str region:
+        :param str publisher_name:
+        :param str offer:
+        :param str sku:
+        :param str version:
+        :return:
+        """
+        if version and version != self.LATEST_IMAGE_VERSION:
+            return self._azure_client.get_virtual_machine_image(
+                region=region,
+                publisher_name=publisher_name,
+                offer=offer,
+                sku=sku,
+                version=version,
+            )
+
+        MarketplaceImagesWarmer(self._azure_client.cache_namespace).track(
+            azure_client=self._azure_client,
+            region=region,
+            publisher_name=publisher_name,
+            offer=offer,
+            sku=sku,
+        )
+        return self._azure_client.get_latest_virtual_machine_image(
+            region=region, publisher_name=publisher_name, offer=offer, sku=sku
+        )
+
+    def _get_custom_image(self, image_resource_group_name, image_name):
+        """Get custom image.
+
+        :param str image_resource_group_name:
+        :param str image_name:
+        :return:
+        """
+        return self._azure_client.get_custom_virtual_machine_image(
+            image_name=image_name, resource_group_name=image_resource_group_name
+        )
+
+    def _get_gallery_image_version(
+        self,
+        gallery_name,
+        gallery_image_name,
+        gallery_image_version,
+        resource_group,
+        subscription_id,
+    ):
+        """Get gallery image version.
+
+        :param gallery_name:
+        :param gallery_image_name:
+        :param gallery_image_version:
+        :param resource_group:
+        :param subscription_id:
+        :return:
+        """
+        return self._azure_client.get_gallery_machine_image_version(
+            resource_group=resource_group,
+            gallery_name=gallery_name,
+            gallery_image_name=gallery_image_name,
+            gallery_image_version=gallery_image_version,
+            subscription_id=subscription_id,
+        )
+
+    def get_marketplace_image_data_disks(
+        self, region, publisher_name, offer, sku, version
+    ):
+        """Get predefined data disks of the marketplace image.
+
+        :param str region:
+        :param str publisher_name:
+        :param str offer:
+        :param str sku:
+        :param str version:
+        :return:
+        """
+        self._logger.info(
+            f"Getting Marketplace Image data disks for Publisher: {publisher_name}, "
+            f"Offer: {offer}, SKU: {sku}, Version: {version}"
+        )
+        image = self._get_marketplace_image(
+            region=region,
+            publisher_name=publisher_name,
+            offer=offer,
+            sku=sku,
+            version=version,
+        )
+        return image.data_disk_images or []
+
+    def get_custom_image_data_disks(self, image_resource_group_name, image_name):
+        """Get predefined data disks of the custom image.
+
+        :param str image_resource_group_name:
+        :param str image_name:
+        :return:
+        """
+        self._logger.info(f"Getting Custom Image data disks for Image: {image_name}")
+        image = self._get_custom_image(
+            image_resource_group_name=image_resource_group_name, image_name=image_name
+        )
+        return image.storage_profile.data_disks or []
+
+    def get_gallery_image_data_disks(
+        self,
+        gallery_name,
+        gallery_image_name,
+        gallery_image_version,
+        resource_group,
+        subscription_id,
+    ):
+        """Get predefined data disks of the gallery image version.
+
+        Returns None if the image version is not specified, so the data disks
+        layout of the image can't be determined before the deployment.
+
+        :param gallery_name:
+        :param gallery_image_name:
+        :param gallery_image_version:
+        :param resource_group:
+        :param subscription_id:
+        :return:
+        """
+        if (
+            not gallery_image_version
+            or gallery_image_version == self.LATEST_IMAGE_VERSION
+        ):
+            return None
+
+        self._logger.info(
+            f"Getting image data disks for image "
+            f"{gallery_image_name}:{gallery_image_version}, "
+            f"from Shared Gallery {gallery_name}"
+        )
+        image = self._get_gallery_image_version(
+            gallery_name=gallery_name,
+            gallery_image_name=gallery_image_name,
+            gallery_image_version=gallery_image_version,
+            resource_group=resource_group,
+            subscription_id=subscription_id,
+        )
+        return image.storage_profile.data_disk_images or []
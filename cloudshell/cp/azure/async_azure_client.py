@@ -0,0 +1,78 @@
+import asyncio
+import functools
+import inspect
+
+from cloudshell.cp.azure.utils.arm_polling import OperationStartPolling
+from cloudshell.cp.azure.utils.azure_operations_poller import AzureOperationsPoller
+
+
+class AsyncAzureAPIClient:
+    """Asyncio counterpart of the AzureAPIClient with the same methods surface.
+
+    Long running operations (methods with the 'polling' argument) are started
+    without the SDK polling thread and handed over to the AzureOperationsPoller,
+    the coroutine is resumed when the operation is finished. So the thread is
+    held only for the initial HTTP request and not for the whole operation, and
+    any number of operations can be awaited concurrently. Other methods are
+    executed in the executor. Retries of the initial requests are done by the
+    wrapped client methods.
+
+    Example usage:
+        >>> async_client = AsyncAzureAPIClient(azure_client=azure_client)
+        >>> public_ip, disk = await asyncio.gather(
+        >>>     async_client.create_public_ip(...),
+        >>>     async_client.create_disk(...),
+        >>> )
+    """
+
+    def __init__(self, azure_client, executor=None):
+        """Init command.
+
+        :param cloudshell.cp.azure.azure_client.AzureAPIClient azure_client:
+        :param concurrent.futures.Executor executor: executor for the HTTP requests,
+            default event loop executor will be used if not provided
+        """
+        self._azure_client = azure_client
+        self._executor = executor
+
+    def __getattr__(self, name):
+        method = getattr(self._azure_client, name)
+
+        if not callable(method):
+            return method
+
+        if self._is_operation_method(method):
+            wrapper = self._wrap_operation_method(method)
+        else:
+            wrapper = self._wrap_method(method)
+
+        return functools.wraps(method)(wrapper)
+
+    @staticmethod
+    def _is_operation_method(method):
+        # signature of the retried methods is taken from the wrapped ones
+        return "polling" in inspect.signature(method).parameters
+
+    async def _run_in_executor(self, func, *args, **kwargs):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+    def _wrap_method(self, method):
+        async def wrapper(*args, **kwargs):
+            return await self._run_in_executor(method, *args, **kwargs)
+
+        return wrapper
+
+    def _wrap_operation_method(self, method):
+        async def wrapper(*args, **kwargs):
+            start_polling = OperationStartPolling()
+            await self._run_in_executor(method, *args, polling=start_polling, **kwargs)
+            # cancellation of the coroutine stops polling of the operation
+            operation_future = AzureOperationsPoller().register(
+                start_polling.get_arm_polling()
+            )
+            return await asyncio.wrap_future(operation_future)
+
+        return wrapper
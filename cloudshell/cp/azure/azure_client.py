@@ -1,28 +1,49 @@
-from azure.mgmt.compute import ComputeManagementClient, models as compute_models
-from azure.mgmt.network import NetworkManagementClient, models as network_models
-from azure.mgmt.network.models import NetworkInterface, NetworkInterfaceIPConfiguration
-from azure.mgmt.resource import ResourceManagementClient, SubscriptionClient
-from azure.mgmt.resource.resources.models import ResourceGroup
-from azure.mgmt.storage import StorageManagementClient, models as storage_models
-from azure.storage.blob import BlockBlobService
-from azure.storage.file import FileService
-from msrestazure.azure_active_directory import ServicePrincipalCredentials
+import copy
+import hashlib
+from functools import partial
+
+from azure.common import AzureHttpError
 from msrestazure.azure_exceptions import CloudError
-from retrying import retry
 
 from cloudshell.cp.azure import exceptions
+from cloudshell.cp.azure.utils.arm_throttling import ARMThrottlingCredentialsPolicy
+from cloudshell.cp.azure.utils.azure_operations_poller import AzureOperationPolling
+from cloudshell.cp.azure.utils.cache import (
+    MISSING,
+    ProcessCache,
+    cached,
+    get_cache_key,
+    get_representation_cache_key,
+    invalidates_cache,
+)
+from cloudshell.cp.azure.utils.lazy_import import LazyModule
+from cloudshell.cp.azure.utils.management_clients_pool import ManagementClientsPool
 from cloudshell.cp.azure.utils.retrying import (
-    ANOTHER_OPERATION_IN_PROGRESS_MAX_ATTEMPT_NUMBER,
-    PUBLIC_IP_DETACH_MAX_ATTEMPT_NUMBER,
-    RETRYABLE_ERROR_MAX_ATTEMPTS,
-    RETRYABLE_WAIT_TIME,
-    VM_DISK_DETACH_MAX_ATTEMPT_NUMBER,
-    retry_on_another_operation_in_progress_error,
-    retry_on_connection_error,
-    retry_on_public_ip_detach_error,
-    retry_on_retryable_error,
-    retry_on_vm_disk_detach_error,
+    ANOTHER_OPERATION_IN_PROGRESS_RETRY_POLICY,
+    CONNECTION_ERROR_RETRY_POLICY,
+    PUBLIC_IP_DETACH_RETRY_POLICY,
+    RETRYABLE_ERROR_RETRY_POLICY,
+    VM_DISK_DETACH_RETRY_POLICY,
+    get_retry_policies,
+    retry,
 )
+from cloudshell.cp.azure.utils.single_flight import single_flight
+from cloudshell.cp.azure.utils.sqlite_cache import SQLiteCache
+from cloudshell.cp.azure.utils.storage_account_services import (
+    StorageAccountServices,
+    StorageAccountServicesCache,
+)
+from cloudshell.cp.azure.utils.storage_accounts_index import StorageAccountsIndex
+
+compute = LazyModule("azure.mgmt.compute")
+compute_models = LazyModule("azure.mgmt.compute.models")
+network = LazyModule("azure.mgmt.network")
+network_models = LazyModule("azure.mgmt.network.models")
+resource = LazyModule("azure.mgmt.resource")
+resource_models = LazyModule("azure.mgmt.resource.resources.models")
+storage = LazyModule("azure.mgmt.storage")
+storage_models = LazyModule("azure.mgmt.storage.models")
+azure_active_directory = LazyModule("msrestazure.azure_active_directory")
 
 
 class AzureAPIClient:
@@ -41,8 +62,24 @@ class AzureAPIClient:
     VM_SCRIPT_LINUX_HANDLER_VERSION = "1.5"
 
     CREATE_PUBLIC_IP_TIMEOUT_IN_MINUTES = 4
-    RETRYING_STOP_MAX_ATTEMPT_NUMBER = 5
-    RETRYING_WAIT_FIXED = 2000
+
+    CACHE_TTLS = {
+        "regions": 24 * 60 * 60,
+        "virtual_machine_sizes": 24 * 60 * 60,
+        "resource_group": 10 * 60,
+        "virtual_network": 60,
+        "custom_image": 60 * 60,
+        "gallery_image": 60 * 60,
+        "gallery_image_version": 24 * 60 * 60,
+        "marketplace_image": 6 * 60 * 60,
+        "marketplace_image_version": 24 * 60 * 60,
+        "storage_account_resource_group": 24 * 60 * 60,
+    }
+    REPRESENTATION_CACHE_TTL = 60 * 60
+    NOT_MODIFIED_STATUS_CODE = 304
+    FORBIDDEN_STATUS_CODE = 403
+    NOT_FOUND_STATUS_CODE = 404
+    STORAGE_ACCOUNT_KEY_CACHE_TTL = 60 * 60
 
     def __init__(
         self,
@@ -51,6 +88,9 @@ class AzureAPIClient:
         azure_application_id,
         azure_application_key,
         logger,
+        retry_policies=None,
+        cache=None,
+        cache_ttls=None,
     ):
         """Init command.
 
@@ -60,43 +100,204 @@ class AzureAPIClient:
         :param str azure_application_key:
         :param str azure_application_key:
         :param logging.Logger logger:
+        :param list[cloudshell.cp.azure.utils.retrying.RetryPolicy] retry_policies:
+            policies that override the default ones with the same names
+        :param cloudshell.cp.azure.utils.cache.CacheBackend cache: cache for the
+            ARM lookups, process-wide in-memory cache is used by default, use
+            SQLiteCache to keep the cached values between the driver restarts
+        :param dict[str, float] cache_ttls: TTLs in seconds that override the
+            default ones for the given resource types
         """
         self._azure_subscription_id = azure_subscription_id
         self._azure_tenant_id = azure_tenant_id
         self._azure_application_id = azure_application_id
         self._azure_application_key = azure_application_key
         self._logger = logger
-        self._cached_storage_account_keys = {}
+        self.retry_policies = {policy.name: policy for policy in retry_policies or []}
+        self.cache = cache or ProcessCache()
+        self.cache_namespace = azure_subscription_id
+        self.CACHE_TTLS = {**self.CACHE_TTLS, **(cache_ttls or {})}
+
+        self._credentials_hash = hashlib.sha256(
+            azure_application_key.encode()
+        ).hexdigest()
+        self._lazy_credentials = None
 
-        self._credentials = ServicePrincipalCredentials(
-            client_id=azure_application_id,
-            secret=azure_application_key,
-            tenant=azure_tenant_id,
+    @classmethod
+    def from_resource_config(cls, resource_config, logger, **kwargs):
+        """Create client with the credentials and the settings of the resource.
+
+        :param cloudshell.cp.azure.resource_config.AzureResourceConfig resource_config:  # noqa: E501
+        :param logging.Logger logger:
+        :param kwargs: other arguments of the client
+        :rtype: AzureAPIClient
+        """
+        if resource_config.cache_db_path:
+            kwargs.setdefault("cache", SQLiteCache(resource_config.cache_db_path))
+
+        return cls(
+            azure_subscription_id=resource_config.azure_subscription_id,
+            azure_tenant_id=resource_config.azure_tenant_id,
+            azure_application_id=resource_config.azure_application_id,
+            azure_application_key=resource_config.azure_application_key,
+            logger=logger,
+            retry_policies=get_retry_policies(resource_config.retry_time_budgets),
+            **kwargs,
         )
 
-        self._subscription_client = SubscriptionClient(credentials=self._credentials)
+    def get_settings(self):
+        """Get credentials and settings needed to create the same client.
 
-        self._resource_client = ResourceManagementClient(
-            credentials=self._credentials, subscription_id=self._azure_subscription_id
+        :return: arguments of the client except the logger
+        :rtype: dict
+        """
+        return {
+            "azure_subscription_id": self._azure_subscription_id,
+            "azure_tenant_id": self._azure_tenant_id,
+            "azure_application_id": self._azure_application_id,
+            "azure_application_key": self._azure_application_key,
+            "retry_policies": list(self.retry_policies.values()),
+            "cache": self.cache,
+            "cache_ttls": self.CACHE_TTLS,
+        }
+
+    @property
+    def credentials_id(self):
+        """Identity of the client credentials that doesn't expose the secret.
+
+        :rtype: tuple[str, str, str]
+        """
+        return (
+            self._azure_tenant_id,
+            self._azure_application_id,
+            self._credentials_hash,
         )
 
-        self._compute_client = ComputeManagementClient(
-            credentials=self._credentials, subscription_id=self._azure_subscription_id
+    @property
+    def _credentials(self):
+        """Credentials are created (and the token is acquired) on the first use.
+
+        :rtype: msrestazure.azure_active_directory.ServicePrincipalCredentials
+        """
+        if self._lazy_credentials is None:
+            self._lazy_credentials = azure_active_directory.ServicePrincipalCredentials(
+                client_id=self._azure_application_id,
+                secret=self._azure_application_key,
+                tenant=self._azure_tenant_id,
+            )
+
+        return self._lazy_credentials
+
+    @property
+    def _subscription_client(self):
+        return self._get_management_client(client_class=resource.SubscriptionClient)
+
+    @property
+    def _resource_client(self):
+        return self._get_management_client(
+            client_class=resource.ResourceManagementClient,
+            subscription_id=self._azure_subscription_id,
         )
 
-        self._storage_client = StorageManagementClient(
-            credentials=self._credentials, subscription_id=self._azure_subscription_id
+    @property
+    def _compute_client(self):
+        return self._get_management_client(
+            client_class=compute.ComputeManagementClient,
+            subscription_id=self._azure_subscription_id,
         )
 
-        self._network_client = NetworkManagementClient(
-            credentials=self._credentials, subscription_id=self._azure_subscription_id
+    @property
+    def _storage_client(self):
+        return self._get_management_client(
+            client_class=storage.StorageManagementClient,
+            subscription_id=self._azure_subscription_id,
         )
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @property
+    def _network_client(self):
+        return self._get_management_client(
+            client_class=network.NetworkManagementClient,
+            subscription_id=self._azure_subscription_id,
+        )
+
+    def _get_management_client(self, client_class, subscription_id=None):
+        """Get management client from the process-wide pool.
+
+        :param type client_class:
+        :param str subscription_id: subscription of the client if it needs one
+        :rtype: msrest.service_client.SDKClient
+        """
+        key = (client_class, *self.credentials_id, subscription_id)
+        return ManagementClientsPool().get_client(
+            key=key,
+            create_client=partial(
+                self._create_management_client,
+                client_class=client_class,
+                subscription_id=subscription_id,
+            ),
+        )
+
+    def _create_management_client(self, client_class, subscription_id=None):
+        """Create management client.
+
+        :param type client_class:
+        :param str subscription_id: subscription of the client if it needs one
+        :rtype: msrest.service_client.SDKClient
+        """
+        if subscription_id is None:
+            return client_class(credentials=self._credentials)
+
+        return client_class(
+            credentials=ARMThrottlingCredentialsPolicy(self._credentials),
+            subscription_id=subscription_id,
+        )
+
+    @staticmethod
+    def _get_polling_method(polling):
+        """Get polling method for the long running operation.
+
+        Operations with the default polling are polled by the AzureOperationsPoller.
+
+        :param polling: True for the default polling, False or polling method
+        """
+        if polling is True:
+            return AzureOperationPolling()
+
+        return polling
+
+    def _get_if_none_match(self, resource_type, get_resource, **arguments):
+        """Get resource with the conditional request.
+
+        Last representation of the resource is kept with its ETag, its copy is
+        returned if Azure responds that the resource wasn't modified since then.
+
+        :param str resource_type:
+        :param get_resource: function that gets resource with the custom headers
+        :param arguments: arguments that identify the resource
+        """
+        key = get_representation_cache_key(
+            namespace=self.cache_namespace,
+            resource_type=resource_type,
+            arguments=arguments,
+        )
+        representation = self.cache.get(key)
+        custom_headers = None
+
+        if representation is not MISSING and representation.etag:
+            custom_headers = {"If-None-Match": representation.etag}
+
+        try:
+            resource = get_resource(custom_headers=custom_headers)
+        except CloudError as e:
+            if custom_headers and e.status_code == self.NOT_MODIFIED_STATUS_CODE:
+                return copy.deepcopy(representation)
+            raise
+
+        self.cache.put(key, copy.deepcopy(resource), ttl=self.REPRESENTATION_CACHE_TTL)
+        return resource
+
+    @cached("regions")
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def get_available_regions(self):
         """List all available regions per subscription.
 
@@ -107,11 +308,7 @@ class AzureAPIClient:
         )
         return list(locations)
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def register_provider(self, provider):
         """Register Azure Provider.
 
@@ -120,11 +317,8 @@ class AzureAPIClient:
         """
         self._resource_client.providers.register(provider)
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @cached("resource_group")
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def get_resource_group(self, resource_group_name):
         """Get Resource Group.
 
@@ -135,23 +329,58 @@ class AzureAPIClient:
             resource_group_name=resource_group_name
         )
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @cached("virtual_network")
+    @single_flight
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def get_virtual_network(self, virtual_network_name: str, resource_group_name: str):
         """Get virtual network by name."""
-        return self._network_client.virtual_networks.get(
-            resource_group_name=resource_group_name,
+        return self._get_if_none_match(
+            resource_type="virtual_network",
+            get_resource=partial(
+                self._network_client.virtual_networks.get,
+                resource_group_name=resource_group_name,
+                virtual_network_name=virtual_network_name,
+            ),
             virtual_network_name=virtual_network_name,
+            resource_group_name=resource_group_name,
         )
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
+    @invalidates_cache(
+        "virtual_network",
+        virtual_network_name="virtual_network_name",
+        resource_group_name="resource_group_name",
     )
+    @retry(ANOTHER_OPERATION_IN_PROGRESS_RETRY_POLICY, CONNECTION_ERROR_RETRY_POLICY)
+    def update_virtual_network(
+        self,
+        virtual_network_name,
+        virtual_network,
+        resource_group_name,
+        etag=None,
+        polling=True,
+    ):
+        """Update virtual network.
+
+        :param str virtual_network_name:
+        :param VirtualNetwork virtual_network:
+        :param str resource_group_name:
+        :param str etag: update vNet only if it wasn't changed since it was read
+        :param polling: polling method of the long running operation
+        :rtype: VirtualNetwork
+        """
+        custom_headers = {"If-Match": etag} if etag else None
+
+        operation_poller = self._network_client.virtual_networks.create_or_update(
+            resource_group_name=resource_group_name,
+            virtual_network_name=virtual_network_name,
+            parameters=virtual_network,
+            custom_headers=custom_headers,
+            polling=self._get_polling_method(polling),
+        )
+
+        return operation_poller.result()
+
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def get_virtual_networks_by_resource_group(self, resource_group_name):
         """Get vNets for the given resource group.
 
@@ -162,24 +391,18 @@ class AzureAPIClient:
         networks_list = self._network_client.virtual_networks.list(resource_group_name)
         return list(networks_list)
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @cached("virtual_machine_sizes")
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def get_virtual_machine_sizes_by_region(self, region):
         """List available virtual machine sizes within given location.
 
         :param str region: Azure region
-        :return: azure.mgmt.compute.models.VirtualMachineSizePaged instance
+        :rtype: list[azure.mgmt.compute.models.VirtualMachineSize]
         """
-        return self._compute_client.virtual_machine_sizes.list(location=region)
+        return list(self._compute_client.virtual_machine_sizes.list(location=region))
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @invalidates_cache("resource_group", resource_group_name="group_name")
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def create_resource_group(self, group_name, region, tags):
         """Create Resource Group.
 
@@ -190,33 +413,28 @@ class AzureAPIClient:
         """
         return self._resource_client.resource_groups.create_or_update(
             resource_group_name=group_name,
-            parameters=ResourceGroup(location=region, tags=tags),
+            parameters=resource_models.ResourceGroup(location=region, tags=tags),
         )
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
-    def delete_resource_group(self, group_name, wait_for_result=False):
+    @invalidates_cache("resource_group", resource_group_name="group_name")
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
+    def delete_resource_group(self, group_name, wait_for_result=False, polling=True):
         """Delete Resource Group.
 
         :param str group_name:
         :param bool wait_for_result:
+        :param polling: polling method of the long running operation
         :return:
         """
         operation_poller = self._resource_client.resource_groups.delete(
-            resource_group_name=group_name
+            resource_group_name=group_name,
+            polling=self._get_polling_method(polling),
         )
 
         if wait_for_result:
-            operation_poller.wait()
+            operation_poller.result()
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def create_storage_account(
         self,
         resource_group_name,
@@ -224,6 +442,7 @@ class AzureAPIClient:
         storage_account_name,
         tags,
         wait_for_result=False,
+        polling=True,
     ):
         """Create Storage Account.
 
@@ -232,6 +451,7 @@ class AzureAPIClient:
         :param str storage_account_name:
         :param dict tags:
         :param bool wait_for_result:
+        :param polling: polling method of the long running operation
         :return:
         """
         kind_storage_value = storage_models.Kind.storage
@@ -245,80 +465,118 @@ class AzureAPIClient:
                 sku=sku, kind=kind_storage_value, location=region, tags=tags
             ),
             raw=False,
+            polling=self._get_polling_method(polling),
         )
 
         if wait_for_result:
-            operation_poller.wait()
+            operation_poller.result()
 
         return storage_account_name
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    def list_storage_accounts(self):
+        """List Storage Accounts of the subscription, pages are received lazily.
+
+        :rtype: collections.abc.Iterable[azure.mgmt.storage.models.StorageAccount]
+        """
+        return self._storage_client.storage_accounts.list()
+
+    @single_flight
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def get_storage_account(
         self,
         resource_group_name: str,
         storage_account_name: str,
     ):
-        for storage in self._storage_client.storage_accounts.list_by_resource_group(
-            resource_group_name=resource_group_name
-        ):
-            if storage.name == storage_account_name:
-                return storage
+        try:
+            return self._storage_client.storage_accounts.get_properties(
+                resource_group_name=resource_group_name,
+                account_name=storage_account_name,
+            )
+        except CloudError as e:
+            if e.status_code != self.NOT_FOUND_STATUS_CODE:
+                raise
 
         raise exceptions.ResourceNotFoundException(
             f"Unable to find Storage Account '{storage_account_name}' "
             f"under the Resource Group '{resource_group_name}'"
         )
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
     def get_storage_account_by_name(
         self,
         storage_account_name: str,
     ):
-        for storage in self._storage_client.storage_accounts.list():
-            if storage.name == storage_account_name:
-                return storage
+        """Get Storage Account from any resource group of the subscription.
+
+        Resource group of the account is taken from the cache or found in the
+        process-wide index, so the subscription is listed only when the account
+        isn't indexed yet.
+
+        :param str storage_account_name:
+        """
+        cache_key = get_cache_key(
+            namespace=self.cache_namespace,
+            resource_type="storage_account_resource_group",
+            arguments={"storage_account_name": storage_account_name},
+        )
+        resource_group_name = self.cache.get(cache_key)
+
+        if resource_group_name is not MISSING:
+            try:
+                return self.get_storage_account(
+                    resource_group_name=resource_group_name,
+                    storage_account_name=storage_account_name,
+                )
+            except exceptions.ResourceNotFoundException:
+                self.cache.delete(cache_key)
+
+        index = StorageAccountsIndex(self._azure_subscription_id, self.credentials_id)
+
+        for _ in range(2):
+            resource_group_name = index.get_resource_group_name(
+                storage_account_name=storage_account_name, azure_client=self
+            )
+
+            if resource_group_name is None:
+                break
+
+            try:
+                storage_account = self.get_storage_account(
+                    resource_group_name=resource_group_name,
+                    storage_account_name=storage_account_name,
+                )
+            except exceptions.ResourceNotFoundException:
+                # account was removed or recreated in another resource group
+                index.discard(storage_account_name)
+            else:
+                self.cache.put(
+                    cache_key,
+                    resource_group_name,
+                    ttl=self.CACHE_TTLS["storage_account_resource_group"],
+                )
+                return storage_account
 
         raise exceptions.ResourceNotFoundException(
             f"Unable to find Storage Account '{storage_account_name}'."
         )
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
-    def delete_storage_account(
-        self, resource_group_name, storage_account_name, wait_for_result=False
-    ):
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
+    def delete_storage_account(self, resource_group_name, storage_account_name):
         """Delete Storage Account.
 
+        Unlike the other deletions it is not a long running operation, Azure
+        deletes the Storage Account before the response is returned.
+
         :param str resource_group_name:
         :param str storage_account_name:
-        :param bool wait_for_result:
         :return:
         """
-        operation_poller = self._storage_client.storage_accounts.delete(
+        self._storage_client.storage_accounts.delete(
             resource_group_name=resource_group_name, account_name=storage_account_name
         )
 
-        if wait_for_result:
-            operation_poller.wait()
-
         return storage_account_name
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def _get_storage_account_key(self, resource_group_name, storage_account_name):
         """Get first storage account access key for some storage.
 
@@ -326,11 +584,6 @@ class AzureAPIClient:
         :param str storage_account_name: name of the storage on Azure
         :rtype: str
         """
-        cache_key = (resource_group_name, storage_account_name)
-
-        if cache_key in self._cached_storage_account_keys:
-            return self._cached_storage_account_keys[cache_key]
-
         account_keys = self._storage_client.storage_accounts.list_keys(
             resource_group_name, storage_account_name
         )
@@ -342,46 +595,75 @@ class AzureAPIClient:
                 f"resource group"
             )
 
-        account_key = account_keys.keys[0].value
-        self._cached_storage_account_keys[cache_key] = account_key
-
-        return account_key
+        return account_keys.keys[0].value
 
-    def _get_file_service(self, resource_group_name, storage_account_name):
-        """Get Azure file service for given storage.
+    def _get_storage_account_services(
+        self, resource_group_name, storage_account_name, fresh=False
+    ):
+        """Get cached services of the Storage Account.
 
         :param str resource_group_name: the name of the resource group on Azure
         :param str storage_account_name: the name of the storage on Azure
-        :rtype: azure.storage.file.FileService
+        :param bool fresh: refetch access key of the Storage Account
+        :rtype: cloudshell.cp.azure.utils.storage_account_services.StorageAccountServices  # noqa: E501
         """
-        account_key = self._get_storage_account_key(
-            resource_group_name=resource_group_name,
-            storage_account_name=storage_account_name,
+        cache = StorageAccountServicesCache()
+        key = (
+            self._azure_subscription_id,
+            resource_group_name.lower(),
+            storage_account_name.lower(),
         )
+        services = MISSING if fresh else cache.get(key)
 
-        return FileService(account_name=storage_account_name, account_key=account_key)
+        if services is MISSING:
+            account_key = self._get_storage_account_key(
+                resource_group_name=resource_group_name,
+                storage_account_name=storage_account_name,
+            )
+            services = StorageAccountServices(
+                account_name=storage_account_name, account_key=account_key
+            )
+            cache.put(key, services, ttl=self.STORAGE_ACCOUNT_KEY_CACHE_TTL)
 
-    def _get_blob_service(self, storage_account_name, resource_group_name):
-        """Get Azure Blob service for given storage.
+        return services
+
+    def _call_storage_account_services(
+        self, resource_group_name, storage_account_name, func
+    ):
+        """Call function with the Storage Account services.
+
+        Access key could be rotated since it was cached, so on the authorization
+        failure it is refetched and the function is called once again.
 
         :param str resource_group_name: the name of the resource group on Azure
         :param str storage_account_name: the name of the storage on Azure
-        :rtype: azure.storage.blob.BlockBlobService
+        :param func: function that takes StorageAccountServices
         """
-        account_key = self._get_storage_account_key(
+        services = self._get_storage_account_services(
             resource_group_name=resource_group_name,
             storage_account_name=storage_account_name,
         )
 
-        return BlockBlobService(
-            account_name=storage_account_name, account_key=account_key
+        try:
+            return func(services)
+        except AzureHttpError as e:
+            if e.status_code != self.FORBIDDEN_STATUS_CODE:
+                raise
+
+            self._logger.info(
+                f"Access to the Storage Account '{storage_account_name}' is "
+                f"forbidden, refetching its access key",
+                exc_info=True,
+            )
+
+        services = self._get_storage_account_services(
+            resource_group_name=resource_group_name,
+            storage_account_name=storage_account_name,
+            fresh=True,
         )
+        return func(services)
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def delete_blob(
         self, blob_name, container_name, resource_group_name, storage_account_name
     ):
@@ -393,18 +675,15 @@ class AzureAPIClient:
         :param str storage_account_name:
         :return:
         """
-        blob_service = self._get_blob_service(
-            storage_account_name=storage_account_name,
+        self._call_storage_account_services(
             resource_group_name=resource_group_name,
+            storage_account_name=storage_account_name,
+            func=lambda services: services.blob_service.delete_blob(
+                container_name=container_name, blob_name=blob_name
+            ),
         )
 
-        blob_service.delete_blob(container_name=container_name, blob_name=blob_name)
-
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def get_disk(
         self,
         disk_name,
@@ -421,11 +700,7 @@ class AzureAPIClient:
             disk_name=disk_name,
         )
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def create_disk(
         self,
         disk_name,
@@ -434,6 +709,7 @@ class AzureAPIClient:
         disk_size,
         disk_type,
         tags,
+        polling=True,
     ):
         """Create Disk.
 
@@ -443,6 +719,7 @@ class AzureAPIClient:
         :param int disk_size:
         :param str disk_type:
         :param dict[str, str] tags:
+        :param polling: polling method of the long running operation
         :return:
         """
         operation = self._compute_client.disks.create_or_update(
@@ -457,6 +734,7 @@ class AzureAPIClient:
                 sku=compute_models.DiskSku(name=disk_type),
                 tags=tags,
             ),
+            polling=self._get_polling_method(polling),
         )
 
         return operation.result()
@@ -468,6 +746,7 @@ class AzureAPIClient:
         disk_size=None,
         disk_type=None,
         tags=None,
+        polling=True,
     ):
         """Update Disk."""
         if disk_size:
@@ -483,37 +762,28 @@ class AzureAPIClient:
             resource_group_name=resource_group_name,
             disk_name=disk.name,
             disk=disk,
+            polling=self._get_polling_method(polling),
         )
 
         return operation.result()
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
-    @retry(
-        stop_max_attempt_number=VM_DISK_DETACH_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_vm_disk_detach_error,
-    )
-    def delete_disk(self, disk_name, resource_group_name):
+    @retry(VM_DISK_DETACH_RETRY_POLICY, CONNECTION_ERROR_RETRY_POLICY)
+    def delete_disk(self, disk_name, resource_group_name, polling=True):
         """Delete Managed Disk.
 
         :param str disk_name:
         :param str resource_group_name:
+        :param polling: polling method of the long running operation
         :return:
         """
         operation = self._compute_client.disks.delete(
-            resource_group_name=resource_group_name, disk_name=disk_name
+            resource_group_name=resource_group_name,
+            disk_name=disk_name,
+            polling=self._get_polling_method(polling),
         )
-        return operation.wait()
+        return operation.result()
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def create_file(
         self,
         resource_group_name,
@@ -533,24 +803,25 @@ class AzureAPIClient:
         :param bytes file_content: file content to be saved
         :return:
         """
-        file_service = self._get_file_service(
+
+        def create_file(services):
+            services.file_service.create_share(
+                share_name=share_name, fail_on_exist=False
+            )
+            services.file_service.create_file_from_bytes(
+                share_name=share_name,
+                directory_name=directory_name,
+                file_name=file_name,
+                file=file_content,
+            )
+
+        self._call_storage_account_services(
             resource_group_name=resource_group_name,
             storage_account_name=storage_account_name,
+            func=create_file,
         )
 
-        file_service.create_share(share_name=share_name, fail_on_exist=False)
-        file_service.create_file_from_bytes(
-            share_name=share_name,
-            directory_name=directory_name,
-            file_name=file_name,
-            file=file_content,
-        )
-
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def get_file(
         self,
         resource_group_name,
@@ -568,22 +839,25 @@ class AzureAPIClient:
         :param str file_name: file name within directory
         :return:
         """
-        file_service = self._get_file_service(
+        return self._call_storage_account_services(
             resource_group_name=resource_group_name,
             storage_account_name=storage_account_name,
+            func=lambda services: services.file_service.get_file_to_text(
+                share_name=share_name,
+                directory_name=directory_name,
+                file_name=file_name,
+            ).content,
         )
 
-        return file_service.get_file_to_text(
-            share_name=share_name, directory_name=directory_name, file_name=file_name
-        ).content
-
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def create_network_security_group(
-        self, network_security_group_name, resource_group_name, region, tags
+        self,
+        network_security_group_name,
+        resource_group_name,
+        region,
+        tags,
+        security_rules=None,
+        polling=True,
     ):
         """Create Network Security Group.
 
@@ -591,25 +865,26 @@ class AzureAPIClient:
         :param str resource_group_name:
         :param str region:
         :param dict[str, str] tags:
+        :param list[SecurityRule] security_rules:
+        :param polling: polling method of the long running operation
         :return:
         """
-        nsg_model = network_models.NetworkSecurityGroup(location=region, tags=tags)
+        nsg_model = network_models.NetworkSecurityGroup(
+            location=region, tags=tags, security_rules=security_rules
+        )
 
         operation_poller = (
             self._network_client.network_security_groups.create_or_update(  # noqa: E501
                 resource_group_name=resource_group_name,
                 network_security_group_name=network_security_group_name,
                 parameters=nsg_model,
+                polling=self._get_polling_method(polling),
             )
         )
 
         return operation_poller.result()
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def get_network_security_group(
         self, network_security_group_name, resource_group_name
     ):
@@ -619,34 +894,69 @@ class AzureAPIClient:
         :param str resource_group_name:
         :return:
         """
-        return self._network_client.network_security_groups.get(
-            resource_group_name=resource_group_name,
+        return self._get_if_none_match(
+            resource_type="network_security_group",
+            get_resource=partial(
+                self._network_client.network_security_groups.get,
+                resource_group_name=resource_group_name,
+                network_security_group_name=network_security_group_name,
+            ),
             network_security_group_name=network_security_group_name,
+            resource_group_name=resource_group_name,
         )
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @retry(ANOTHER_OPERATION_IN_PROGRESS_RETRY_POLICY, CONNECTION_ERROR_RETRY_POLICY)
+    def update_network_security_group(
+        self, network_security_group, resource_group_name, etag=None, polling=True
+    ):
+        """Update Network Security Group.
+
+        :param NetworkSecurityGroup network_security_group:
+        :param str resource_group_name:
+        :param str etag: update NSG only if it wasn't changed since it was read
+        :param polling: polling method of the long running operation
+        :return:
+        """
+        custom_headers = {"If-Match": etag} if etag else None
+
+        operation_poller = (
+            self._network_client.network_security_groups.create_or_update(  # noqa: E501
+                resource_group_name=resource_group_name,
+                network_security_group_name=network_security_group.name,
+                parameters=network_security_group,
+                custom_headers=custom_headers,
+                polling=self._get_polling_method(polling),
+            )
+        )
+
+        return operation_poller.result()
+
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def delete_network_security_group(
-        self, network_security_group_name, resource_group_name, wait_for_result=False
+        self,
+        network_security_group_name,
+        resource_group_name,
+        wait_for_result=False,
+        polling=True,
     ):
         """Delete Network Security Group.
 
         :param str network_security_group_name:
         :param str resource_group_name:
         :param bool wait_for_result:
+        :param polling: polling method of the long running operation
         :return:
         """
         operation_poller = self._network_client.network_security_groups.delete(
             resource_group_name=resource_group_name,
             network_security_group_name=network_security_group_name,
+            polling=self._get_polling_method(polling),
         )
 
         if wait_for_result:
-            return operation_poller.wait()
+            return operation_poller.result()
 
+    @single_flight
     def network_security_group_exists(self, nsg_name: str, resource_group_name: str):
         """Check if the network security group exists."""
         try:
@@ -664,11 +974,7 @@ class AzureAPIClient:
 
         return True
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def get_nsg_rules(self, resource_group_name, nsg_name):
         """Get Network Security Group rules.
 
@@ -676,29 +982,20 @@ class AzureAPIClient:
         :param str nsg_name:
         :return:
         """
-        return list(
-            self._network_client.security_rules.list(
-                resource_group_name=resource_group_name,
-                network_security_group_name=nsg_name,
-            )
+        nsg = self.get_network_security_group(
+            network_security_group_name=nsg_name,
+            resource_group_name=resource_group_name,
         )
+        return list(nsg.security_rules or [])
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
-    @retry(
-        stop_max_attempt_number=ANOTHER_OPERATION_IN_PROGRESS_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_another_operation_in_progress_error,
-    )
-    def create_nsg_rule(self, resource_group_name, nsg_name, rule):
+    @retry(ANOTHER_OPERATION_IN_PROGRESS_RETRY_POLICY, CONNECTION_ERROR_RETRY_POLICY)
+    def create_nsg_rule(self, resource_group_name, nsg_name, rule, polling=True):
         """Create Network Security Group rule.
 
         :param str resource_group_name:
         :param str nsg_name: Network Security Group name on the Azure
         :param cloudshell.cp.azure.models.rule_data.RuleData rule:
+        :param polling: polling method of the long running operation
         :rtype: azure.mgmt.network.models.SecurityRule
         """
         operation_poller = self._network_client.security_rules.create_or_update(
@@ -706,22 +1003,19 @@ class AzureAPIClient:
             network_security_group_name=nsg_name,
             security_rule_name=rule.name,
             security_rule_parameters=rule,
+            polling=self._get_polling_method(polling),
         )
 
         return operation_poller.result()
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
-    @retry(
-        stop_max_attempt_number=ANOTHER_OPERATION_IN_PROGRESS_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_another_operation_in_progress_error,
-    )
+    @retry(ANOTHER_OPERATION_IN_PROGRESS_RETRY_POLICY, CONNECTION_ERROR_RETRY_POLICY)
     def delete_nsg_rule(
-        self, resource_group_name, nsg_name, rule_name, wait_for_result=False
+        self,
+        resource_group_name,
+        nsg_name,
+        rule_name,
+        wait_for_result=False,
+        polling=True,
     ):
         """Delete Network Security Group rule.
 
@@ -729,26 +1023,24 @@ class AzureAPIClient:
         :param str nsg_name:
         :param str rule_name:
         :param bool wait_for_result:
+        :param polling: polling method of the long running operation
         """
         operation_poller = self._network_client.security_rules.delete(
             resource_group_name=resource_group_name,
             network_security_group_name=nsg_name,
             security_rule_name=rule_name,
+            polling=self._get_polling_method(polling),
         )
 
         if wait_for_result:
-            operation_poller.wait()
+            operation_poller.result()
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
-    @retry(
-        stop_max_attempt_number=ANOTHER_OPERATION_IN_PROGRESS_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_another_operation_in_progress_error,
+    @invalidates_cache(
+        "virtual_network",
+        virtual_network_name="vnet_name",
+        resource_group_name="resource_group_name",
     )
+    @retry(ANOTHER_OPERATION_IN_PROGRESS_RETRY_POLICY, CONNECTION_ERROR_RETRY_POLICY)
     def create_subnet(
         self,
         subnet_name,
@@ -757,6 +1049,7 @@ class AzureAPIClient:
         resource_group_name,
         network_security_group=None,
         wait_for_result=False,
+        polling=True,
     ):
         """Create Subnet.
 
@@ -766,6 +1059,7 @@ class AzureAPIClient:
         :param str resource_group_name:
         :param network_security_group:
         :param bool wait_for_result:
+        :param polling: polling method of the long running operation
         """
         operation_poller = self._network_client.subnets.create_or_update(
             resource_group_name=resource_group_name,
@@ -774,16 +1068,13 @@ class AzureAPIClient:
             subnet_parameters=network_models.Subnet(
                 address_prefix=cidr, network_security_group=network_security_group
             ),
+            polling=self._get_polling_method(polling),
         )
 
         if wait_for_result:
             return operation_poller.result()
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def get_subnet(self, subnet_name, vnet_name, resource_group_name):
         """Get Subnet.
 
@@ -798,11 +1089,7 @@ class AzureAPIClient:
             subnet_name=subnet_name,
         )
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def get_resource_by_id(self, resource_id):
         """Get Subnet by its Id.
 
@@ -814,11 +1101,7 @@ class AzureAPIClient:
             api_version=self._resource_client.resources.api_version,
         )
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def get_resource_by_tag(self, tag_name, tag_value=None, unique=True):
         """Get resource by specific tag/value.
 
@@ -846,13 +1129,20 @@ class AzureAPIClient:
 
         return resources[0]
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
+    @invalidates_cache(
+        "virtual_network",
+        virtual_network_name="vnet_name",
+        resource_group_name="resource_group_name",
     )
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def update_subnet(
-        self, subnet_name, vnet_name, subnet, resource_group_name, wait_for_result=False
+        self,
+        subnet_name,
+        vnet_name,
+        subnet,
+        resource_group_name,
+        wait_for_result=False,
+        polling=True,
     ):
         """Update Subnet.
 
@@ -861,6 +1151,7 @@ class AzureAPIClient:
         :param subnet:
         :param str resource_group_name:
         :param bool wait_for_result:
+        :param polling: polling method of the long running operation
         :return:
         """
         operation_poller = self._network_client.subnets.create_or_update(
@@ -868,41 +1159,36 @@ class AzureAPIClient:
             virtual_network_name=vnet_name,
             subnet_name=subnet_name,
             subnet_parameters=subnet,
+            polling=self._get_polling_method(polling),
         )
 
         if wait_for_result:
             return operation_poller.result()
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
+    @invalidates_cache(
+        "virtual_network",
+        virtual_network_name="vnet_name",
+        resource_group_name="resource_group_name",
     )
-    @retry(
-        stop_max_attempt_number=ANOTHER_OPERATION_IN_PROGRESS_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_another_operation_in_progress_error,
-    )
-    def delete_subnet(self, subnet_name, vnet_name, resource_group_name):
+    @retry(ANOTHER_OPERATION_IN_PROGRESS_RETRY_POLICY, CONNECTION_ERROR_RETRY_POLICY)
+    def delete_subnet(self, subnet_name, vnet_name, resource_group_name, polling=True):
         """Delete Subnet.
 
         :param str subnet_name:
         :param str vnet_name:
         :param str resource_group_name:
+        :param polling: polling method of the long running operation
         :return:
         """
         result = self._network_client.subnets.delete(
             resource_group_name=resource_group_name,
             virtual_network_name=vnet_name,
             subnet_name=subnet_name,
+            polling=self._get_polling_method(polling),
         )
-        result.wait()
+        result.result()
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def _get_vm_image_latest_version_name(self, region, publisher_name, offer, sku):
         """Get latest version name of the VM image.
 
@@ -917,11 +1203,8 @@ class AzureAPIClient:
         )
         return image_resources[-1].name
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @cached("marketplace_image")
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def get_latest_virtual_machine_image(self, region, publisher_name, offer, sku):
         """Get latest version of the VM image.
 
@@ -942,11 +1225,27 @@ class AzureAPIClient:
             version=latest_version,
         )
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @cached("marketplace_image_version")
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
+    def get_virtual_machine_image(self, region, publisher_name, offer, sku, version):
+        """Get VM image of the given version.
+
+        :param str region:
+        :param str publisher_name:
+        :param str offer:
+        :param str sku:
+        :param str version:
+        """
+        return self._compute_client.virtual_machine_images.get(
+            location=region,
+            publisher_name=publisher_name,
+            offer=offer,
+            skus=sku,
+            version=version,
+        )
+
+    @cached("custom_image")
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def get_custom_virtual_machine_image(self, image_name, resource_group_name):
         """Get custom virtual machine image.
 
@@ -958,11 +1257,8 @@ class AzureAPIClient:
             resource_group_name=resource_group_name, image_name=image_name
         )
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @cached("gallery_image")
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def get_gallery_machine_image(
         self, resource_group, gallery_name, gallery_image_name, subscription_id=None
     ):
@@ -974,12 +1270,10 @@ class AzureAPIClient:
         :param str subscription_id:
         :return:
         """
-        if subscription_id and subscription_id != self._azure_subscription_id:
-            compute_client = ComputeManagementClient(
-                credentials=self._credentials, subscription_id=subscription_id
-            )
-        else:
-            compute_client = self._compute_client
+        compute_client = self._get_management_client(
+            client_class=compute.ComputeManagementClient,
+            subscription_id=subscription_id or self._azure_subscription_id,
+        )
 
         return compute_client.gallery_images.get(
             resource_group_name=resource_group,
@@ -987,11 +1281,8 @@ class AzureAPIClient:
             gallery_image_name=gallery_image_name,
         )
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @cached("gallery_image_version")
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def get_gallery_machine_image_version(
         self,
         resource_group,
@@ -1009,12 +1300,10 @@ class AzureAPIClient:
         :param str subscription_id:
         :return:
         """
-        if subscription_id and subscription_id != self._azure_subscription_id:
-            compute_client = ComputeManagementClient(
-                credentials=self._credentials, subscription_id=subscription_id
-            )
-        else:
-            compute_client = self._compute_client
+        compute_client = self._get_management_client(
+            client_class=compute.ComputeManagementClient,
+            subscription_id=subscription_id or self._azure_subscription_id,
+        )
 
         return compute_client.gallery_image_versions.get(
             resource_group_name=resource_group,
@@ -1023,11 +1312,7 @@ class AzureAPIClient:
             gallery_image_name=gallery_image_name,
         )
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def create_public_ip(
         self,
         public_ip_name,
@@ -1035,6 +1320,7 @@ class AzureAPIClient:
         region,
         public_ip_allocation_method,
         tags,
+        polling=True,
     ):
         """Create Public IP address.
 
@@ -1043,6 +1329,7 @@ class AzureAPIClient:
         :param str region:
         :param str public_ip_allocation_method:
         :param dict[str, str] tags:
+        :param polling: polling method of the long running operation
         :return:
         """
         operation_poller = self._network_client.public_ip_addresses.create_or_update(
@@ -1054,20 +1341,12 @@ class AzureAPIClient:
                 idle_timeout_in_minutes=self.CREATE_PUBLIC_IP_TIMEOUT_IN_MINUTES,
                 tags=tags,
             ),
+            polling=self._get_polling_method(polling),
         )
 
         return operation_poller.result()
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
-    @retry(
-        stop_max_attempt_number=RETRYABLE_ERROR_MAX_ATTEMPTS,
-        wait_fixed=RETRYABLE_WAIT_TIME,
-        retry_on_exception=retry_on_retryable_error,
-    )
+    @retry(RETRYABLE_ERROR_RETRY_POLICY, CONNECTION_ERROR_RETRY_POLICY)
     def create_network_interface(
         self,
         interface_name,
@@ -1080,6 +1359,7 @@ class AzureAPIClient:
         tags,
         public_ip_address=None,
         private_ip_address=None,
+        polling=True,
     ):
         """Create VM Network interface.
 
@@ -1093,9 +1373,10 @@ class AzureAPIClient:
         :param network_security_group:
         :param dict[str, str] tags:
         :param str private_ip_address:
+        :param polling: polling method of the long running operation
         :return:
         """
-        ip_config = NetworkInterfaceIPConfiguration(
+        ip_config = network_models.NetworkInterfaceIPConfiguration(
             name=self.NETWORK_INTERFACE_IP_CONFIG_NAME,
             private_ip_allocation_method=private_ip_allocation_method,
             subnet=subnet,
@@ -1103,7 +1384,7 @@ class AzureAPIClient:
             public_ip_address=public_ip_address,
         )
 
-        network_interface = NetworkInterface(
+        network_interface = network_models.NetworkInterface(
             location=region,
             network_security_group=network_security_group,
             ip_configurations=[ip_config],
@@ -1115,15 +1396,12 @@ class AzureAPIClient:
             resource_group_name=resource_group_name,
             network_interface_name=interface_name,
             parameters=network_interface,
+            polling=self._get_polling_method(polling),
         )
 
         return operation_poller.result()
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def get_public_ip(self, public_ip_name, resource_group_name):
         """Get Public IP address object.
 
@@ -1136,11 +1414,7 @@ class AzureAPIClient:
             public_ip_address_name=public_ip_name,
         )
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def get_network_interface(self, interface_name, resource_group_name):
         """Get VM Network interface.
 
@@ -1153,35 +1427,31 @@ class AzureAPIClient:
             network_interface_name=interface_name,
         )
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
-    def delete_network_interface(self, interface_name, resource_group_name):
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
+    def delete_network_interface(
+        self, interface_name, resource_group_name, polling=True
+    ):
         """Delete VM Network interface.
 
         :param str interface_name:
         :param str resource_group_name:
+        :param polling: polling method of the long running operation
         :return:
         """
         return self._network_client.network_interfaces.delete(
             resource_group_name=resource_group_name,
             network_interface_name=interface_name,
+            polling=self._get_polling_method(polling),
         )
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
-    @retry(
-        stop_max_attempt_number=RETRYABLE_ERROR_MAX_ATTEMPTS,
-        wait_fixed=RETRYABLE_WAIT_TIME,
-        retry_on_exception=retry_on_retryable_error,
-    )
+    @retry(RETRYABLE_ERROR_RETRY_POLICY, CONNECTION_ERROR_RETRY_POLICY)
     def create_or_update_virtual_machine(
-        self, vm_name, virtual_machine, resource_group_name, wait_for_result=True
+        self,
+        vm_name,
+        virtual_machine,
+        resource_group_name,
+        wait_for_result=True,
+        polling=True,
     ):
         """Create/update Virtual Machine.
 
@@ -1189,12 +1459,14 @@ class AzureAPIClient:
         :param virtual_machine:
         :param str resource_group_name:
         :param bool wait_for_result:
+        :param polling: polling method of the long running operation
         :return:
         """
         operation_poller = self._compute_client.virtual_machines.create_or_update(
             resource_group_name=resource_group_name,
             vm_name=vm_name,
             parameters=virtual_machine,
+            polling=self._get_polling_method(polling),
         )
 
         if wait_for_result:
@@ -1202,11 +1474,7 @@ class AzureAPIClient:
 
         return operation_poller
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def create_linux_vm_script_extension(
         self,
         script_file_path,
@@ -1216,6 +1484,7 @@ class AzureAPIClient:
         region,
         tags,
         wait_for_result=True,
+        polling=True,
     ):
         """Create Linux VM Script Extension.
 
@@ -1226,6 +1495,7 @@ class AzureAPIClient:
         :param str region:
         :param dict[str, str] tags:
         :param bool wait_for_result:
+        :param polling: polling method of the long running operation
         :return:
         """
         file_uris = [file_uri.strip() for file_uri in script_file_path.split(",")]
@@ -1244,6 +1514,7 @@ class AzureAPIClient:
             vm_name=vm_name,
             vm_extension_name=vm_name,
             extension_parameters=vm_extension,
+            polling=self._get_polling_method(polling),
         )
 
         if wait_for_result:
@@ -1251,11 +1522,7 @@ class AzureAPIClient:
 
         return operation_poller
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def create_windows_vm_script_extension(
         self,
         script_file_path,
@@ -1265,6 +1532,7 @@ class AzureAPIClient:
         region,
         tags,
         wait_for_result=True,
+        polling=True,
     ):
         """Create Windows VM Script Extension.
 
@@ -1275,6 +1543,7 @@ class AzureAPIClient:
         :param str region:
         :param dict[str, str] tags:
         :param bool wait_for_result:
+        :param polling: polling method of the long running operation
         :return:
         """
         file_name = script_file_path.split("/")[-1]
@@ -1297,6 +1566,7 @@ class AzureAPIClient:
             vm_name=vm_name,
             vm_extension_name=vm_name,
             extension_parameters=vm_extension,
+            polling=self._get_polling_method(polling),
         )
 
         if wait_for_result:
@@ -1304,11 +1574,7 @@ class AzureAPIClient:
 
         return operation_poller
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
     def get_vm(self, vm_name, resource_group_name):
         """Get Virtual Machine.
 
@@ -1320,94 +1586,87 @@ class AzureAPIClient:
             vm_name=vm_name, resource_group_name=resource_group_name
         )
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
-    def start_vm(self, vm_name, resource_group_name, wait_for_result=True):
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
+    def start_vm(
+        self, vm_name, resource_group_name, wait_for_result=True, polling=True
+    ):
         """Start Virtual Machine.
 
         :param str vm_name:
         :param str resource_group_name:
         :param bool wait_for_result:
+        :param polling: polling method of the long running operation
         :return:
         """
         operation_poller = self._compute_client.virtual_machines.start(
-            resource_group_name=resource_group_name, vm_name=vm_name
+            resource_group_name=resource_group_name,
+            vm_name=vm_name,
+            polling=self._get_polling_method(polling),
         )
         if wait_for_result:
             return operation_poller.result()
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
-    def stop_vm(self, vm_name, resource_group_name, wait_for_result=True):
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
+    def stop_vm(self, vm_name, resource_group_name, wait_for_result=True, polling=True):
         """Stop Virtual Machine.
 
         :param str vm_name:
         :param str resource_group_name:
         :param bool wait_for_result:
+        :param polling: polling method of the long running operation
         :return:
         """
         operation_poller = self._compute_client.virtual_machines.deallocate(
-            resource_group_name=resource_group_name, vm_name=vm_name
+            resource_group_name=resource_group_name,
+            vm_name=vm_name,
+            polling=self._get_polling_method(polling),
         )
         if wait_for_result:
             return operation_poller.result()
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
-    def delete_vm(self, vm_name, resource_group_name):
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
+    def delete_vm(self, vm_name, resource_group_name, polling=True):
         """Delete Virtual Machine.
 
         :param str vm_name:
         :param str resource_group_name:
+        :param polling: polling method of the long running operation
         :return:
         """
         result = self._compute_client.virtual_machines.delete(
-            resource_group_name=resource_group_name, vm_name=vm_name
+            resource_group_name=resource_group_name,
+            vm_name=vm_name,
+            polling=self._get_polling_method(polling),
         )
-        result.wait()
+        result.result()
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
-    @retry(
-        stop_max_attempt_number=PUBLIC_IP_DETACH_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_public_ip_detach_error,
-    )
-    def delete_public_ip(self, public_ip_name: str, resource_group_name: str):
+    @retry(PUBLIC_IP_DETACH_RETRY_POLICY, CONNECTION_ERROR_RETRY_POLICY)
+    def delete_public_ip(
+        self, public_ip_name: str, resource_group_name: str, polling=True
+    ):
         result = self._network_client.public_ip_addresses.delete(
             public_ip_address_name=public_ip_name,
             resource_group_name=resource_group_name,
+            polling=self._get_polling_method(polling),
         )
-        result.wait()
+        result.result()
 
-    @retry(
-        stop_max_attempt_number=RETRYING_STOP_MAX_ATTEMPT_NUMBER,
-        wait_fixed=RETRYING_WAIT_FIXED,
-        retry_on_exception=retry_on_connection_error,
-    )
-    def create_route_table(self, resource_group_name, route_table_name, route_table):
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
+    def create_route_table(
+        self, resource_group_name, route_table_name, route_table, polling=True
+    ):
         """Create Route Table.
 
         :param str resource_group_name:
         :param str route_table_name:
         :param route_table:
+        :param polling: polling method of the long running operation
         :return:
         """
         operation_poller = self._network_client.route_tables.create_or_update(
             resource_group_name=resource_group_name,
             route_table_name=route_table_name,
             parameters=route_table,
+            polling=self._get_polling_method(polling),
         )
         return operation_poller.result()
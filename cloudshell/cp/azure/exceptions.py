@@ -32,3 +32,11 @@ class NoFreeDiskLunException(BaseAzureException):
 
 class ReconfigureVMException(BaseAzureException):
     pass
+
+
+class NoFreeNSGRulePriorityException(BaseAzureException):
+    pass
+
+
+class UnsupportedSSHKeyTypeException(BaseAzureException):
+    pass
@@ -120,14 +120,20 @@ class AzureAppSecurityGroupsFlow(AbstractAppSecurityGroupsFlow):
 
                 dst_ip_address = private_ips_map.get(subnet_name)
                 for rule in security_group_config.rules:
-                    nsg_actions.create_custom_nsg_rule(
-                        vm_name=vm_name,
-                        resource_group_name=vm_resource_group_name,
-                        nsg_name=vm_nsg_name,
-                        src_address=rule.source,
-                        dst_address=dst_ip_address,
-                        dst_port_from=rule.from_port,
-                        dst_port_to=rule.to_port,
-                        protocol=rule.protocol,
-                        rule_priority=rules_priority_generator.get_priority(),
-                    )
+                    rule_priority = rules_priority_generator.get_priority()
+
+                    try:
+                        nsg_actions.create_custom_nsg_rule(
+                            vm_name=vm_name,
+                            resource_group_name=vm_resource_group_name,
+                            nsg_name=vm_nsg_name,
+                            src_address=rule.source,
+                            dst_address=dst_ip_address,
+                            dst_port_from=rule.from_port,
+                            dst_port_to=rule.to_port,
+                            protocol=rule.protocol,
+                            rule_priority=rule_priority,
+                        )
+                    except Exception:
+                        rules_priority_generator.release_priority(rule_priority)
+                        raise
@@ -15,6 +15,7 @@ from cloudshell.cp.azure.actions.network_security_group import (
 )
 from cloudshell.cp.azure.actions.resource_group import ResourceGroupActions
 from cloudshell.cp.azure.actions.storage_account import StorageAccountActions
+from cloudshell.cp.azure.utils.vnet_address_index import VirtualNetworkAddressIndexCache
 
 
 class AzureCleanupSandboxInfraFlow(AbstractCleanupSandboxInfraFlow):
@@ -35,13 +36,12 @@ class AzureCleanupSandboxInfraFlow(AbstractCleanupSandboxInfraFlow):
     def _find_sandbox_subnets(
         self, resource_group_name: str, sandbox_vnet: network_models.VirtualNetwork
     ) -> typing.List[network_models.Subnet]:
-        """Find the sandbox subnet in the vNet."""
-        # todo: rework this using some special tags ?
-        return [
-            subnet
-            for subnet in sandbox_vnet.subnets
-            if subnet.name.startswith(resource_group_name)
-        ]
+        """Find the sandbox subnets in the vNet."""
+        return (
+            VirtualNetworkAddressIndexCache()
+            .get_index(sandbox_vnet)
+            .get_reservation_subnets(resource_group_name)
+        )
 
     def cleanup_sandbox_infra(self, request_actions):
         """Cleanp Sandbox Infra.
@@ -71,10 +71,12 @@ class AzureCleanupSandboxInfraFlow(AbstractCleanupSandboxInfraFlow):
         sandbox_vnet = network_actions.get_sandbox_virtual_network(
             resource_group_name=self._resource_config.management_group_name,
             sandbox_vnet_name=self._resource_config.sandbox_vnet_name,
+            fresh=True,
         )
 
         cleanup_commands = []
 
+        # fresh sandbox vNet was cached by the previous call
         for subnet in network_actions.get_sandbox_subnets(
             resource_group_name=resource_group_name,
             mgmt_resource_group_name=self._resource_config.management_group_name,
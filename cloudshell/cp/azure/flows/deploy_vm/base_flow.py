@@ -1,4 +1,5 @@
 import typing
+from functools import partial
 
 from azure.mgmt.compute import models as compute_models
 from cloudshell.cp.core.flows.deploy import AbstractDeployFlow
@@ -7,6 +8,7 @@ from cloudshell.cp.core.request_actions.models import Attribute, DeployAppResult
 from cloudshell.cp.azure.actions.network import NetworkActions
 from cloudshell.cp.azure.actions.network_security_group import (
     NetworkSecurityGroupActions,
+    NSGRulesSetBuilder,
 )
 from cloudshell.cp.azure.actions.storage_account import StorageAccountActions
 from cloudshell.cp.azure.actions.validation import ValidationActions
@@ -24,6 +26,7 @@ from cloudshell.cp.azure.exceptions import (
 from cloudshell.cp.azure.flows.deploy_vm import commands
 from cloudshell.cp.azure.utils import name_generator
 from cloudshell.cp.azure.utils.azure_task_waiter import AzureTaskWaiter
+from cloudshell.cp.azure.utils.commands_graph import RollbackCommandsGraph
 from cloudshell.cp.azure.utils.cs_reservation_output import CloudShellReservationOutput
 from cloudshell.cp.azure.utils.disks import (
     convert_cs_to_azure_os_disk_type,
@@ -38,6 +41,10 @@ from cloudshell.cp.azure.utils.tags import AzureTagsManager
 
 
 class BaseAzureDeployVMFlow(AbstractDeployFlow):
+    DEPLOY_MAX_WORKERS = 5
+    VM_INTERFACES_MAX_WORKERS = 4
+    DATA_DISKS_MAX_WORKERS = 4
+
     def __init__(
         self,
         resource_config,
@@ -112,6 +119,34 @@ class BaseAzureDeployVMFlow(AbstractDeployFlow):
         """
         pass
 
+    def _get_image_data_disks(self, deploy_app):
+        """Get predefined data disks of the VM image.
+
+        Returns None if the data disks layout of the image is unknown.
+
+        :param deploy_app:
+        :return:
+        """
+        pass
+
+    def _find_image_data_disks(self, deploy_app):
+        """Find predefined data disks of the VM image.
+
+        Returns None if the image can't be fetched, so the data disks are attached
+        by the VM reconfiguration after its deployment.
+
+        :param deploy_app:
+        :return:
+        """
+        try:
+            return self._get_image_data_disks(deploy_app=deploy_app)
+        except Exception:
+            self._logger.warning(
+                "Unable to get predefined data disks of the VM image, data disks "
+                "will be attached after the VM deployment",
+                exc_info=True,
+            )
+
     def _prepare_vm_details_data(self, deployed_vm, vm_resource_group_name):
         """Prepare VM Details data.
 
@@ -172,42 +207,53 @@ class BaseAzureDeployVMFlow(AbstractDeployFlow):
         )
 
     def _create_vm_nsg(
-        self, vm_resource_group_name: str, vm_name: str, tags: typing.Dict[str, str]
+        self,
+        deploy_app,
+        vm_resource_group_name: str,
+        vm_name: str,
+        tags: typing.Dict[str, str],
     ):
-        """Create VM Network Security Group."""
-        nsg_actions = NetworkSecurityGroupActions(
+        """Create VM Network Security Group with all its NSG rules."""
+        nsg_rules_builder = NSGRulesSetBuilder(
             azure_client=self._azure_client, logger=self._logger
         )
-
-        return commands.CreateVMNSGCommand(
+        # create NSG command before the NSG rules ones to keep the rollback order
+        create_nsg_command = commands.CreateVMNSGCommand(
             rollback_manager=self._rollback_manager,
             cancellation_manager=self._cancellation_manager,
-            nsg_actions=nsg_actions,
+            nsg_actions=nsg_rules_builder,
             vm_name=vm_name,
             vm_resource_group_name=vm_resource_group_name,
             region=self._resource_config.region,
             tags=tags,
-        ).execute()
+        )
+
+        self._create_vm_nsg_rules(
+            deploy_app=deploy_app,
+            vm_name=vm_name,
+            nsg_actions=nsg_rules_builder,
+            nsg_name=nsg_rules_builder.prepare_vm_nsg_name(vm_name=vm_name),
+            vm_resource_group_name=vm_resource_group_name,
+        )
+
+        return create_nsg_command.execute()
 
     def _create_vm_nsg_inbound_ports_rules(
         self,
         deploy_app,
         vm_name: str,
-        vm_nsg,
+        nsg_actions,
+        nsg_name: str,
         vm_resource_group_name: str,
         rules_priority_generator,
     ):
         """Create VM NSG rules for the Inbound ports."""
-        nsg_actions = NetworkSecurityGroupActions(
-            azure_client=self._azure_client, logger=self._logger
-        )
-
         for inbound_port in deploy_app.inbound_ports:
             commands.CreateAllowVMInboundPortRuleCommand(
                 rollback_manager=self._rollback_manager,
                 cancellation_manager=self._cancellation_manager,
                 nsg_actions=nsg_actions,
-                nsg_name=vm_nsg.name,
+                nsg_name=nsg_name,
                 vm_name=vm_name,
                 inbound_port=inbound_port,
                 resource_group_name=vm_resource_group_name,
@@ -215,19 +261,20 @@ class BaseAzureDeployVMFlow(AbstractDeployFlow):
             ).execute()
 
     def _create_vm_nsg_additional_mgmt_networks_rules(
-        self, vm_name, vm_nsg, vm_resource_group_name, rules_priority_generator
+        self,
+        vm_name,
+        nsg_actions,
+        nsg_name,
+        vm_resource_group_name,
+        rules_priority_generator,
     ):
         """Create VM NSG rules for the additional MGMT networks."""
-        nsg_actions = NetworkSecurityGroupActions(
-            azure_client=self._azure_client, logger=self._logger
-        )
-
         for mgmt_network in self._resource_config.additional_mgmt_networks:
             commands.CreateAllowAdditionalMGMTNetworkRuleCommand(
                 rollback_manager=self._rollback_manager,
                 cancellation_manager=self._cancellation_manager,
                 nsg_actions=nsg_actions,
-                nsg_name=vm_nsg.name,
+                nsg_name=nsg_name,
                 vm_resource_group_name=vm_resource_group_name,
                 vm_name=vm_name,
                 mgmt_network=mgmt_network,
@@ -235,12 +282,13 @@ class BaseAzureDeployVMFlow(AbstractDeployFlow):
             ).execute()
 
     def _create_vm_nsg_mgmt_vnet_rule(
-        self, vm_nsg, vm_resource_group_name: str, rules_priority_generator
+        self,
+        nsg_actions,
+        nsg_name: str,
+        vm_resource_group_name: str,
+        rules_priority_generator,
     ):
         """Create VM NSG rule for the MGMT vNET."""
-        nsg_actions = NetworkSecurityGroupActions(
-            azure_client=self._azure_client, logger=self._logger
-        )
         network_actions = NetworkActions(
             azure_client=self._azure_client, logger=self._logger
         )
@@ -253,26 +301,27 @@ class BaseAzureDeployVMFlow(AbstractDeployFlow):
                 cancellation_manager=self._cancellation_manager,
                 network_actions=network_actions,
                 nsg_actions=nsg_actions,
-                nsg_name=vm_nsg.name,
+                nsg_name=nsg_name,
                 vm_resource_group_name=vm_resource_group_name,
                 mgmt_resource_group_name=self._resource_config.management_group_name,
                 rules_priority_generator=rules_priority_generator,
             ).execute()
 
     def _create_vm_nsg_sandbox_traffic_rules(
-        self, deploy_app, vm_nsg, vm_resource_group_name, rules_priority_generator
+        self,
+        deploy_app,
+        nsg_actions,
+        nsg_name,
+        vm_resource_group_name,
+        rules_priority_generator,
     ):
         """Create VM NSG rules for the Sandbox traffic."""
         if not deploy_app.allow_all_sandbox_traffic:
-            nsg_actions = NetworkSecurityGroupActions(
-                azure_client=self._azure_client, logger=self._logger
-            )
-
             commands.CreateAllowAzureLoadBalancerRuleCommand(
                 rollback_manager=self._rollback_manager,
                 cancellation_manager=self._cancellation_manager,
                 nsg_actions=nsg_actions,
-                nsg_name=vm_nsg.name,
+                nsg_name=nsg_name,
                 vm_resource_group_name=vm_resource_group_name,
                 rules_priority_generator=rules_priority_generator,
             ).execute()
@@ -281,7 +330,7 @@ class BaseAzureDeployVMFlow(AbstractDeployFlow):
                 rollback_manager=self._rollback_manager,
                 cancellation_manager=self._cancellation_manager,
                 nsg_actions=nsg_actions,
-                nsg_name=vm_nsg.name,
+                nsg_name=nsg_name,
                 vm_resource_group_name=vm_resource_group_name,
                 rules_priority_generator=rules_priority_generator,
             ).execute()
@@ -298,88 +347,92 @@ class BaseAzureDeployVMFlow(AbstractDeployFlow):
         if nsg_actions.network_security_group_exists(
             nsg_name=nsg_name, resource_group_name=sandbox_resource_group_name
         ):
-            with self._lock_manager.get_lock(nsg_name):
-                rules_priority_generator = NSGRulesPriorityGenerator(
-                    nsg_name=nsg_name,
-                    resource_group_name=sandbox_resource_group_name,
-                    include_existing_rules=True,
-                    nsg_actions=nsg_actions,
-                )
+            nsg_rules_builder = NSGRulesSetBuilder(
+                azure_client=self._azure_client, logger=self._logger
+            )
+            # final priorities will be assigned on the Sandbox NSG update
+            rules_priority_generator = NSGRulesPriorityGenerator(
+                nsg_name=nsg_name, resource_group_name=sandbox_resource_group_name
+            )
 
-                for interface in vm_interfaces:
-                    if interface.ip_configurations[0].public_ip_address is not None:
-                        private_ip = interface.ip_configurations[0].private_ip_address
-
-                        for inbound_port in deploy_app.inbound_ports:
-                            commands.CreateAllowSandboxInboundPortRuleCommand(
-                                rollback_manager=self._rollback_manager,
-                                cancellation_manager=self._cancellation_manager,
-                                nsg_actions=nsg_actions,
-                                nsg_name=nsg_name,
-                                vm_name=vm_name,
-                                private_ip=private_ip,
-                                inbound_port=inbound_port,
-                                resource_group_name=sandbox_resource_group_name,
-                                rules_priority_generator=rules_priority_generator,
-                            ).execute()
+            for interface in vm_interfaces:
+                if interface.ip_configurations[0].public_ip_address is not None:
+                    private_ip = interface.ip_configurations[0].private_ip_address
+
+                    for inbound_port in deploy_app.inbound_ports:
+                        commands.CreateAllowSandboxInboundPortRuleCommand(
+                            rollback_manager=self._rollback_manager,
+                            cancellation_manager=self._cancellation_manager,
+                            nsg_actions=nsg_rules_builder,
+                            nsg_name=nsg_name,
+                            vm_name=vm_name,
+                            private_ip=private_ip,
+                            inbound_port=inbound_port,
+                            resource_group_name=sandbox_resource_group_name,
+                            rules_priority_generator=rules_priority_generator,
+                        ).execute()
+
+            if nsg_rules_builder.security_rules:
+                with self._cancellation_manager:
+                    nsg_rules_builder.create_nsg_rules(
+                        nsg_name=nsg_name,
+                        resource_group_name=sandbox_resource_group_name,
+                    )
 
     def _create_vm_nsg_rules(
         self,
         deploy_app,
         vm_name: str,
-        vm_nsg,
+        nsg_actions,
+        nsg_name: str,
         vm_resource_group_name: str,
-        sandbox_resource_group_name: str,
-        vm_interfaces,
     ):
-        """Create all NSG rules for the VM."""
+        """Create all NSG rules in the VM NSG."""
         rules_priority_generator = NSGRulesPriorityGenerator(
-            nsg_name=vm_nsg.name, resource_group_name=vm_resource_group_name
+            nsg_name=nsg_name, resource_group_name=vm_resource_group_name
         )
 
         self._create_vm_nsg_inbound_ports_rules(
             deploy_app=deploy_app,
             vm_name=vm_name,
-            vm_nsg=vm_nsg,
+            nsg_actions=nsg_actions,
+            nsg_name=nsg_name,
             vm_resource_group_name=vm_resource_group_name,
             rules_priority_generator=rules_priority_generator,
         )
 
         self._create_vm_nsg_additional_mgmt_networks_rules(
             vm_name=vm_name,
-            vm_nsg=vm_nsg,
+            nsg_actions=nsg_actions,
+            nsg_name=nsg_name,
             vm_resource_group_name=vm_resource_group_name,
             rules_priority_generator=rules_priority_generator,
         )
 
         self._create_vm_nsg_mgmt_vnet_rule(
-            vm_nsg=vm_nsg,
+            nsg_actions=nsg_actions,
+            nsg_name=nsg_name,
             vm_resource_group_name=vm_resource_group_name,
             rules_priority_generator=rules_priority_generator,
         )
 
         self._create_vm_nsg_sandbox_traffic_rules(
             deploy_app=deploy_app,
-            vm_nsg=vm_nsg,
+            nsg_actions=nsg_actions,
+            nsg_name=nsg_name,
             vm_resource_group_name=vm_resource_group_name,
             rules_priority_generator=rules_priority_generator,
         )
 
-        self._create_sandbox_nsg_inbound_ports_rules(
-            deploy_app=deploy_app,
-            vm_name=vm_name,
-            sandbox_resource_group_name=sandbox_resource_group_name,
-            vm_interfaces=vm_interfaces,
-        )
-
-    def _reconfigure_vm_with_data_disks(
+    def _add_data_disks_to_vm(
         self,
         vm: compute_models.VirtualMachine,
         data_disks: typing.List[compute_models.Disk],
-        vm_resource_group_name: str,
     ):
-        """Add Data Disks to the deployed VM."""
-        vm_actions = VMActions(azure_client=self._azure_client, logger=self._logger)
+        """Add Data Disks to the Storage Profile of the VM."""
+        if vm.storage_profile.data_disks is None:
+            vm.storage_profile.data_disks = []
+
         lun_generator = get_disk_lun_generator(
             existing_disks=vm.storage_profile.data_disks
         )
@@ -403,6 +456,16 @@ class BaseAzureDeployVMFlow(AbstractDeployFlow):
                 )
             )
 
+    def _reconfigure_vm_with_data_disks(
+        self,
+        vm: compute_models.VirtualMachine,
+        data_disks: typing.List[compute_models.Disk],
+        vm_resource_group_name: str,
+    ):
+        """Add Data Disks to the deployed VM."""
+        vm_actions = VMActions(azure_client=self._azure_client, logger=self._logger)
+        self._add_data_disks_to_vm(vm=vm, data_disks=data_disks)
+
         self._logger.info("Starting VM update task...")
         operation_poller = vm_actions.start_create_or_update_vm_task(
             vm_name=vm.name,
@@ -410,7 +473,7 @@ class BaseAzureDeployVMFlow(AbstractDeployFlow):
             resource_group_name=vm_resource_group_name,
         )
 
-        self._logger.exception("Waiting update VM task to be completed...")
+        self._logger.info("Waiting update VM task to be completed...")
         self._task_waiter_manager.wait_for_task(operation_poller)
 
     def _create_data_disks(
@@ -424,22 +487,29 @@ class BaseAzureDeployVMFlow(AbstractDeployFlow):
         storage_actions = StorageAccountActions(
             azure_client=self._azure_client, logger=self._logger
         )
-        data_disks = []
+        disks_graph = RollbackCommandsGraph(
+            max_workers=self.DATA_DISKS_MAX_WORKERS, logger=self._logger
+        )
 
-        for disk_model in deploy_app.data_disks:
-            data_disk = commands.CreateDataDiskCommand(
-                rollback_manager=self._rollback_manager,
-                cancellation_manager=self._cancellation_manager,
-                storage_actions=storage_actions,
-                disk_model=disk_model,
-                vm_resource_group_name=vm_resource_group_name,
-                region=self._resource_config.region,
-                vm_name=vm_name,
-                tags=tags,
-            ).execute()
-            data_disks.append(data_disk)
+        for idx, disk_model in enumerate(deploy_app.data_disks):
+            disks_graph.add_node(
+                name=f"data_disk_{idx}",
+                func=commands.CreateDataDiskCommand(
+                    rollback_manager=self._rollback_manager,
+                    cancellation_manager=self._cancellation_manager,
+                    storage_actions=storage_actions,
+                    disk_model=disk_model,
+                    vm_resource_group_name=vm_resource_group_name,
+                    region=self._resource_config.region,
+                    vm_name=vm_name,
+                    tags=tags,
+                ).execute,
+            )
 
-        return data_disks
+        data_disks = disks_graph.execute()
+        return [
+            data_disks[f"data_disk_{idx}"] for idx in range(len(deploy_app.data_disks))
+        ]
 
     def _get_subnet_attribute(self, subnet, name):
         return next(
@@ -455,7 +525,7 @@ class BaseAzureDeployVMFlow(AbstractDeployFlow):
         self,
         deploy_app,
         connect_subnets,
-        network_security_group,
+        vm_nsg,
         vm_resource_group_name: str,
         sandbox_resource_group_name: str,
         vm_name: str,
@@ -465,7 +535,7 @@ class BaseAzureDeployVMFlow(AbstractDeployFlow):
         network_actions = NetworkActions(
             azure_client=self._azure_client, logger=self._logger
         )
-        network_interfaces = []
+        interface_commands = []
 
         if connect_subnets:
             resource_group = self._resource_config.management_group_name
@@ -500,27 +570,27 @@ class BaseAzureDeployVMFlow(AbstractDeployFlow):
                     name_reqexp=connect_subnet.subnet_id,
                 )
 
-                interface = commands.CreateVMNetworkCommand(
-                    rollback_manager=self._rollback_manager,
-                    cancellation_manager=self._cancellation_manager,
-                    network_actions=network_actions,
-                    interface_name=f"{vm_name}_{idx}",
-                    public_ip_type=deploy_app.public_ip_type,
-                    private_ip_allocation_method=self._resource_config.private_ip_allocation_method,  # noqa: E501
-                    cs_ip_pool_manager=self._cs_ip_pool_manager,
-                    vm_resource_group_name=vm_resource_group_name,
-                    subnet=subnet,
-                    network_security_group=network_security_group,
-                    add_public_ip=all(
-                        [deploy_app.add_public_ip, connect_subnet.is_public()]
-                    ),
-                    reservation_id=self._reservation_info.reservation_id,
-                    enable_ip_forwarding=deploy_app.enable_ip_forwarding,
-                    region=self._resource_config.region,
-                    tags=tags,
-                ).execute()
-
-                network_interfaces.append(interface)
+                interface_commands.append(
+                    commands.CreateVMNetworkCommand(
+                        rollback_manager=self._rollback_manager,
+                        cancellation_manager=self._cancellation_manager,
+                        network_actions=network_actions,
+                        interface_name=f"{vm_name}_{idx}",
+                        public_ip_type=deploy_app.public_ip_type,
+                        private_ip_allocation_method=self._resource_config.private_ip_allocation_method,  # noqa: E501
+                        cs_ip_pool_manager=self._cs_ip_pool_manager,
+                        vm_resource_group_name=vm_resource_group_name,
+                        subnet=subnet,
+                        network_security_group=vm_nsg,
+                        add_public_ip=all(
+                            [deploy_app.add_public_ip, connect_subnet.is_public()]
+                        ),
+                        reservation_id=self._reservation_info.reservation_id,
+                        enable_ip_forwarding=deploy_app.enable_ip_forwarding,
+                        region=self._resource_config.region,
+                        tags=tags,
+                    )
+                )
 
         else:
             sandbox_subnets = network_actions.get_sandbox_subnets(
@@ -535,31 +605,46 @@ class BaseAzureDeployVMFlow(AbstractDeployFlow):
                 )
 
             for idx, subnet in enumerate(sandbox_subnets):
-                interface = commands.CreateVMNetworkCommand(
-                    rollback_manager=self._rollback_manager,
-                    cancellation_manager=self._cancellation_manager,
-                    network_actions=network_actions,
-                    interface_name=f"{vm_name}_{idx}",
-                    public_ip_type=deploy_app.public_ip_type,
-                    private_ip_allocation_method=self._resource_config.private_ip_allocation_method,  # noqa: E501
-                    cs_ip_pool_manager=self._cs_ip_pool_manager,
-                    vm_resource_group_name=vm_resource_group_name,
-                    subnet=subnet,
-                    network_security_group=network_security_group,
-                    add_public_ip=deploy_app.add_public_ip,
-                    reservation_id=self._reservation_info.reservation_id,
-                    enable_ip_forwarding=deploy_app.enable_ip_forwarding,
-                    region=self._resource_config.region,
-                    tags=tags,
-                ).execute()
-
-                network_interfaces.append(interface)
+                interface_commands.append(
+                    commands.CreateVMNetworkCommand(
+                        rollback_manager=self._rollback_manager,
+                        cancellation_manager=self._cancellation_manager,
+                        network_actions=network_actions,
+                        interface_name=f"{vm_name}_{idx}",
+                        public_ip_type=deploy_app.public_ip_type,
+                        private_ip_allocation_method=self._resource_config.private_ip_allocation_method,  # noqa: E501
+                        cs_ip_pool_manager=self._cs_ip_pool_manager,
+                        vm_resource_group_name=vm_resource_group_name,
+                        subnet=subnet,
+                        network_security_group=vm_nsg,
+                        add_public_ip=deploy_app.add_public_ip,
+                        reservation_id=self._reservation_info.reservation_id,
+                        enable_ip_forwarding=deploy_app.enable_ip_forwarding,
+                        region=self._resource_config.region,
+                        tags=tags,
+                    )
+                )
 
-        if not network_interfaces:
+        if not interface_commands:
             raise Exception(
                 f"Unable to prepare network interfaces for the VM {vm_name}"
             )
 
+        # all interfaces are created concurrently, but their order is kept,
+        # so the first interface is always the primary one
+        interfaces_graph = RollbackCommandsGraph(
+            max_workers=self.VM_INTERFACES_MAX_WORKERS, logger=self._logger
+        )
+        for idx, interface_command in enumerate(interface_commands):
+            interfaces_graph.add_node(
+                name=f"interface_{idx}", func=interface_command.execute
+            )
+
+        interfaces = interfaces_graph.execute()
+        network_interfaces = [
+            interfaces[f"interface_{idx}"] for idx in range(len(interface_commands))
+        ]
+
         network_interfaces[0].primary = True
         return network_interfaces
 
@@ -715,38 +800,64 @@ class BaseAzureDeployVMFlow(AbstractDeployFlow):
         )
 
         with self._rollback_manager:
-            vm_nsg = self._create_vm_nsg(
-                vm_resource_group_name=vm_resource_group_name,
-                vm_name=vm_name,
-                tags=tags,
+            deploy_graph = RollbackCommandsGraph(
+                max_workers=self.DEPLOY_MAX_WORKERS, logger=self._logger
             )
-
-            vm_ifaces = self._create_vm_interfaces(
-                deploy_app=deploy_app,
-                connect_subnets=request_actions.connect_subnets,
-                network_security_group=vm_nsg,
-                vm_resource_group_name=vm_resource_group_name,
-                sandbox_resource_group_name=sandbox_resource_group_name,
-                vm_name=vm_name,
-                tags=tags,
+            deploy_graph.add_node(
+                name="vm_nsg",
+                func=partial(
+                    self._create_vm_nsg,
+                    deploy_app=deploy_app,
+                    vm_resource_group_name=vm_resource_group_name,
+                    vm_name=vm_name,
+                    tags=tags,
+                ),
             )
-
-            data_disks = self._create_data_disks(
-                deploy_app=deploy_app,
-                vm_resource_group_name=vm_resource_group_name,
-                vm_name=vm_name,
-                tags=tags,
+            deploy_graph.add_node(
+                name="vm_interfaces",
+                func=partial(
+                    self._create_vm_interfaces,
+                    deploy_app=deploy_app,
+                    connect_subnets=request_actions.connect_subnets,
+                    vm_resource_group_name=vm_resource_group_name,
+                    sandbox_resource_group_name=sandbox_resource_group_name,
+                    vm_name=vm_name,
+                    tags=tags,
+                ),
+                depends_on=["vm_nsg"],
             )
-
-            self._create_vm_nsg_rules(
-                deploy_app=deploy_app,
-                vm_name=vm_name,
-                vm_nsg=vm_nsg,
-                vm_resource_group_name=vm_resource_group_name,
-                sandbox_resource_group_name=sandbox_resource_group_name,
-                vm_interfaces=vm_ifaces,
+            deploy_graph.add_node(
+                name="data_disks",
+                func=partial(
+                    self._create_data_disks,
+                    deploy_app=deploy_app,
+                    vm_resource_group_name=vm_resource_group_name,
+                    vm_name=vm_name,
+                    tags=tags,
+                ),
+            )
+            deploy_graph.add_node(
+                name="sandbox_nsg_rules",
+                func=partial(
+                    self._create_sandbox_nsg_inbound_ports_rules,
+                    deploy_app=deploy_app,
+                    vm_name=vm_name,
+                    sandbox_resource_group_name=sandbox_resource_group_name,
+                ),
+                depends_on=["vm_interfaces"],
             )
 
+            if deploy_app.data_disks:
+                deploy_graph.add_node(
+                    name="image_data_disks",
+                    func=partial(self._find_image_data_disks, deploy_app=deploy_app),
+                )
+
+            deploy_results = deploy_graph.execute()
+            vm_ifaces = deploy_results["vm_interfaces"]
+            data_disks = deploy_results["data_disks"]
+            image_data_disks = deploy_results.get("image_data_disks")
+
             username, password = self._prepare_vm_credentials(
                 deploy_app=deploy_app, image_os=image_os
             )
@@ -763,6 +874,14 @@ class BaseAzureDeployVMFlow(AbstractDeployFlow):
                 tags=tags,
             )
 
+            # we can add data disks directly to the Storage Profile (before the VM
+            # deployment) only if the VM image has no predefined data disks,
+            # otherwise it will not be able to deploy VM
+            attach_data_disks_on_create = data_disks and image_data_disks == []
+
+            if attach_data_disks_on_create:
+                self._add_data_disks_to_vm(vm=vm, data_disks=data_disks)
+
             deployed_vm = self._create_vm(
                 vm_name=vm_name,
                 deploy_app=deploy_app,
@@ -770,10 +889,7 @@ class BaseAzureDeployVMFlow(AbstractDeployFlow):
                 vm_resource_group_name=vm_resource_group_name,
             )
 
-            if data_disks:
-                # we can't add data disks directly to the Storage Profile
-                # (before the VM deployment), because if the VM image has predefined
-                # data disks it will not be able to deploy VM
+            if data_disks and not attach_data_disks_on_create:
                 self._reconfigure_vm_with_data_disks(
                     vm=deployed_vm,
                     data_disks=data_disks,
@@ -86,6 +86,6 @@ class CreateVMNetworkCommand(RollbackCommand):
 
         if self._private_ip_address:
             self._cs_ip_pool_manager.release_ips(
-                reservation_id=self._reservation_info.reservation_id,
+                reservation_id=self._reservation_id,
                 ips=[self._private_ip_address],
             )
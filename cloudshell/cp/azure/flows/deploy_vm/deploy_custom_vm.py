@@ -40,6 +40,21 @@ class AzureDeployCustomVMFlow(BaseAzureDeployVMFlow):
             image_reference=models.ImageReference(id=image_id),
         )
 
+    def _get_image_data_disks(self, deploy_app):
+        """Get predefined data disks of the VM image.
+
+        :param deploy_app:
+        :return:
+        """
+        vm_image_actions = VMImageActions(
+            azure_client=self._azure_client, logger=self._logger
+        )
+
+        return vm_image_actions.get_custom_image_data_disks(
+            image_resource_group_name=deploy_app.azure_resource_group,
+            image_name=deploy_app.azure_image,
+        )
+
     def _prepare_vm_details_data(
         self, deployed_vm: models.VirtualMachine, vm_resource_group_name: str
     ):
@@ -40,6 +40,24 @@ class AzureDeployMarketplaceVMFlow(BaseAzureDeployVMFlow):
             ),
         )
 
+    def _get_image_data_disks(self, deploy_app):
+        """Get predefined data disks of the VM image.
+
+        :param deploy_app:
+        :return:
+        """
+        vm_image_actions = VMImageActions(
+            azure_client=self._azure_client, logger=self._logger
+        )
+
+        return vm_image_actions.get_marketplace_image_data_disks(
+            region=self._resource_config.region,
+            publisher_name=deploy_app.image_publisher,
+            offer=deploy_app.image_offer,
+            sku=deploy_app.image_sku,
+            version=deploy_app.image_version,
+        )
+
     def _prepare_vm_details_data(
         self, deployed_vm: models.VirtualMachine, vm_resource_group_name: str
     ):
@@ -47,6 +47,24 @@ class AzureDeployGalleryImageVMFlow(BaseAzureDeployVMFlow):
             image_reference=models.ImageReference(id=image_id),
         )
 
+    def _get_image_data_disks(self, deploy_app):
+        """Get predefined data disks of the VM image.
+
+        :param deploy_app:
+        :return:
+        """
+        vm_image_actions = VMImageActions(
+            azure_client=self._azure_client, logger=self._logger
+        )
+
+        return vm_image_actions.get_gallery_image_data_disks(
+            gallery_name=deploy_app.shared_image_gallery,
+            gallery_image_name=deploy_app.image_definition,
+            gallery_image_version=deploy_app.image_version,
+            resource_group=deploy_app.shared_gallery_resource_group,
+            subscription_id=deploy_app.shared_gallery_subscription_id,
+        )
+
     def _get_image_purchase_plan(self, deploy_app):
         vm_image_actions = VMImageActions(
             azure_client=self._azure_client, logger=self._logger
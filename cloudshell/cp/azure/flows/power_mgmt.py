@@ -1,7 +1,15 @@
 from cloudshell.cp.azure.actions.vm import VMActions
+from cloudshell.cp.azure.async_azure_client import AsyncAzureAPIClient
+from cloudshell.cp.azure.utils.event_loop import EventLoopThread
 
 
 class AzurePowerManagementFlow:
+    """Power management flow.
+
+    VM start and deallocation are awaited with the AsyncAzureAPIClient on the
+    process-wide event loop.
+    """
+
     def __init__(self, resource_config, azure_client, reservation_info, logger):
         """Init command.
 
@@ -15,6 +23,16 @@ class AzurePowerManagementFlow:
         self._reservation_info = reservation_info
         self._logger = logger
 
+    def _get_vm_actions(self):
+        """Get VM actions that return coroutines of the operations.
+
+        :rtype: VMActions
+        """
+        return VMActions(
+            azure_client=AsyncAzureAPIClient(azure_client=self._azure_client),
+            logger=self._logger,
+        )
+
     def power_on(self, deployed_app):
         """Power On VM.
 
@@ -26,9 +44,11 @@ class AzurePowerManagementFlow:
             deployed_app.resource_group_name or sandbox_resource_group_name
         )
 
-        vm_actions = VMActions(azure_client=self._azure_client, logger=self._logger)
-        vm_actions.start_vm(
-            vm_name=deployed_app.name, resource_group_name=vm_resource_group_name
+        vm_actions = self._get_vm_actions()
+        EventLoopThread().run(
+            vm_actions.start_vm(
+                vm_name=deployed_app.name, resource_group_name=vm_resource_group_name
+            )
         )
 
     def power_off(self, deployed_app):
@@ -42,7 +62,9 @@ class AzurePowerManagementFlow:
             deployed_app.resource_group_name or sandbox_resource_group_name
         )
 
-        vm_actions = VMActions(azure_client=self._azure_client, logger=self._logger)
-        vm_actions.stop_vm(
-            vm_name=deployed_app.name, resource_group_name=vm_resource_group_name
+        vm_actions = self._get_vm_actions()
+        EventLoopThread().run(
+            vm_actions.stop_vm(
+                vm_name=deployed_app.name, resource_group_name=vm_resource_group_name
+            )
         )
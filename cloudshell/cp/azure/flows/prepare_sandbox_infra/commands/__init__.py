@@ -6,6 +6,6 @@ from .create_deny_traffic_from_sandboxes_rule import *  # noqa
 from .create_nsg import *  # noqa
 from .create_resource_group import *  # noqa
 from .create_sandbox_storage_account import *  # noqa
-from .create_subnet import *  # noqa
+from .create_subnets import *  # noqa
 from .save_ssh_private_key import *  # noqa
 from .save_ssh_public_key import *  # noqa
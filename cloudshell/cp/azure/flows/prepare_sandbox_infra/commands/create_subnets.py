@@ -1,17 +1,18 @@
 from cloudshell.cp.azure.utils.rollback import RollbackCommand
 
 
-class CreateSubnetCommand(RollbackCommand):
+class CreateSubnetsCommand(RollbackCommand):
     def __init__(
         self,
         rollback_manager,
         cancellation_manager,
         network_actions,
         vnet,
-        cidr,
+        cidrs,
         resource_group_name,
         mgmt_resource_group_name,
         network_security_group,
+        logger,
     ):
         """Init command.
 
@@ -19,24 +20,26 @@ class CreateSubnetCommand(RollbackCommand):
         :param cancellation_manager:
         :param network_actions:
         :param vnet:
-        :param cidr:
+        :param list[str] cidrs:
         :param resource_group_name:
         :param mgmt_resource_group_name:
         :param network_security_group:
+        :param logging.Logger logger:
         """
         super().__init__(
             rollback_manager=rollback_manager, cancellation_manager=cancellation_manager
         )
         self._network_actions = network_actions
         self._vnet = vnet
-        self._cidr = cidr
+        self._cidrs = cidrs
         self._resource_group_name = resource_group_name
         self._mgmt_resource_group_name = mgmt_resource_group_name
         self._network_security_group = network_security_group
+        self._logger = logger
 
     def _execute(self):
-        return self._network_actions.create_sandbox_subnet(
-            cidr=self._cidr,
+        return self._network_actions.create_sandbox_subnets(
+            cidrs=self._cidrs,
             vnet=self._vnet,
             resource_group_name=self._resource_group_name,
             mgmt_resource_group_name=self._mgmt_resource_group_name,
@@ -44,9 +47,15 @@ class CreateSubnetCommand(RollbackCommand):
         )
 
     def rollback(self):
-        self._network_actions.delete_sandbox_subnet(
-            cidr=self._cidr,
-            vnet_name=self._vnet.name,
-            resource_group_name=self._resource_group_name,
-            mgmt_resource_group_name=self._mgmt_resource_group_name,
-        )
+        for cidr in self._cidrs:
+            try:
+                self._network_actions.delete_sandbox_subnet(
+                    cidr=cidr,
+                    vnet_name=self._vnet.name,
+                    resource_group_name=self._resource_group_name,
+                    mgmt_resource_group_name=self._mgmt_resource_group_name,
+                )
+            except Exception:
+                self._logger.warning(
+                    f"Unable to perform rollback for subnet {cidr}", exc_info=True
+                )
@@ -1,6 +1,14 @@
+from functools import partial
+
 from cloudshell.cp.core.flows.prepare_sandbox_infra import (
     AbstractPrepareSandboxInfraFlow,
 )
+from cloudshell.cp.core.request_actions import DriverResponse
+from cloudshell.cp.core.request_actions.models import (
+    CreateKeysActionResult,
+    PrepareCloudInfraResult,
+    PrepareSubnetActionResult,
+)
 
 from cloudshell.cp.azure.actions.network import NetworkActions
 from cloudshell.cp.azure.actions.network_security_group import (
@@ -9,12 +17,14 @@ from cloudshell.cp.azure.actions.network_security_group import (
 from cloudshell.cp.azure.actions.resource_group import ResourceGroupActions
 from cloudshell.cp.azure.actions.ssh_key_pair import SSHKeyPairActions
 from cloudshell.cp.azure.actions.storage_account import StorageAccountActions
+from cloudshell.cp.azure.actions.vm_image import VMImageActions
 from cloudshell.cp.azure.constants import (
     SUBNET_SERVICE_NAME_ATTRIBUTE,
     VNET_SERVICE_NAME_ATTRIBUTE,
 )
 from cloudshell.cp.azure.exceptions import InvalidAttrException
 from cloudshell.cp.azure.flows.prepare_sandbox_infra import commands
+from cloudshell.cp.azure.utils.commands_graph import RollbackCommandsGraph
 from cloudshell.cp.azure.utils.nsg_rules_priority_generator import (
     NSGRulesPriorityGenerator,
 )
@@ -23,6 +33,9 @@ from cloudshell.cp.azure.utils.tags import AzureTagsManager
 
 
 class AzurePrepareSandboxInfraFlow(AbstractPrepareSandboxInfraFlow):
+    PREPARE_MAX_WORKERS = 5
+    PARALLEL_PREPARE = True
+
     def __init__(
         self,
         resource_config,
@@ -30,6 +43,7 @@ class AzurePrepareSandboxInfraFlow(AbstractPrepareSandboxInfraFlow):
         reservation_info,
         cancellation_manager,
         logger,
+        parallel_prepare=None,
     ):
         """Init command.
 
@@ -38,8 +52,18 @@ class AzurePrepareSandboxInfraFlow(AbstractPrepareSandboxInfraFlow):
         :param reservation_info:
         :param cancellation_manager:
         :param logger:
+        :param bool parallel_prepare: provision all objects that depend only on
+            the Resource Group concurrently with a single rollback, taken from the
+            'Parallel Sandbox Preparation' attribute if not set, enabled by default
         """
         super().__init__(logger=logger)
+
+        if parallel_prepare is None:
+            parallel_prepare = resource_config.parallel_sandbox_preparation
+
+        self._parallel_prepare = (
+            self.PARALLEL_PREPARE if parallel_prepare is None else parallel_prepare
+        )
         self._resource_config = resource_config
         self._azure_client = azure_client
         self._reservation_info = reservation_info
@@ -49,8 +73,145 @@ class AzurePrepareSandboxInfraFlow(AbstractPrepareSandboxInfraFlow):
             reservation_info=self._reservation_info, resource_config=resource_config
         )
 
+    def prepare(self, request_actions):
+        """Prepare Sandbox Infra.
+
+        In the parallel mode Storage Account with the SSH keys, NSG with its rules
+        and subnets are created concurrently once the Resource Group exists.
+        Commands of all steps are rolled back together if any of them fails.
+
+        :param request_actions:
+        :rtype: str
+        """
+        if not self._parallel_prepare:
+            return super().prepare(request_actions=request_actions)
+
+        self.prepare_common_objects(request_actions=request_actions)
+
+        resource_group_name = self._reservation_info.get_resource_group_name()
+        storage_account_name = self._reservation_info.get_storage_account_name()
+        nsg_name = self._reservation_info.get_network_security_group_name()
+        tags = self._tags_manager.get_reservation_tags()
+        ssh_actions = self._get_ssh_actions()
+
+        with self._rollback_manager:
+            prepare_graph = RollbackCommandsGraph(
+                max_workers=self.PREPARE_MAX_WORKERS, logger=self._logger
+            )
+            prepare_graph.add_node(
+                name="cloud_infra",
+                func=partial(self.prepare_cloud_infra, request_actions=request_actions),
+            )
+            prepare_graph.add_node(
+                name="storage_account",
+                func=partial(
+                    self._create_storage_account,
+                    storage_account_name=storage_account_name,
+                    resource_group_name=resource_group_name,
+                    tags=tags,
+                ),
+            )
+            prepare_graph.add_node(
+                name="ssh_key_pair", func=ssh_actions.create_ssh_key_pair
+            )
+            prepare_graph.add_node(
+                name="ssh_keys",
+                func=partial(
+                    self._save_ssh_key_pair,
+                    storage_account_name=storage_account_name,
+                    resource_group_name=resource_group_name,
+                ),
+                depends_on=["storage_account", "ssh_key_pair"],
+            )
+            subnets_dependencies = []
+
+            if not self._all_subnets_are_predefined(request_actions):
+                prepare_graph.add_node(
+                    name="nsg",
+                    func=partial(
+                        self._create_nsg,
+                        nsg_name=nsg_name,
+                        resource_group_name=resource_group_name,
+                        tags=tags,
+                    ),
+                )
+                prepare_graph.add_node(
+                    name="nsg_rules",
+                    func=partial(
+                        self._create_nsg_rules_for_nsg,
+                        request_actions=request_actions,
+                        resource_group_name=resource_group_name,
+                    ),
+                    depends_on=["nsg"],
+                )
+                subnets_dependencies.append("nsg")
+
+            prepare_graph.add_node(
+                name="subnets",
+                func=partial(
+                    self._create_subnets_for_nsg,
+                    request_actions=request_actions,
+                    resource_group_name=resource_group_name,
+                ),
+                depends_on=subnets_dependencies,
+            )
+
+            prepare_results = prepare_graph.execute()
+
+        subnet_ids = prepare_results["subnets"]
+        action_results = [
+            PrepareCloudInfraResult(
+                actionId=request_actions.prepare_cloud_infra.actionId
+            ),
+            CreateKeysActionResult(
+                actionId=request_actions.create_keys.actionId,
+                accessKey=prepare_results["ssh_keys"],
+            ),
+            *[
+                PrepareSubnetActionResult(
+                    actionId=action.actionId, subnetId=subnet_ids.get(action.actionId)
+                )
+                for action in request_actions.prepare_subnets
+            ],
+        ]
+
+        json_data = DriverResponse(action_results).to_driver_response_json()
+        self._logger.debug(f"Prepare sandbox infra details: {json_data}")
+        return json_data
+
+    def _get_ssh_actions(self):
+        """Get SSH key pair actions with the settings of the resource.
+
+        :rtype: SSHKeyPairActions
+        """
+        return SSHKeyPairActions.from_resource_config(
+            azure_client=self._azure_client,
+            resource_config=self._resource_config,
+            logger=self._logger,
+        )
+
+    @staticmethod
+    def _all_subnets_are_predefined(request_actions):
+        """Check whether all requested subnets are predefined ones.
+
+        :param request_actions:
+        :rtype: bool
+        """
+        return all(
+            subnet_action.get_attribute(name=SUBNET_SERVICE_NAME_ATTRIBUTE)
+            for subnet_action in request_actions.prepare_subnets
+        )
+
     def prepare_cloud_infra(self, request_actions):
-        pass
+        """Prepare cloud infra.
+
+        :param request_actions:
+        :return:
+        """
+        vm_image_actions = VMImageActions(
+            azure_client=self._azure_client, logger=self._logger
+        )
+        vm_image_actions.warm_marketplace_images(region=self._resource_config.region)
 
     def prepare_common_objects(self, request_actions):
         """Prepare common objects.
@@ -81,15 +242,9 @@ class AzurePrepareSandboxInfraFlow(AbstractPrepareSandboxInfraFlow):
         nsg_name = self._reservation_info.get_network_security_group_name()
         tags = self._tags_manager.get_reservation_tags()
         nsg = None
-        all_subnets_are_predefined = all(
-            [
-                subnet_action.get_attribute(name=SUBNET_SERVICE_NAME_ATTRIBUTE)
-                for subnet_action in request_actions.prepare_subnets
-            ]
-        )
 
         with self._rollback_manager:
-            if not all_subnets_are_predefined:
+            if not self._all_subnets_are_predefined(request_actions):
                 nsg = self._create_nsg(
                     nsg_name=nsg_name,
                     resource_group_name=resource_group_name,
@@ -126,25 +281,45 @@ class AzurePrepareSandboxInfraFlow(AbstractPrepareSandboxInfraFlow):
                 tags=tags,
             )
 
-            ssh_actions = SSHKeyPairActions(
-                azure_client=self._azure_client, logger=self._logger
-            )
-
-            private_key, public_key = ssh_actions.create_ssh_key_pair()
+            ssh_actions = self._get_ssh_actions()
 
-            self._create_ssh_public_key(
-                public_key=public_key,
+            return self._save_ssh_key_pair(
+                ssh_key_pair=ssh_actions.create_ssh_key_pair(),
                 storage_account_name=storage_account_name,
                 resource_group_name=resource_group_name,
             )
 
-            self._create_ssh_private_key(
-                private_key=private_key,
-                storage_account_name=storage_account_name,
-                resource_group_name=resource_group_name,
-            )
+    def _save_ssh_key_pair(
+        self,
+        ssh_key_pair,
+        storage_account_name,
+        resource_group_name,
+        storage_account=None,
+    ):
+        """Save SSH key pair on the Azure.
+
+        :param tuple[str, str] ssh_key_pair: private and public keys
+        :param str storage_account_name:
+        :param str resource_group_name:
+        :param storage_account: result of the Storage Account creation step
+        :return: SSH private key
+        :rtype: str
+        """
+        private_key, public_key = ssh_key_pair
+
+        self._create_ssh_public_key(
+            public_key=public_key,
+            storage_account_name=storage_account_name,
+            resource_group_name=resource_group_name,
+        )
 
-            return private_key
+        self._create_ssh_private_key(
+            private_key=private_key,
+            storage_account_name=storage_account_name,
+            resource_group_name=resource_group_name,
+        )
+
+        return private_key
 
     def _create_resource_group(self, resource_group_actions, resource_group_name, tags):
         """Create Resource Group.
@@ -372,6 +547,34 @@ class AzurePrepareSandboxInfraFlow(AbstractPrepareSandboxInfraFlow):
             rules_priority_generator=rules_priority_generator,
         )
 
+    def _create_nsg_rules_for_nsg(self, request_actions, resource_group_name, nsg):
+        """Create all required NSG rules in the created NSG.
+
+        :param request_actions:
+        :param str resource_group_name:
+        :param nsg: created Network Security Group
+        :return:
+        """
+        self._create_nsg_rules(
+            request_actions=request_actions,
+            resource_group_name=resource_group_name,
+            nsg_name=nsg.name,
+        )
+
+    def _create_subnets_for_nsg(self, request_actions, resource_group_name, nsg=None):
+        """Create subnets associated with the created NSG.
+
+        :param request_actions:
+        :param str resource_group_name:
+        :param nsg: created Network Security Group
+        :return:
+        """
+        return self._create_subnets(
+            request_actions=request_actions,
+            resource_group_name=resource_group_name,
+            network_security_group=nsg,
+        )
+
     def _create_subnets(
         self, request_actions, resource_group_name, network_security_group=None
     ):
@@ -386,6 +589,7 @@ class AzurePrepareSandboxInfraFlow(AbstractPrepareSandboxInfraFlow):
             azure_client=self._azure_client, logger=self._logger
         )
         subnet_result = {}
+        new_subnet_actions = []
 
         with self._cancellation_manager:
             sandbox_vnet = network_actions.get_sandbox_virtual_network(
@@ -424,19 +628,28 @@ class AzurePrepareSandboxInfraFlow(AbstractPrepareSandboxInfraFlow):
                     sandbox_subnets=subnet_vnet.subnets,
                     name_reqexp=predefined_subnet_name,
                 )
+                subnet_result[subnet_action.actionId] = subnet.name
             else:
-                subnet = commands.CreateSubnetCommand(
-                    rollback_manager=self._rollback_manager,
-                    cancellation_manager=self._cancellation_manager,
-                    network_actions=network_actions,
-                    cidr=subnet_action.get_cidr(),
-                    vnet=subnet_vnet,
-                    resource_group_name=resource_group_name,
-                    mgmt_resource_group_name=resource_group,  # noqa E501
-                    network_security_group=network_security_group,
-                ).execute()
+                new_subnet_actions.append(subnet_action)
 
-            subnet_result[subnet_action.actionId] = subnet.name
+        if new_subnet_actions:
+            # all new subnets are created in the sandbox vNet with one vNet update
+            subnets = commands.CreateSubnetsCommand(
+                rollback_manager=self._rollback_manager,
+                cancellation_manager=self._cancellation_manager,
+                network_actions=network_actions,
+                cidrs=[
+                    subnet_action.get_cidr() for subnet_action in new_subnet_actions
+                ],
+                vnet=sandbox_vnet,
+                resource_group_name=resource_group_name,
+                mgmt_resource_group_name=self._resource_config.management_group_name,
+                network_security_group=network_security_group,
+                logger=self._logger,
+            ).execute()
+
+            for subnet_action, subnet in zip(new_subnet_actions, subnets):
+                subnet_result[subnet_action.actionId] = subnet.name
 
         return subnet_result
 
@@ -472,9 +685,7 @@ class AzurePrepareSandboxInfraFlow(AbstractPrepareSandboxInfraFlow):
         :param str resource_group_name:
         :return:
         """
-        ssh_actions = SSHKeyPairActions(
-            azure_client=self._azure_client, logger=self._logger
-        )
+        ssh_actions = self._get_ssh_actions()
 
         commands.SaveSSHPublicKeyCommand(
             rollback_manager=self._rollback_manager,
@@ -495,9 +706,7 @@ class AzurePrepareSandboxInfraFlow(AbstractPrepareSandboxInfraFlow):
         :param str resource_group_name:
         :return:
         """
-        ssh_actions = SSHKeyPairActions(
-            azure_client=self._azure_client, logger=self._logger
-        )
+        ssh_actions = self._get_ssh_actions()
 
         commands.SaveSSHPrivateKeyCommand(
             rollback_manager=self._rollback_manager,
@@ -5,6 +5,7 @@ from cloudshell.shell.standards.core.resource_config_entities import (
 )
 
 from cloudshell.cp.azure.exceptions import InvalidAttrException
+from cloudshell.cp.azure.utils.retrying import RETRY_POLICIES
 
 
 class RegionResourceAttrRO(ResourceAttrRO):
@@ -65,6 +66,85 @@ class CustomTagsAttrRO(ResourceAttrRO):
         return {}
 
 
+class IntResourceAttrRO(ResourceAttrRO):
+    def __get__(self, instance, owner):
+        """Get integer resource attribute.
+
+        :param GenericResourceConfig instance:
+        :rtype: int | None
+        """
+        if instance is None:
+            return self
+
+        attr = instance.attributes.get(self.get_key(instance), self.default)
+        if attr in (None, ""):
+            return None
+
+        try:
+            return int(attr)
+        except ValueError:
+            raise InvalidAttrException(f"'{self.name}' attribute must be an integer")
+
+
+class BoolResourceAttrRO(ResourceAttrRO):
+    def __get__(self, instance, owner):
+        """Get boolean resource attribute.
+
+        :param GenericResourceConfig instance:
+        :rtype: bool | None
+        """
+        if instance is None:
+            return self
+
+        attr = instance.attributes.get(self.get_key(instance), self.default)
+        if attr in (None, ""):
+            return None
+
+        if str(attr).lower() not in ("true", "false"):
+            raise InvalidAttrException(f"'{self.name}' attribute must be True or False")
+
+        return str(attr).lower() == "true"
+
+
+class RetryTimeBudgetsAttrRO(ResourceAttrRO):
+    def __get__(self, instance, owner):
+        """Get Retry Time Budgets resource attribute.
+
+        Format is "<policy name>=<seconds>;<policy name>=<seconds>", i.e.
+        "another_operation_in_progress=300;public_ip_detach=600".
+
+        :param GenericResourceConfig instance:
+        :rtype: dict[str, float]
+        """
+        if instance is None:
+            return self
+
+        attr = instance.attributes.get(self.get_key(instance), self.default)
+        time_budgets = {}
+
+        for budget_data in (attr or "").split(";"):
+            if not budget_data.strip():
+                continue
+
+            try:
+                name, max_time = budget_data.split("=")
+                time_budgets[name.strip()] = float(max_time)
+            except ValueError:
+                raise InvalidAttrException(
+                    "'Retry Time Budgets' attribute is in incorrect format"
+                )
+
+        unknown_names = set(time_budgets) - set(RETRY_POLICIES)
+        if unknown_names:
+            raise InvalidAttrException(
+                f"'Retry Time Budgets' attribute contains unknown retry policies: "
+                f"{', '.join(sorted(unknown_names))}. Available retry policies: "
+                f"{', '.join(RETRY_POLICIES)}"
+            )
+
+        return time_budgets
+
+
 class AzureResourceConfig(GenericResourceConfig):
     region = RegionResourceAttrRO("Region", RegionResourceAttrRO.NAMESPACE.SHELL_NAME)
 
@@ -116,6 +196,26 @@ class AzureResourceConfig(GenericResourceConfig):
         "Private IP Allocation Method", ResourceAttrRO.NAMESPACE.SHELL_NAME
     )
 
+    retry_time_budgets = RetryTimeBudgetsAttrRO(
+        "Retry Time Budgets", RetryTimeBudgetsAttrRO.NAMESPACE.SHELL_NAME
+    )
+
+    ssh_key_type = ResourceAttrRO("SSH Key Type", ResourceAttrRO.NAMESPACE.SHELL_NAME)
+
+    ssh_key_pool_low_watermark = IntResourceAttrRO(
+        "SSH Key Pool Low Watermark", IntResourceAttrRO.NAMESPACE.SHELL_NAME
+    )
+
+    ssh_key_pool_high_watermark = IntResourceAttrRO(
+        "SSH Key Pool High Watermark", IntResourceAttrRO.NAMESPACE.SHELL_NAME
+    )
+
+    parallel_sandbox_preparation = BoolResourceAttrRO(
+        "Parallel Sandbox Preparation", BoolResourceAttrRO.NAMESPACE.SHELL_NAME
+    )
+
+    cache_db_path = ResourceAttrRO("Cache DB Path", ResourceAttrRO.NAMESPACE.SHELL_NAME)
+
     @classmethod
     def from_context(cls, shell_name, context, api=None, supported_os=None):
         """Creates an instance of a Resource by given context.
@@ -0,0 +1,133 @@
+from msrest.polling import NoPolling
+from msrestazure.azure_exceptions import CloudError
+from msrestazure.polling.arm_polling import (
+    ARMPolling,
+    BadResponse,
+    BadStatus,
+    OperationFailed,
+    failed,
+)
+
+
+class StepARMPolling(ARMPolling):
+    """ARMPolling that is driven step by step by the caller.
+
+    Unlike ARMPolling it doesn't sleep between the status requests, so the
+    operation can be polled without holding a thread for the whole operation.
+    """
+
+    def __init__(self, timeout=30, lro_options=None, **operation_config):
+        super().__init__(timeout=timeout, lro_options=lro_options, **operation_config)
+        self._completed = False
+
+    def get_retry_after(self):
+        """Get delay requested by Azure with the 'Retry-After' header.
+
+        :rtype: int | None
+        """
+        if self._response is not None:
+            retry_after = self._response.headers.get("retry-after")
+            if retry_after and retry_after.isdigit():
+                return int(retry_after)
+
+    def get_delay(self):
+        """Get delay before the next status request based on the 'Retry-After'.
+
+        :rtype: int
+        """
+        retry_after = self.get_retry_after()
+
+        if retry_after is not None:
+            return retry_after
+
+        return self._timeout
+
+    def poll(self):
+        """Update status of the operation and return True if it is finished.
+
+        :rtype: bool
+        """
+        try:
+            if not self.finished():
+                self.update_status()
+
+            if self.finished() and not self._completed:
+                self._complete()
+
+        except BadStatus:
+            self._operation.status = "Failed"
+            raise CloudError(self._response)
+
+        except BadResponse as err:
+            self._operation.status = "Failed"
+            raise CloudError(self._response, str(err))
+
+        except OperationFailed:
+            raise CloudError(self._response)
+
+        return self.done()
+
+    def done(self):
+        """Check if operation is finished and its final resource is received.
+
+        :rtype: bool
+        """
+        return self.finished() and self._completed
+
+    def _complete(self):
+        """Get the final resource of the finished operation."""
+        if failed(self._operation.status):
+            raise OperationFailed("Operation failed or cancelled")
+
+        elif self._operation.should_do_final_get():
+            if self._operation.method == "POST" and self._operation.location_url:
+                final_get_url = self._operation.location_url
+            else:
+                final_get_url = self._operation.initial_response.request.url
+            self._response = self.request_status(final_get_url)
+            self._operation.parse_resource(self._response)
+
+        self._completed = True
+
+    def initialize(self, client, initial_response, deserialization_callback):
+        super().initialize(
+            client=client,
+            initial_response=initial_response,
+            deserialization_callback=deserialization_callback,
+        )
+        # operation finished with the initial response doesn't need a final GET
+        self._completed = self.finished()
+
+
+class OperationStartPolling(NoPolling):
+    """Polling method that only keeps the initial response of the operation.
+
+    Being passed as 'polling' argument to the SDK operation it allows to start
+    the long running operation without the SDK polling thread and poll it later
+    with the StepARMPolling.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._client = None
+
+    def initialize(self, client, initial_response, deserialization_callback):
+        super().initialize(client, initial_response, deserialization_callback)
+        self._client = client
+
+    def get_arm_polling(self, timeout=30):
+        """Get polling method for the started operation.
+
+        :param int timeout: default delay between the status requests
+        :rtype: StepARMPolling
+        """
+        if self._initial_response is None:
+            raise ValueError("Operation was not started with this polling method")
+
+        arm_polling = StepARMPolling(timeout=timeout)
+        arm_polling.initialize(
+            client=self._client,
+            initial_response=self._initial_response,
+            deserialization_callback=self._deserialization_callback,
+        )
+        return arm_polling
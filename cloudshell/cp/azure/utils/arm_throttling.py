@@ -0,0 +1,257 @@
+import logging
+import re
+import threading
+import time
+
+from msrest.pipeline.requests import RequestsCredentialsPolicy
+
+from cloudshell.cp.azure.utils.singleton_utils import SingletonByArgsMeta
+
+logger = logging.getLogger(__name__)
+SUBSCRIPTION_ID_REGEX = re.compile(r"/subscriptions/([^/?]+)", re.IGNORECASE)
+TOO_MANY_REQUESTS_STATUS_CODE = 429
+
+
+class TokenBucket:
+    """Thread-safe token bucket that allows to reserve tokens in advance.
+
+    When there are no free tokens the reservation makes the balance negative,
+    so the callers are delayed one after another with the refill rate. Callers
+    that won't wait longer than the max delay don't increase the debt beyond it.
+    """
+
+    def __init__(self, capacity, refill_rate):
+        """Init command.
+
+        :param int capacity: max number of tokens
+        :param float refill_rate: number of tokens added per second
+        """
+        self._capacity = capacity
+        self._refill_rate = refill_rate
+        self._tokens = capacity
+        self._last_refill_time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self._capacity,
+            self._tokens + (now - self._last_refill_time) * self._refill_rate,
+        )
+        self._last_refill_time = now
+
+    @property
+    def tokens(self):
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def reserve(self, max_delay=None):
+        """Reserve token and get time in seconds to wait before using it.
+
+        :param float max_delay: max time in seconds the caller will wait
+        :rtype: float
+        """
+        with self._lock:
+            self._refill()
+
+            if max_delay is None:
+                self._tokens -= 1
+            else:
+                min_tokens = -max_delay * self._refill_rate
+                self._tokens = max(self._tokens - 1, min(self._tokens, min_tokens))
+
+            if self._tokens >= 0:
+                return 0
+
+            return -self._tokens / self._refill_rate
+
+    def sync(self, remaining):
+        """Sync bucket with the number of the remaining tokens reported by server.
+
+        :param int remaining:
+        """
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, remaining)
+
+    def block(self, seconds):
+        """Don't give out tokens for the given time.
+
+        :param float seconds:
+        """
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, -seconds * self._refill_rate)
+
+
+class ARMThrottleGovernor(metaclass=SingletonByArgsMeta):
+    """Process-wide budget of the ARM requests per subscription and operation class.
+
+    Budget is kept in a token bucket for each subscription and operation class
+    (reads, writes, deletes) with the ARM subscription limits. It is synced with
+    the 'x-ms-ratelimit-remaining-subscription-*' headers of the ARM responses,
+    so the requests are delayed before Azure starts to throttle them.
+    """
+
+    SUBSCRIPTION_LIMITS = {"reads": 12000, "writes": 1200, "deletes": 15000}
+    SUBSCRIPTION_LIMITS_PERIOD = 60 * 60
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    @staticmethod
+    def get_operation_class(http_method):
+        """Get ARM operation class of the request.
+
+        :param str http_method:
+        :rtype: str
+        """
+        http_method = http_method.upper()
+
+        if http_method in ("GET", "HEAD"):
+            return "reads"
+
+        if http_method == "DELETE":
+            return "deletes"
+
+        return "writes"
+
+    def _get_bucket(self, subscription_id, operation_class):
+        key = (subscription_id, operation_class)
+        bucket = self._buckets.get(key)
+
+        if bucket is None:
+            limit = self.SUBSCRIPTION_LIMITS[operation_class]
+
+            with self._lock:
+                bucket = self._buckets.setdefault(
+                    key,
+                    TokenBucket(
+                        capacity=limit,
+                        refill_rate=limit / self.SUBSCRIPTION_LIMITS_PERIOD,
+                    ),
+                )
+
+        return bucket
+
+    def acquire(self, subscription_id, operation_class, max_delay=None):
+        """Reserve request and get time in seconds to wait before sending it.
+
+        :param str subscription_id:
+        :param str operation_class:
+        :param float max_delay: max time in seconds the caller will wait
+        :rtype: float
+        """
+        return self._get_bucket(subscription_id, operation_class).reserve(
+            max_delay=max_delay
+        )
+
+    def update(self, subscription_id, operation_class, remaining):
+        """Update budget with the number of the remaining requests.
+
+        :param str subscription_id:
+        :param str operation_class:
+        :param int remaining:
+        """
+        self._get_bucket(subscription_id, operation_class).sync(remaining)
+
+    def throttle(self, subscription_id, operation_class, retry_after):
+        """Delay all requests after the throttled one.
+
+        :param str subscription_id:
+        :param str operation_class:
+        :param int retry_after: seconds
+        """
+        self._get_bucket(subscription_id, operation_class).block(retry_after)
+
+    def get_budget(self):
+        """Get current number of the available requests.
+
+        :return: budget by the subscription and the operation class
+        :rtype: dict[tuple[str, str], float]
+        """
+        with self._lock:
+            buckets = dict(self._buckets)
+
+        return {key: bucket.tokens for key, bucket in buckets.items()}
+
+
+class ARMThrottlingCredentialsPolicy(RequestsCredentialsPolicy):
+    """Credentials policy that sends ARM requests within the governor budget.
+
+    Management clients accept credentials that are a pipeline policy, so it is
+    passed to the client instead of the credentials it wraps. Requests are
+    signed by the wrapped credentials as usual. The delay before the request is
+    capped by MAX_DELAY, so the command that could be cancelled meanwhile isn't
+    blocked for long, a longer throttling is handled by the retry policies.
+    Management clients are shared between the commands, so the delays are
+    logged with the module logger and not with the logger of the command.
+    """
+
+    REMAINING_REQUESTS_HEADER_TPL = "x-ms-ratelimit-remaining-subscription-{}"
+    DELAY_LOG_THRESHOLD = 1
+    MAX_DELAY = 10
+
+    def __init__(self, credentials):
+        """Init command.
+
+        :param msrestazure.azure_active_directory.ServicePrincipalCredentials credentials:  # noqa: E501
+        """
+        super().__init__(credentials)
+        self._governor = ARMThrottleGovernor()
+
+    def signed_session(self, session=None):
+        """Create requests session with the auth info of the wrapped credentials.
+
+        :param requests.Session session:
+        :rtype: requests.Session
+        """
+        return self._creds.signed_session(session)
+
+    def send(self, request, **kwargs):
+        match = SUBSCRIPTION_ID_REGEX.search(request.http_request.url)
+
+        if match is None:
+            return super().send(request, **kwargs)
+
+        subscription_id = match.group(1).lower()
+        operation_class = self._governor.get_operation_class(
+            request.http_request.method
+        )
+        delay = min(
+            self._governor.acquire(
+                subscription_id, operation_class, max_delay=self.MAX_DELAY
+            ),
+            self.MAX_DELAY,
+        )
+
+        if delay > self.DELAY_LOG_THRESHOLD:
+            logger.info(
+                f"Delaying ARM {operation_class} request for {delay:.1f} second(s) "
+                f"to stay within the subscription limits"
+            )
+
+        if delay > 0:
+            time.sleep(delay)
+
+        response = super().send(request, **kwargs)
+        headers = response.http_response.headers
+        remaining = headers.get(
+            self.REMAINING_REQUESTS_HEADER_TPL.format(operation_class)
+        )
+
+        if remaining and remaining.isdigit():
+            self._governor.update(subscription_id, operation_class, int(remaining))
+
+        retry_after = headers.get("Retry-After")
+
+        if (
+            response.http_response.status_code == TOO_MANY_REQUESTS_STATUS_CODE
+            and retry_after
+            and retry_after.isdigit()
+        ):
+            self._governor.throttle(subscription_id, operation_class, int(retry_after))
+
+        return response
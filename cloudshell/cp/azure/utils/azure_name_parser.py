@@ -6,3 +6,15 @@ def get_name_from_resource_id(resource_id):
     :rtype: str
     """
     return resource_id.split("/")[-1]
+
+
+def get_resource_group_name_from_resource_id(resource_id):
+    """Get resource group name from the Azure resource id.
+
+    :param str resource_id: Azure resource Id
+    :return: Azure resource group name
+    :rtype: str
+    """
+    parts = resource_id.split("/")
+    lower_parts = [part.lower() for part in parts]
+    return parts[lower_parts.index("resourcegroups") + 1]
@@ -0,0 +1,173 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from cloudshell.cp.azure.utils.arm_polling import OperationStartPolling
+from cloudshell.cp.azure.utils.singleton_utils import SingletonByArgsMeta
+
+
+@dataclass
+class PolledOperation:
+    arm_polling: object
+    interval: float
+    future: Future = field(default_factory=Future)
+
+
+class AzureOperationsPoller(metaclass=SingletonByArgsMeta):
+    """Poll all registered long running operations from a single scheduler.
+
+    Each operation is polled with its own adaptive interval: the 'Retry-After'
+    value from Azure is used if present, otherwise the interval starts from the
+    minimal one and grows up to the maximal one. Status requests are sent by a
+    small pool of threads, so the number of threads doesn't depend on the number
+    of the running operations.
+    """
+
+    MIN_POLLING_INTERVAL = 1
+    MAX_POLLING_INTERVAL = 30
+    POLLING_INTERVAL_INCREASE_FACTOR = 2
+    MAX_WORKERS = 4
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._scheduled_operations = []
+        self._counter = itertools.count()
+        self._scheduler_thread = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.MAX_WORKERS, thread_name_prefix="AzureOperationsPoller"
+        )
+
+    def register(self, arm_polling):
+        """Register started operation and get future of its result.
+
+        Cancelling of the future stops polling of the operation.
+
+        :param cloudshell.cp.azure.utils.arm_polling.StepARMPolling arm_polling:
+        :rtype: concurrent.futures.Future
+        """
+        operation = PolledOperation(
+            arm_polling=arm_polling, interval=self.MIN_POLLING_INTERVAL
+        )
+
+        if arm_polling.done():
+            self._resolve(operation)
+        else:
+            self._schedule(operation)
+
+        return operation.future
+
+    def _get_delay(self, operation):
+        retry_after = operation.arm_polling.get_retry_after()
+
+        if retry_after is not None:
+            return retry_after
+
+        delay = operation.interval
+        operation.interval = min(
+            operation.interval * self.POLLING_INTERVAL_INCREASE_FACTOR,
+            self.MAX_POLLING_INTERVAL,
+        )
+        return delay
+
+    def _schedule(self, operation):
+        poll_time = time.monotonic() + self._get_delay(operation)
+
+        with self._condition:
+            heapq.heappush(
+                self._scheduled_operations, (poll_time, next(self._counter), operation)
+            )
+
+            if self._scheduler_thread is None:
+                self._scheduler_thread = threading.Thread(
+                    target=self._run_scheduler,
+                    name="AzureOperationsPoller",
+                    daemon=True,
+                )
+                self._scheduler_thread.start()
+
+            self._condition.notify()
+
+    def _run_scheduler(self):
+        while True:
+            with self._condition:
+                while not self._scheduled_operations:
+                    self._condition.wait()
+
+                poll_time, _, operation = self._scheduled_operations[0]
+                delay = poll_time - time.monotonic()
+
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+
+                heapq.heappop(self._scheduled_operations)
+
+            if not operation.future.cancelled():
+                self._executor.submit(self._poll, operation)
+
+    def _poll(self, operation):
+        try:
+            is_done = operation.arm_polling.poll()
+        except Exception as e:
+            if operation.future.set_running_or_notify_cancel():
+                operation.future.set_exception(e)
+            return
+
+        if is_done:
+            self._resolve(operation)
+        else:
+            self._schedule(operation)
+
+    @staticmethod
+    def _resolve(operation):
+        if not operation.future.set_running_or_notify_cancel():
+            return
+
+        try:
+            result = operation.arm_polling.resource()
+        except Exception as e:
+            operation.future.set_exception(e)
+        else:
+            operation.future.set_result(result)
+
+
+class AzureOperationPolling(OperationStartPolling):
+    """Polling method that hands over the operation to the AzureOperationsPoller.
+
+    Being passed as 'polling' argument to the SDK operation it doesn't start the
+    SDK polling thread, result of the operation poller blocks until the operation
+    is finished by the AzureOperationsPoller.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.future = None
+
+    def initialize(self, client, initial_response, deserialization_callback):
+        super().initialize(client, initial_response, deserialization_callback)
+        self._arm_polling = self.get_arm_polling()
+        self.future = AzureOperationsPoller().register(self._arm_polling)
+
+    def status(self):
+        return self._arm_polling.status()
+
+    def resource(self):
+        return self.future.result()
+
+
+def get_operation_future(operation_poller):
+    """Get future of the operation polled by the AzureOperationsPoller.
+
+    :param msrest.polling.LROPoller operation_poller:
+    :rtype: concurrent.futures.Future | None
+    """
+    polling_methods = []
+    # operation poller without the SDK polling thread calls the callback at once
+    operation_poller.add_done_callback(polling_methods.append)
+
+    for polling_method in polling_methods:
+        if isinstance(polling_method, AzureOperationPolling):
+            return polling_method.future
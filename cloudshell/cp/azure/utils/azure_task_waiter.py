@@ -1,12 +1,15 @@
 import time
+from concurrent import futures
 from datetime import datetime, timedelta
 
 from cloudshell.cp.azure.exceptions import AzureTaskTimeoutException
+from cloudshell.cp.azure.utils.azure_operations_poller import get_operation_future
 
 
 class AzureTaskWaiter:
     DEFAULT_WAIT_TIME = 30
     DEFAULT_TIMEOUT = 30 * 60
+    CANCELLATION_CHECK_INTERVAL = 5
 
     def __init__(self, cancellation_manager, logger):
         """Init command.
@@ -24,8 +27,17 @@ class AzureTaskWaiter:
         :param int timeout:
         :param int wait_time:
         """
-        wait_time = wait_time or self.DEFAULT_WAIT_TIME
         timeout = timeout or self.DEFAULT_TIMEOUT
+        operation_future = get_operation_future(operation_poller)
+
+        if operation_future is not None:
+            return self._wait_for_operation_future(
+                operation_future=operation_future,
+                operation_poller=operation_poller,
+                timeout=timeout,
+            )
+
+        wait_time = wait_time or self.DEFAULT_WAIT_TIME
         timeout_time = datetime.now() + timedelta(seconds=timeout)
 
         while not operation_poller.done():
@@ -42,3 +54,37 @@ class AzureTaskWaiter:
                 )
 
         return operation_poller.result()
+
+    def _wait_for_operation_future(self, operation_future, operation_poller, timeout):
+        """Wait for the operation polled by the AzureOperationsPoller.
+
+        Result is returned as soon as the operation is finished, cancellation
+        is checked every CANCELLATION_CHECK_INTERVAL seconds.
+
+        :param concurrent.futures.Future operation_future:
+        :param msrestazure.azure_operation.AzureOperationPoller operation_poller:
+        :param int timeout:
+        """
+        timeout_time = datetime.now() + timedelta(seconds=timeout)
+
+        while True:
+            try:
+                with self._cancellation_manager:
+                    return operation_future.result(
+                        timeout=self.CANCELLATION_CHECK_INTERVAL
+                    )
+            except futures.TimeoutError:
+                self._logger.info(
+                    f"Waiting for operation to complete, current status is "
+                    f"{operation_poller.status()}"
+                )
+            except Exception:
+                # stop polling of the operation nobody waits for
+                operation_future.cancel()
+                raise
+
+            if datetime.now() > timeout_time:
+                operation_future.cancel()
+                raise AzureTaskTimeoutException(
+                    f"Unable to perform operation within {timeout / 60} minute(s)"
+                )
@@ -0,0 +1,233 @@
+import copy
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+
+from cloudshell.cp.azure.utils.singleton_utils import SingletonByArgsMeta
+
+MISSING = object()
+REPRESENTATION_RESOURCE_TYPE_TPL = "{resource_type}_representation"
+
+
+class CacheBackend:
+    """Interface of the cache backend used by the AzureAPIClient."""
+
+    def get(self, key):
+        """Get value by the key or MISSING if there is no actual value.
+
+        :param tuple key:
+        """
+        raise NotImplementedError(f"Class {type(self)} must implement method 'get'")
+
+    def put(self, key, value, ttl):
+        """Set value for the key.
+
+        :param tuple key:
+        :param value:
+        :param float ttl: time to live in seconds
+        """
+        raise NotImplementedError(f"Class {type(self)} must implement method 'put'")
+
+    def delete(self, key):
+        """Delete value by the key.
+
+        :param tuple key:
+        """
+        raise NotImplementedError(f"Class {type(self)} must implement method 'delete'")
+
+    def clear(self):
+        """Delete all values."""
+        raise NotImplementedError(f"Class {type(self)} must implement method 'clear'")
+
+
+class TTLLRUCache(CacheBackend):
+    """Thread-safe in-memory cache with TTL and LRU eviction."""
+
+    DEFAULT_MAX_SIZE = 1000
+
+    def __init__(self, max_size=None):
+        """Init command.
+
+        :param int max_size: max number of the cached values
+        """
+        self._max_size = max_size or self.DEFAULT_MAX_SIZE
+        self._lock = threading.Lock()
+        self._values = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            expiration_time, value = self._values.get(key, (None, MISSING))
+
+            if value is MISSING:
+                return MISSING
+
+            if expiration_time < time.monotonic():
+                del self._values[key]
+                return MISSING
+
+            self._values.move_to_end(key)
+            return value
+
+    def put(self, key, value, ttl):
+        with self._lock:
+            self._values[key] = (time.monotonic() + ttl, value)
+            self._values.move_to_end(key)
+
+            while len(self._values) > self._max_size:
+                self._values.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._values.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class ProcessCache(TTLLRUCache, metaclass=SingletonByArgsMeta):
+    """In-memory cache shared by all AzureAPIClient instances in the process."""
+
+
+def _normalize_cache_key_value(value):
+    # names of the Azure resources are case-insensitive
+    if isinstance(value, str):
+        return value.lower()
+
+    return value
+
+
+def get_cache_key(namespace, resource_type, arguments):
+    """Get cache key of the resource.
+
+    :param str namespace: namespace of the resource, i.e. subscription ID
+    :param str resource_type:
+    :param dict arguments: arguments that identify the resource
+    :rtype: tuple
+    """
+    return (
+        namespace,
+        resource_type,
+        tuple(
+            sorted(
+                (name, _normalize_cache_key_value(value))
+                for name, value in arguments.items()
+            )
+        ),
+    )
+
+
+def cached(resource_type):
+    """Cache result of the method of the cached resources owner.
+
+    Owner must have 'cache', 'cache_namespace' and 'CACHE_TTLS' (TTL per resource
+    type) attributes. Copy of the cached value is returned, so the caller may
+    change it without affecting the cache. Cache can be bypassed with the
+    'fresh=True' argument, the fetched value replaces the cached one in this case.
+
+    :param str resource_type:
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(self, *args, fresh=False, **kwargs):
+            bound_args = signature.bind(self, *args, **kwargs)
+            bound_args.apply_defaults()
+            arguments = dict(bound_args.arguments)
+            arguments.pop("self")
+            key = get_cache_key(
+                namespace=self.cache_namespace,
+                resource_type=resource_type,
+                arguments=arguments,
+            )
+
+            if not fresh:
+                value = self.cache.get(key)
+
+                if value is not MISSING:
+                    return copy.deepcopy(value)
+
+            value = func(self, *args, **kwargs)
+            self.cache.put(key, value, ttl=self.CACHE_TTLS[resource_type])
+            return copy.deepcopy(value)
+
+        return wrapper
+
+    return decorator
+
+
+def get_representation_cache_key(namespace, resource_type, arguments):
+    """Get cache key of the last received resource representation.
+
+    Representation is kept longer than the cached resource to be returned when
+    the conditional request shows that the resource wasn't modified.
+
+    :param str namespace: namespace of the resource, i.e. subscription ID
+    :param str resource_type:
+    :param dict arguments: arguments that identify the resource
+    :rtype: tuple
+    """
+    return get_cache_key(
+        namespace=namespace,
+        resource_type=REPRESENTATION_RESOURCE_TYPE_TPL.format(
+            resource_type=resource_type
+        ),
+        arguments=arguments,
+    )
+
+
+def invalidate_cache(owner, resource_type, **arguments):
+    """Invalidate cached resource and its last representation.
+
+    :param owner: owner of the cached resources, see 'cached' decorator
+    :param str resource_type:
+    :param arguments: arguments of the cached method that identify the resource
+    """
+    for get_key in (get_cache_key, get_representation_cache_key):
+        owner.cache.delete(
+            get_key(
+                namespace=owner.cache_namespace,
+                resource_type=resource_type,
+                arguments=arguments,
+            )
+        )
+
+
+def invalidates_cache(resource_type, **arguments_map):
+    """Invalidate cached resource after the call of the decorated method.
+
+    Resource is invalidated even if the method failed since the resource could be
+    changed anyway.
+
+    :param str resource_type:
+    :param arguments_map: names of the cached method arguments mapped to the names
+        of the decorated method arguments
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            bound_args = signature.bind(self, *args, **kwargs)
+            bound_args.apply_defaults()
+
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                invalidate_cache(
+                    self,
+                    resource_type,
+                    **{
+                        cached_arg_name: bound_args.arguments[arg_name]
+                        for cached_arg_name, arg_name in arguments_map.items()
+                    },
+                )
+
+        return wrapper
+
+    return decorator
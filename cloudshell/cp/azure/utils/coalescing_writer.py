@@ -0,0 +1,148 @@
+import threading
+import typing
+from collections import defaultdict
+from concurrent.futures import Future
+from dataclasses import dataclass, field, replace
+
+
+@dataclass
+class WriteRequest:
+    items: typing.List[typing.Any]
+    kwargs: typing.Dict[str, typing.Any]
+    future: Future = field(default_factory=Future)
+    # set when the request is written or when it becomes the leader
+    wakeup: threading.Event = field(default_factory=threading.Event)
+
+
+@dataclass
+class FailedWrite:
+    """Result of the request that failed while other merged requests succeeded."""
+
+    exception: Exception
+
+
+@dataclass
+class WriteMetrics:
+    requests: int = 0
+    writes: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+
+    @property
+    def merge_ratio(self) -> float:
+        """Average number of the requests written with a single write."""
+        return self.requests / self.writes if self.writes else 0.0
+
+
+class CoalescingWriter:
+    """Merge concurrent write requests for the same resource into a single write.
+
+    The first thread that submits a request for the resource becomes the leader.
+    It takes all queued requests and writes them with a single '_write' call.
+    If new requests were queued meanwhile, the leadership is handed over to the
+    first of them, so the leader returns as soon as its own request is written.
+    All other threads just wait for the results of their requests. Each request
+    keeps its own '_write' arguments (clients, loggers), so they could be used
+    for its items. '_write' can fail a single request by returning FailedWrite
+    as its result.
+
+    Example usage:
+        >>> class Writer(CoalescingWriter):
+        >>>
+        >>>     def _write(self, key, requests_items, requests_kwargs):
+        >>>         client.update(key, [i for items in requests_items for i in items])
+        >>>         return requests_items
+        >>>
+        >>> Writer().write(key="resource", items=["item1", "item2"])
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending_requests = defaultdict(list)
+        self._active_keys = set()
+        self._metrics = defaultdict(WriteMetrics)
+
+    def _write(
+        self,
+        key,
+        requests_items: typing.List[typing.List[typing.Any]],
+        requests_kwargs: typing.List[typing.Dict[str, typing.Any]],
+    ) -> typing.List[typing.Any]:
+        """Write items of all requests and return result for each request."""
+        raise NotImplementedError(f"Class {type(self)} must implement method '_write'")
+
+    def write(self, key, items: typing.List[typing.Any], **kwargs):
+        """Write items and wait for the result.
+
+        :param key: key of the resource to write items to
+        :param items: list of items to write
+        :param kwargs: additional arguments of the request for the '_write' method
+        """
+        request = WriteRequest(items=items, kwargs=kwargs)
+        request.future.add_done_callback(lambda _: request.wakeup.set())
+
+        with self._lock:
+            self._pending_requests[key].append(request)
+            metrics = self._metrics[key]
+            metrics.requests += 1
+            metrics.queue_depth = len(self._pending_requests[key])
+            metrics.max_queue_depth = max(metrics.max_queue_depth, metrics.queue_depth)
+
+            if key not in self._active_keys:
+                self._active_keys.add(key)
+                request.wakeup.set()
+
+        request.wakeup.wait()
+
+        # request that isn't written yet was woken up to become the leader
+        if not request.future.done():
+            self._process_requests(key)
+
+        return request.future.result()
+
+    def _process_requests(self, key):
+        with self._lock:
+            requests = self._pending_requests.pop(key)
+            metrics = self._metrics[key]
+            metrics.queue_depth = 0
+            metrics.writes += 1
+
+        try:
+            results = self._write(
+                key,
+                [request.items for request in requests],
+                [request.kwargs for request in requests],
+            )
+        except BaseException as e:
+            for request in requests:
+                request.future.set_exception(e)
+
+            if not isinstance(e, Exception):
+                raise
+        else:
+            for request, result in zip(requests, results):
+                if isinstance(result, FailedWrite):
+                    request.future.set_exception(result.exception)
+                else:
+                    request.future.set_result(result)
+        finally:
+            self._hand_over_leadership(key)
+
+    def _hand_over_leadership(self, key):
+        with self._lock:
+            next_requests = self._pending_requests.get(key)
+
+            if next_requests:
+                next_requests[0].wakeup.set()
+            else:
+                self._pending_requests.pop(key, None)
+                self._active_keys.discard(key)
+
+    def get_metrics(self):
+        """Get write metrics per resource.
+
+        :return: copies of the metrics by the resource key
+        :rtype: dict[typing.Any, WriteMetrics]
+        """
+        with self._lock:
+            return {key: replace(metrics) for key, metrics in self._metrics.items()}
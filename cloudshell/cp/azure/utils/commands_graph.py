@@ -0,0 +1,120 @@
+import typing
+from concurrent import futures
+from dataclasses import dataclass, field
+
+
+@dataclass
+class CommandsGraphNode:
+    name: str
+    func: typing.Callable
+    depends_on: typing.List[str] = field(default_factory=list)
+
+
+class RollbackCommandsGraph:
+    """Execute dependent steps of the flow as a DAG on a bounded thread pool.
+
+    Each node is a callable that usually executes one or several RollbackCommands.
+    Results of the node dependencies are passed to the node callable as keyword
+    arguments named after the dependency nodes. Commands still register themselves
+    in the RollbackCommandsManager, so the rollback of all executed commands is
+    performed by the manager as before.
+
+    Example usage:
+        >>> graph = RollbackCommandsGraph(logger=logger)
+        >>> graph.add_node("vm_nsg", create_vm_nsg)
+        >>> graph.add_node("vm_interfaces", create_vm_interfaces, ["vm_nsg"])
+        >>> graph.add_node("data_disks", create_data_disks)
+        >>> results = graph.execute()
+    """
+
+    DEFAULT_MAX_WORKERS = 5
+
+    def __init__(self, logger, max_workers: int = DEFAULT_MAX_WORKERS):
+        """Init command.
+
+        :param logging.Logger logger:
+        :param int max_workers: maximum number of the nodes executed concurrently
+        """
+        self._logger = logger
+        self._max_workers = max_workers
+        self._nodes = {}
+
+    def add_node(
+        self,
+        name: str,
+        func: typing.Callable,
+        depends_on: typing.Optional[typing.List[str]] = None,
+    ):
+        """Add node to the graph.
+
+        All dependencies must be added to the graph before the node itself,
+        so the graph can't contain any cycles.
+        """
+        depends_on = list(depends_on or [])
+
+        if name in self._nodes:
+            raise ValueError(f"Node '{name}' is already added to the graph")
+
+        for dependency in depends_on:
+            if dependency not in self._nodes:
+                raise ValueError(
+                    f"Node '{name}' depends on the unknown node '{dependency}'"
+                )
+
+        self._nodes[name] = CommandsGraphNode(
+            name=name, func=func, depends_on=depends_on
+        )
+
+    def _get_ready_nodes(self, pending_nodes, results):
+        return [
+            node
+            for node in pending_nodes
+            if all(dependency in results for dependency in node.depends_on)
+        ]
+
+    def execute(self) -> typing.Dict[str, typing.Any]:
+        """Execute all nodes and return their results by the node name.
+
+        Once some node fails, no new nodes will be started. Already running nodes
+        will be awaited, so all executed commands will be registered for rollback
+        before the first error is raised.
+        """
+        pending_nodes = list(self._nodes.values())
+        running_nodes = {}
+        results = {}
+        error = None
+
+        with futures.ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            while pending_nodes or running_nodes:
+                if error is None:
+                    for node in self._get_ready_nodes(pending_nodes, results):
+                        self._logger.debug(f"Starting execution of the '{node.name}'")
+                        pending_nodes.remove(node)
+                        future = executor.submit(
+                            node.func,
+                            **{dep: results[dep] for dep in node.depends_on},
+                        )
+                        running_nodes[future] = node
+
+                if not running_nodes:
+                    break
+
+                done, _ = futures.wait(
+                    running_nodes, return_when=futures.FIRST_COMPLETED
+                )
+
+                for future in done:
+                    node = running_nodes.pop(future)
+                    try:
+                        results[node.name] = future.result()
+                    except Exception as e:
+                        self._logger.warning(
+                            f"Execution of the '{node.name}' failed", exc_info=True
+                        )
+                        if error is None:
+                            error = e
+
+        if error is not None:
+            raise error
+
+        return results
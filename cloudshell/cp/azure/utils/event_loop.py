@@ -0,0 +1,35 @@
+import asyncio
+import threading
+
+from cloudshell.cp.azure.utils.singleton_utils import SingletonByArgsMeta
+
+
+class EventLoopThread(metaclass=SingletonByArgsMeta):
+    """Process-wide event loop running in the background thread.
+
+    Flows that use the AsyncAzureAPIClient run their coroutines on this loop,
+    so the long running operations of all commands are awaited by a single
+    thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop = None
+
+    def _get_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever, name="EventLoopThread", daemon=True
+                ).start()
+
+            return self._loop
+
+    def run(self, coroutine):
+        """Run coroutine on the event loop and wait for its result.
+
+        :param coroutine:
+        :return: result of the coroutine
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self._get_loop()).result()
@@ -0,0 +1,33 @@
+import importlib
+import threading
+
+
+class LazyModule:
+    """Module proxy that imports the module on the first attribute access.
+
+    Azure SDK packages take a significant time to import, so modules that are
+    needed only by some commands are imported when they are actually used.
+    """
+
+    def __init__(self, name):
+        """Init command.
+
+        :param str name: full name of the module
+        """
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+
+        return self._module
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __repr__(self):
+        return f"<LazyModule '{self._name}'>"
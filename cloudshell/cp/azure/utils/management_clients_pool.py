@@ -0,0 +1,106 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from cloudshell.cp.azure.utils.singleton_utils import SingletonByArgsMeta
+
+
+class ManagementClientsPool(metaclass=SingletonByArgsMeta):
+    """Process-wide pool of the Azure management clients.
+
+    Clients are shared by the key (client type, credentials, subscription) and
+    keep their HTTP session between the requests, so the connections are reused.
+    Pool size is bounded, least recently used clients and clients that weren't
+    used for IDLE_TIMEOUT seconds are closed and removed from the pool.
+    Clients are created outside the pool lock, since the creation could request
+    AAD token, concurrent requests for the same client wait for its creation.
+    """
+
+    MAX_SIZE = 50
+    IDLE_TIMEOUT = 30 * 60
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients = OrderedDict()
+        self._pending_clients = {}
+
+    def get_client(self, key, create_client):
+        """Get client from the pool or create it.
+
+        :param tuple key: key of the client
+        :param create_client: function that creates new client
+        :rtype: msrest.service_client.SDKClient
+        """
+        with self._lock:
+            evicted_clients = self._evict_idle_clients()
+            client = self._clients.get(key, (None, None))[1]
+            pending_client = None
+            is_creator = False
+
+            if client is not None:
+                self._clients[key] = (time.monotonic(), client)
+                self._clients.move_to_end(key)
+            else:
+                pending_client = self._pending_clients.get(key)
+
+                if pending_client is None:
+                    pending_client = self._pending_clients[key] = Future()
+                    is_creator = True
+
+        self._close_clients(evicted_clients)
+
+        if client is not None:
+            return client
+
+        if not is_creator:
+            return pending_client.result()
+
+        try:
+            client = create_client()
+            client.config.keep_alive = True
+        except Exception as e:
+            with self._lock:
+                del self._pending_clients[key]
+
+            pending_client.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._pending_clients[key]
+            self._clients[key] = (time.monotonic(), client)
+            evicted_clients = []
+
+            while len(self._clients) > self.MAX_SIZE:
+                evicted_clients.append(self._clients.popitem(last=False)[1][1])
+
+        pending_client.set_result(client)
+        self._close_clients(evicted_clients)
+
+        return client
+
+    @staticmethod
+    def _close_clients(clients):
+        for client in clients:
+            client.close()
+
+    def _evict_idle_clients(self):
+        """Remove idle clients from the pool.
+
+        :return: removed clients
+        :rtype: list
+        """
+        evicted_clients = []
+        idle_time = time.monotonic() - self.IDLE_TIMEOUT
+
+        # clients are ordered by the last usage time
+        while self._clients:
+            key, (last_used_time, client) = next(iter(self._clients.items()))
+
+            if last_used_time > idle_time:
+                break
+
+            del self._clients[key]
+            evicted_clients.append(client)
+
+        return evicted_clients
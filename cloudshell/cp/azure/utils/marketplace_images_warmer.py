@@ -0,0 +1,142 @@
+import logging
+import threading
+import time
+
+from cloudshell.cp.azure.utils.singleton_utils import SingletonByArgsMeta
+
+logger = logging.getLogger(__name__)
+
+
+class MarketplaceImagesWarmer(metaclass=SingletonByArgsMeta):
+    """Keep resolved latest versions of the used Marketplace images hot.
+
+    Images that were resolved within the subscription are tracked and resolved
+    again in the background before their cached values expire, so the deployments
+    don't wait for the image catalog listing. Images that weren't used for
+    IDLE_TIMEOUT seconds are not refreshed anymore. Warmer keeps only the
+    credentials and the settings of the last used client and creates its own
+    client with the module logger, so the commands' clients and loggers aren't
+    referenced after the commands finish. Credentials, including the application
+    key, are dropped together with the client once no images are tracked, so
+    they are kept at most IDLE_TIMEOUT seconds after the last use.
+    """
+
+    IDLE_TIMEOUT = 6 * 60 * 60
+
+    def __init__(self, subscription_id):
+        """Init command.
+
+        :param str subscription_id:
+        """
+        self._subscription_id = subscription_id
+        self._lock = threading.Lock()
+        self._images = {}
+        self._client_class = None
+        self._client_settings = None
+        self._azure_client = None
+        self._refresh_thread = None
+
+    def track(self, azure_client, region, publisher_name, offer, sku):
+        """Track the used image and start the background refresh.
+
+        :param cloudshell.cp.azure.azure_client.AzureAPIClient azure_client:
+        :param str region:
+        :param str publisher_name:
+        :param str offer:
+        :param str sku:
+        """
+        image = (region.lower(), publisher_name, offer, sku)
+        client_settings = azure_client.get_settings()
+
+        with self._lock:
+            self._images[image] = time.monotonic()
+
+            if client_settings != self._client_settings:
+                self._client_class = type(azure_client)
+                self._client_settings = client_settings
+                self._azure_client = None
+
+            if self._refresh_thread is None or not self._refresh_thread.is_alive():
+                self._refresh_thread = threading.Thread(
+                    target=self._refresh_periodically, daemon=True
+                )
+                self._refresh_thread.start()
+
+    def _get_azure_client(self):
+        """Get client of the warmer created with the tracked settings.
+
+        :rtype: cloudshell.cp.azure.azure_client.AzureAPIClient | None
+        """
+        with self._lock:
+            if self._azure_client is None and self._client_settings is not None:
+                self._azure_client = self._client_class(
+                    logger=logger, **self._client_settings
+                )
+
+            return self._azure_client
+
+    def get_tracked_images(self, region=None):
+        """Get tracked images.
+
+        :param str region: return only images of the region if specified
+        :return: tuples (region, publisher name, offer, sku)
+        :rtype: list[tuple[str, str, str, str]]
+        """
+        with self._lock:
+            return [
+                image
+                for image in self._images
+                if region is None or image[0] == region.lower()
+            ]
+
+    def warm(self, region=None, fresh=True):
+        """Resolve latest versions of the tracked images.
+
+        :param str region: warm only images of the region if specified
+        :param bool fresh: resolve images even if they are cached
+        """
+        azure_client = self._get_azure_client()
+
+        if azure_client is None:
+            return
+
+        for image_region, publisher_name, offer, sku in self.get_tracked_images(
+            region=region
+        ):
+            try:
+                azure_client.get_latest_virtual_machine_image(
+                    region=image_region,
+                    publisher_name=publisher_name,
+                    offer=offer,
+                    sku=sku,
+                    fresh=fresh,
+                )
+            except Exception:
+                logger.warning(
+                    f"Unable to resolve Marketplace image {publisher_name}:{offer}:"
+                    f"{sku} in the region {image_region}",
+                    exc_info=True,
+                )
+
+    def _refresh_periodically(self):
+        while True:
+            with self._lock:
+                ttl = self._client_settings["cache_ttls"]["marketplace_image"]
+
+            # refresh images before the cached values expire
+            time.sleep(ttl / 2)
+
+            with self._lock:
+                idle_time = time.monotonic() - self.IDLE_TIMEOUT
+
+                for image, last_used_time in list(self._images.items()):
+                    if last_used_time < idle_time:
+                        del self._images[image]
+
+                if not self._images:
+                    self._refresh_thread = None
+                    self._client_settings = None
+                    self._azure_client = None
+                    return
+
+            self.warm()
@@ -1,3 +1,376 @@
+import threading
+import time
+from collections import Counter
+
+from cloudshell.cp.azure.exceptions import NoFreeNSGRulePriorityException
+from cloudshell.cp.azure.utils.cache import MISSING, TTLLRUCache
+from cloudshell.cp.azure.utils.singleton_utils import SingletonByArgsMeta
+
+
+class FreeSlotsTree:
+    """Segment tree that allows to find the first free slot in O(log n)."""
+
+    def __init__(self, slots_count):
+        """Init command.
+
+        :param int slots_count:
+        """
+        self._size = 1
+        while self._size < slots_count:
+            self._size *= 2
+
+        self._free_slots = [0] * (2 * self._size)
+
+        for idx in range(slots_count):
+            self._free_slots[self._size + idx] = 1
+
+        for node in range(self._size - 1, 0, -1):
+            self._free_slots[node] = (
+                self._free_slots[2 * node] + self._free_slots[2 * node + 1]
+            )
+
+    def set_free(self, idx, is_free):
+        """Mark slot as a free or a taken one.
+
+        :param int idx:
+        :param bool is_free:
+        """
+        node = self._size + idx
+        self._free_slots[node] = int(is_free)
+        node //= 2
+
+        while node:
+            self._free_slots[node] = (
+                self._free_slots[2 * node] + self._free_slots[2 * node + 1]
+            )
+            node //= 2
+
+    def find_first_free(self, start):
+        """Find index of the first free slot starting from the given one.
+
+        :param int start:
+        :rtype: int | None
+        """
+        if start >= self._size:
+            return None
+
+        node = self._size + start
+
+        if self._free_slots[node]:
+            return start
+
+        # go up until there is a right sibling with free slots
+        while node > 1:
+            if node % 2 == 0 and self._free_slots[node + 1]:
+                node += 1
+                break
+            node //= 2
+        else:
+            return None
+
+        # go down to the leftmost free slot
+        while node < self._size:
+            node *= 2
+            if not self._free_slots[node]:
+                node += 1
+
+        return node - self._size
+
+
+class NSGRulesPriorityAllocator:
+    """Thread-safe allocator of the NSG rules priorities.
+
+    Free priorities for each combination of the increase step and the remainder
+    of the start priority are kept in a separate FreeSlotsTree, so the allocation
+    and the release of the priority takes O(log n).
+
+    Allocated priorities stay pending until the rule with this priority is
+    created or the priority is released. Pending priorities are kept when the
+    allocator is refreshed from the actual NSG rules and expire after
+    PENDING_PRIORITY_TIMEOUT seconds.
+    """
+
+    MIN_RULE_PRIORITY = 100
+    MAX_RULE_PRIORITY = 4096
+    PENDING_PRIORITY_TIMEOUT = 10 * 60
+
+    def __init__(self, existing_rules=None, etag=None):
+        """Init command.
+
+        :param list existing_rules: already existing NSG rules
+        :param str etag: ETag of the NSG the existing rules were taken from
+        """
+        self._lock = threading.Lock()
+        self._taken_priorities = set()
+        self._rules_priorities = {}
+        self._rules_priorities_counts = Counter()
+        self._pending_priorities = {}
+        self._trees = {}
+        self.etag = etag
+
+        for rule in existing_rules or []:
+            self._rules_priorities[rule.name] = rule.priority
+            self._taken_priorities.add(rule.priority)
+
+        self._rules_priorities_counts.update(self._rules_priorities.values())
+
+    def refresh(self, existing_rules, etag):
+        """Replace known NSG rules with the actual ones.
+
+        :param list existing_rules: actual NSG rules
+        :param str etag: ETag of the NSG the rules were taken from
+        """
+        with self._lock:
+            expiration_time = time.monotonic() - self.PENDING_PRIORITY_TIMEOUT
+            self._pending_priorities = {
+                priority: allocation_time
+                for priority, allocation_time in self._pending_priorities.items()
+                if allocation_time > expiration_time
+            }
+            self._rules_priorities = {
+                rule.name: rule.priority for rule in existing_rules
+            }
+            self._rules_priorities_counts = Counter(self._rules_priorities.values())
+            self._taken_priorities = {
+                *self._rules_priorities.values(),
+                *self._pending_priorities,
+            }
+            # trees are rebuilt from the taken priorities on the next allocation
+            self._trees = {}
+            self.etag = etag
+
+    def _get_tree(self, step, remainder):
+        """Get tree of the priorities for the given step and remainder.
+
+        :param int step:
+        :param int remainder:
+        :return: first priority of the tree and the tree itself
+        :rtype: tuple[int, FreeSlotsTree]
+        """
+        key = (step, remainder)
+
+        if key not in self._trees:
+            first_priority = (
+                self.MIN_RULE_PRIORITY + (remainder - self.MIN_RULE_PRIORITY) % step
+            )
+            tree = FreeSlotsTree(
+                slots_count=(self.MAX_RULE_PRIORITY - first_priority) // step + 1
+            )
+
+            for priority in self._taken_priorities:
+                if (
+                    priority % step == remainder
+                    and first_priority <= priority <= self.MAX_RULE_PRIORITY
+                ):
+                    tree.set_free(
+                        idx=(priority - first_priority) // step, is_free=False
+                    )
+
+            self._trees[key] = first_priority, tree
+
+        return self._trees[key]
+
+    def _release_if_unused(self, priority):
+        if (
+            priority not in self._pending_priorities
+            and not self._rules_priorities_counts[priority]
+        ):
+            self._set_taken(priority=priority, is_taken=False)
+
+    def _set_taken(self, priority, is_taken):
+        if is_taken:
+            self._taken_priorities.add(priority)
+        else:
+            self._taken_priorities.discard(priority)
+
+        for (step, remainder), (first_priority, tree) in self._trees.items():
+            if (
+                priority % step == remainder
+                and first_priority <= priority <= self.MAX_RULE_PRIORITY
+            ):
+                tree.set_free(
+                    idx=(priority - first_priority) // step, is_free=not is_taken
+                )
+
+    def allocate(self, start_from, step):
+        """Allocate first free priority from the sequence start_from + N * step.
+
+        :param int start_from:
+        :param int step:
+        :rtype: int
+        """
+        with self._lock:
+            first_priority, tree = self._get_tree(
+                step=step, remainder=start_from % step
+            )
+            idx = tree.find_first_free(
+                start=max(0, (start_from - first_priority) // step)
+            )
+
+            if idx is None:
+                raise NoFreeNSGRulePriorityException(
+                    f"Unable to find free NSG rule priority starting from "
+                    f"{start_from} with step {step}"
+                )
+
+            priority = first_priority + idx * step
+            self._set_taken(priority=priority, is_taken=True)
+            self._pending_priorities[priority] = time.monotonic()
+
+            return priority
+
+    def release(self, priority):
+        """Release allocated priority if the rule with it wasn't created.
+
+        :param int priority:
+        """
+        with self._lock:
+            if self._pending_priorities.pop(priority, None) is not None:
+                self._release_if_unused(priority)
+
+    def add_rule(self, rule_name, priority):
+        """Register created NSG rule priority.
+
+        :param str rule_name:
+        :param int priority:
+        """
+        with self._lock:
+            old_priority = self._rules_priorities.get(rule_name)
+            self._rules_priorities[rule_name] = priority
+            self._rules_priorities_counts[priority] += 1
+            self._pending_priorities.pop(priority, None)
+            self._set_taken(priority=priority, is_taken=True)
+
+            if old_priority is not None:
+                self._rules_priorities_counts[old_priority] -= 1
+                self._release_if_unused(old_priority)
+
+    def remove_rule(self, rule_name):
+        """Release priority of the deleted NSG rule.
+
+        :param str rule_name:
+        """
+        with self._lock:
+            priority = self._rules_priorities.pop(rule_name, None)
+
+            if priority is not None:
+                self._rules_priorities_counts[priority] -= 1
+                self._release_if_unused(priority)
+
+
+class NSGRulesPriorityAllocatorsCache(TTLLRUCache, metaclass=SingletonByArgsMeta):
+    """Cache of the NSG rules priority allocators per NSG.
+
+    Cached allocator is refreshed from the NSG rules when the NSG ETag changes,
+    so the rules created by other processes are taken into account. The NSG is
+    fetched with the conditional request, so the rules are transferred only if
+    the NSG was changed. Allocators that weren't used for TTL seconds are
+    dropped, i.e. the ones of the NSGs deleted with their resource groups.
+    """
+
+    DEFAULT_MAX_SIZE = 1000
+    TTL = 60 * 60
+
+    def __init__(self, max_size=None):
+        """Init command.
+
+        :param int max_size: max number of the cached allocators
+        """
+        super().__init__(max_size=max_size)
+        self._allocators_lock = threading.Lock()
+
+    @staticmethod
+    def _get_key(subscription_id, nsg_name, resource_group_name):
+        return subscription_id, resource_group_name.lower(), nsg_name.lower()
+
+    def get_allocator(self, nsg_name, resource_group_name, nsg_actions):
+        """Get cached allocator refreshed to the actual NSG state.
+
+        :param str nsg_name:
+        :param str resource_group_name:
+        :param cloudshell.cp.azure.actions.network_security_group.NetworkSecurityGroupActions nsg_actions:  # noqa: E501
+        :rtype: NSGRulesPriorityAllocator
+        """
+        nsg = nsg_actions.get_network_security_group(
+            nsg_name=nsg_name, resource_group_name=resource_group_name
+        )
+        key = self._get_key(
+            subscription_id=nsg_actions.subscription_id,
+            nsg_name=nsg_name,
+            resource_group_name=resource_group_name,
+        )
+
+        with self._allocators_lock:
+            allocator = self.get(key)
+
+            if allocator is MISSING:
+                allocator = NSGRulesPriorityAllocator(
+                    existing_rules=nsg.security_rules, etag=nsg.etag
+                )
+            elif allocator.etag != nsg.etag:
+                allocator.refresh(
+                    existing_rules=nsg.security_rules or [], etag=nsg.etag
+                )
+
+            # prolong TTL of the used allocator
+            self.put(key, allocator, ttl=self.TTL)
+
+        return allocator
+
+    def add_rule(self, subscription_id, nsg_name, resource_group_name, rule):
+        """Update cached allocator with the created NSG rule.
+
+        :param str subscription_id:
+        :param str nsg_name:
+        :param str resource_group_name:
+        :param rule:
+        """
+        allocator = self.get(
+            self._get_key(
+                subscription_id=subscription_id,
+                nsg_name=nsg_name,
+                resource_group_name=resource_group_name,
+            )
+        )
+
+        if allocator is not MISSING:
+            allocator.add_rule(rule_name=rule.name, priority=rule.priority)
+
+    def remove_rule(self, subscription_id, nsg_name, resource_group_name, rule_name):
+        """Update cached allocator with the deleted NSG rule.
+
+        :param str subscription_id:
+        :param str nsg_name:
+        :param str resource_group_name:
+        :param str rule_name:
+        """
+        allocator = self.get(
+            self._get_key(
+                subscription_id=subscription_id,
+                nsg_name=nsg_name,
+                resource_group_name=resource_group_name,
+            )
+        )
+
+        if allocator is not MISSING:
+            allocator.remove_rule(rule_name=rule_name)
+
+    def remove_allocator(self, subscription_id, nsg_name, resource_group_name):
+        """Remove cached allocator of the deleted NSG.
+
+        :param str subscription_id:
+        :param str nsg_name:
+        :param str resource_group_name:
+        """
+        self.delete(
+            self._get_key(
+                subscription_id=subscription_id,
+                nsg_name=nsg_name,
+                resource_group_name=resource_group_name,
+            )
+        )
+
+
 class NSGRulesPriorityGenerator:
     RULE_DEFAULT_PRIORITY = 1000
     RULE_PRIORITY_INCREASE_STEP = 5
@@ -8,37 +381,30 @@ class NSGRulesPriorityGenerator:
         resource_group_name,
         include_existing_rules=False,
         nsg_actions=None,
+        existing_rules=None,
     ):
         """Init command.
 
         :param str nsg_name:
         :param str resource_group_name:
-        :param bool include_existing_rules:
+        :param bool include_existing_rules: use allocator shared for the NSG
         :param nsg_actions:
+        :param list existing_rules: already fetched NSG rules
         """
         self._nsg_name = nsg_name
         self._resource_group_name = resource_group_name
         self._nsg_actions = nsg_actions
-        self._existing_priorities = []
-
-        if include_existing_rules:
-            self._populate_existing_rules_priorities()
 
-        self._existing_priorities.append(float("inf"))
-
-    def _populate_existing_rules_priorities(self):
-        """Populate list with the existing priorities.
-
-        :return:
-        """
-        self._existing_priorities = [
-            rule.priority
-            for rule in self._nsg_actions.get_nsg_rules(
-                resource_group_name=self._resource_group_name, nsg_name=self._nsg_name
+        if existing_rules is not None:
+            self._allocator = NSGRulesPriorityAllocator(existing_rules=existing_rules)
+        elif include_existing_rules:
+            self._allocator = NSGRulesPriorityAllocatorsCache().get_allocator(
+                nsg_name=nsg_name,
+                resource_group_name=resource_group_name,
+                nsg_actions=nsg_actions,
             )
-        ]
-
-        self._existing_priorities.sort()
+        else:
+            self._allocator = NSGRulesPriorityAllocator()
 
     def get_priority(
         self,
@@ -51,17 +417,11 @@ class NSGRulesPriorityGenerator:
         :param int increase_step:
         :return:
         """
-        priority = start_from
-        i = 0
-
-        while i <= len(self._existing_priorities):
-            if priority > self._existing_priorities[i]:
-                i += 1
+        return self._allocator.allocate(start_from=start_from, step=increase_step)
 
-            elif priority == self._existing_priorities[i]:
-                priority += increase_step
-                i += 1
+    def release_priority(self, priority):
+        """Release priority of the NSG rule that wasn't created.
 
-            else:
-                self._existing_priorities.insert(i, priority)
-                return priority
+        :param int priority:
+        """
+        self._allocator.release(priority=priority)
@@ -0,0 +1,84 @@
+import copy
+
+from cloudshell.cp.azure.utils.coalescing_writer import CoalescingWriter
+from cloudshell.cp.azure.utils.nsg_rules_priority_generator import (
+    NSGRulesPriorityGenerator,
+)
+from cloudshell.cp.azure.utils.retrying import PRECONDITION_FAILED_RETRY_POLICY, retry
+from cloudshell.cp.azure.utils.singleton_utils import SingletonByArgsMeta
+
+
+class NSGRulesWriter(CoalescingWriter, metaclass=SingletonByArgsMeta):
+    """Create NSG rules from the concurrent requests with a single NSG update.
+
+    Priorities for all rules are assigned from the single NSG snapshot, priority
+    of the rule is used as a start value for the search of the free one.
+    """
+
+    def write_rules(self, nsg_actions, nsg_name, resource_group_name, rules):
+        """Create NSG rules in the existing NSG.
+
+        :param cloudshell.cp.azure.actions.network_security_group.NetworkSecurityGroupActions nsg_actions:  # noqa: E501
+        :param str nsg_name:
+        :param str resource_group_name:
+        :param list[SecurityRule] rules:
+        :return:
+        """
+        return self.write(
+            key=(
+                nsg_actions.subscription_id,
+                nsg_actions.credentials_id,
+                resource_group_name.lower(),
+                nsg_name.lower(),
+            ),
+            items=rules,
+            nsg_actions=nsg_actions,
+            nsg_name=nsg_name,
+            resource_group_name=resource_group_name,
+        )
+
+    def _write(self, key, requests_items, requests_kwargs):
+        rules = [rule for rules in requests_items for rule in rules]
+        start_priorities = {rule.name: rule.priority for rule in rules}
+
+        # requests with the same key share the subscription and the credentials,
+        # so NSG actions of any request can be used for the merged update
+        self._update_nsg_rules(
+            rules=rules, start_priorities=start_priorities, **requests_kwargs[0]
+        )
+
+        return requests_items
+
+    @retry(PRECONDITION_FAILED_RETRY_POLICY)
+    def _update_nsg_rules(
+        self, nsg_actions, nsg_name, resource_group_name, rules, start_priorities
+    ):
+        # NSG could be shared by the client cache, so it is copied before the update
+        nsg = copy.copy(
+            nsg_actions.get_network_security_group(
+                nsg_name=nsg_name, resource_group_name=resource_group_name
+            )
+        )
+        # rules with the same names will be replaced by the new ones
+        existing_rules = [
+            rule
+            for rule in nsg.security_rules or []
+            if rule.name not in start_priorities
+        ]
+        rules_priority_generator = NSGRulesPriorityGenerator(
+            nsg_name=nsg_name,
+            resource_group_name=resource_group_name,
+            existing_rules=existing_rules,
+        )
+
+        for rule in rules:
+            rule.priority = rules_priority_generator.get_priority(
+                start_from=start_priorities[rule.name]
+            )
+
+        nsg.security_rules = [*existing_rules, *rules]
+
+        # cached priority allocators are refreshed by the changed NSG ETag
+        return nsg_actions.update_network_security_group(
+            nsg=nsg, resource_group_name=resource_group_name, etag=nsg.etag
+        )
@@ -1,15 +1,17 @@
-import traceback
+import functools
+import random
+import time
+from dataclasses import dataclass, replace
+from typing import Callable
 
 from msrest.exceptions import ClientRequestError
 from msrestazure.azure_exceptions import CloudError
-from requests.packages.urllib3.exceptions import ConnectionError
+from requests.packages.urllib3.exceptions import ClosedPoolError, ConnectionError
 
 RETRYABLE_ERROR_STRING = "retryable"
-RETRYABLE_WAIT_TIME = 2000
-RETRYABLE_ERROR_MAX_ATTEMPTS = 20
-VM_DISK_DETACH_MAX_ATTEMPT_NUMBER = 300
-PUBLIC_IP_DETACH_MAX_ATTEMPT_NUMBER = 500
-ANOTHER_OPERATION_IN_PROGRESS_MAX_ATTEMPT_NUMBER = 500
+POOL_IS_CLOSED_ERROR_STRING = "pool is closed"
+PRECONDITION_FAILED_STATUS_CODE = 412
+TOO_MANY_REQUESTS_STATUS_CODE = 429
 
 
 def retry_on_connection_error(exception):
@@ -21,13 +23,22 @@ def retry_on_connection_error(exception):
         [
             isinstance(exception, ClientRequestError),
             isinstance(exception, ConnectionError),
-            _is_pool_closed_error(),
+            _is_pool_closed_error(exception),
         ]
     )
 
 
-def _is_pool_closed_error():
-    return "pool is closed" in traceback.format_exc()
+def _is_pool_closed_error(exception):
+    """Check the exception and the exceptions it was raised from."""
+    while exception is not None:
+        if isinstance(exception, ClosedPoolError) or (
+            not isinstance(exception, CloudError)
+            and POOL_IS_CLOSED_ERROR_STRING in str(exception).lower()
+        ):
+            return True
+        exception = exception.__cause__ or exception.__context__
+
+    return False
 
 
 def retry_on_retryable_error(exception: Exception):
@@ -60,3 +71,226 @@ def retry_on_another_operation_in_progress_error(exception: Exception):
         isinstance(exception, CloudError)
         and "another operation" in exception.message.lower()
     )
+
+
+def retry_on_precondition_failed_error(exception: Exception):
+    """Return True if resource was changed since it was read (ETag mismatch)."""
+    return (
+        isinstance(exception, CloudError)
+        and exception.status_code == PRECONDITION_FAILED_STATUS_CODE
+    )
+
+
+def retry_on_throttling_error(exception: Exception):
+    """Return True if request was throttled by Azure."""
+    return (
+        isinstance(exception, CloudError)
+        and exception.status_code == TOO_MANY_REQUESTS_STATUS_CODE
+    )
+
+
+def get_retry_after(exception: Exception):
+    """Get delay in seconds from the 'Retry-After' header of the failed response.
+
+    :rtype: int | None
+    """
+    response = getattr(exception, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    retry_after = headers.get("Retry-After")
+
+    if retry_after and retry_after.isdigit():
+        return int(retry_after)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Retry policy for the errors of one class.
+
+    :param name: name of the policy that can be used to override it
+    :param retry_on_exception: function that returns True if error is retryable
+    :param max_time: time budget in seconds for the retries of the error
+    :param wait_exponential_multiplier: first wait time in seconds
+    :param wait_exponential_max: max wait time in seconds
+    """
+
+    name: str
+    retry_on_exception: Callable[[Exception], bool]
+    max_time: float
+    wait_exponential_multiplier: float = 1
+    wait_exponential_max: float = 30
+
+    def get_wait_time(self, attempt_number):
+        """Get exponential wait time for the attempt randomized in its upper half.
+
+        :param int attempt_number:
+        :rtype: float
+        """
+        wait_time = min(
+            self.wait_exponential_multiplier * 2 ** (attempt_number - 1),
+            self.wait_exponential_max,
+        )
+        return random.uniform(wait_time / 2, wait_time)
+
+    def with_options(self, **options):
+        """Get copy of the policy with the changed options.
+
+        :rtype: RetryPolicy
+        """
+        return replace(self, **options)
+
+
+CONNECTION_ERROR_RETRY_POLICY = RetryPolicy(
+    name="connection_error",
+    retry_on_exception=retry_on_connection_error,
+    max_time=30,
+    wait_exponential_max=10,
+)
+RETRYABLE_ERROR_RETRY_POLICY = RetryPolicy(
+    name="retryable_error",
+    retry_on_exception=retry_on_retryable_error,
+    max_time=60,
+    wait_exponential_max=10,
+)
+VM_DISK_DETACH_RETRY_POLICY = RetryPolicy(
+    name="vm_disk_detach",
+    retry_on_exception=retry_on_vm_disk_detach_error,
+    max_time=10 * 60,
+    wait_exponential_multiplier=2,
+)
+PUBLIC_IP_DETACH_RETRY_POLICY = RetryPolicy(
+    name="public_ip_detach",
+    retry_on_exception=retry_on_public_ip_detach_error,
+    max_time=15 * 60,
+    wait_exponential_multiplier=2,
+)
+ANOTHER_OPERATION_IN_PROGRESS_RETRY_POLICY = RetryPolicy(
+    name="another_operation_in_progress",
+    retry_on_exception=retry_on_another_operation_in_progress_error,
+    max_time=15 * 60,
+    wait_exponential_multiplier=2,
+)
+PRECONDITION_FAILED_RETRY_POLICY = RetryPolicy(
+    name="precondition_failed",
+    retry_on_exception=retry_on_precondition_failed_error,
+    max_time=30,
+    wait_exponential_multiplier=0.5,
+    wait_exponential_max=5,
+)
+THROTTLING_RETRY_POLICY = RetryPolicy(
+    name="throttling",
+    retry_on_exception=retry_on_throttling_error,
+    max_time=5 * 60,
+    wait_exponential_multiplier=5,
+    wait_exponential_max=60,
+)
+
+RETRY_POLICIES = {
+    policy.name: policy
+    for policy in (
+        CONNECTION_ERROR_RETRY_POLICY,
+        RETRYABLE_ERROR_RETRY_POLICY,
+        VM_DISK_DETACH_RETRY_POLICY,
+        PUBLIC_IP_DETACH_RETRY_POLICY,
+        ANOTHER_OPERATION_IN_PROGRESS_RETRY_POLICY,
+        PRECONDITION_FAILED_RETRY_POLICY,
+        THROTTLING_RETRY_POLICY,
+    )
+}
+
+
+def get_retry_policies(time_budgets):
+    """Get default retry policies with the changed time budgets.
+
+    :param dict[str, float] time_budgets: time budgets in seconds by the names
+        of the policies
+    :rtype: list[RetryPolicy]
+    """
+    return [
+        RETRY_POLICIES[name].with_options(max_time=max_time)
+        for name, max_time in time_budgets.items()
+    ]
+
+
+class RetryPoliciesEngine:
+    """Retry function call according to the policy of the raised error.
+
+    Each error class has its own time budget and backoff, the budget is counted
+    from the first failure with the error of this class. Delay from the
+    'Retry-After' header of the failed response is used if present. Throttled
+    requests (429) are always retried with the THROTTLING_RETRY_POLICY unless
+    another throttling policy is given.
+    """
+
+    def __init__(self, policies, policies_overrides=None):
+        """Init command.
+
+        :param list[RetryPolicy] policies:
+        :param dict[str, RetryPolicy] policies_overrides: policies by their names
+            that should be used instead of the given ones
+        """
+        policies_overrides = policies_overrides or {}
+
+        if all(policy.name != THROTTLING_RETRY_POLICY.name for policy in policies):
+            policies = [*policies, THROTTLING_RETRY_POLICY]
+
+        self._policies = [
+            policies_overrides.get(policy.name, policy) for policy in policies
+        ]
+
+    def _get_policy(self, exception):
+        for policy in self._policies:
+            if policy.retry_on_exception(exception):
+                return policy
+
+    def call(self, func, *args, **kwargs):
+        first_failure_times = {}
+        attempt_numbers = {}
+
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                policy = self._get_policy(e)
+
+                if policy is None:
+                    raise
+
+                now = time.monotonic()
+                first_failure_time = first_failure_times.setdefault(policy.name, now)
+                attempt_number = attempt_numbers.get(policy.name, 0) + 1
+                attempt_numbers[policy.name] = attempt_number
+
+                wait_time = get_retry_after(e)
+                if wait_time is None:
+                    wait_time = policy.get_wait_time(attempt_number)
+
+                if now + wait_time - first_failure_time > policy.max_time:
+                    raise
+
+            time.sleep(wait_time)
+
+
+def retry(*policies):
+    """Retry decorated function according to the policies of the raised errors.
+
+    If the first argument of the function has 'retry_policies' attribute it is
+    used to override policies by their names, so the retries can be configured
+    per AzureAPIClient instance.
+
+    :param RetryPolicy policies:
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            policies_overrides = (
+                getattr(args[0], "retry_policies", None) if args else None
+            )
+            engine = RetryPoliciesEngine(
+                policies=policies, policies_overrides=policies_overrides
+            )
+            return engine.call(func, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -1,7 +1,11 @@
+import threading
+
+
 class RollbackCommandsManager:
     def __init__(self, logger):
         self.commands = []
         self.logger = logger
+        self._lock = threading.Lock()
 
     def register_command(self, command):
         """Register rollback command.
@@ -9,14 +13,18 @@ class RollbackCommandsManager:
         :param RollbackCommand command:
         :return:
         """
-        self.commands.append(command)
+        with self._lock:
+            self.commands.append(command)
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         if exc_type is not None:
-            for command in self.commands[::-1]:
+            with self._lock:
+                commands = self.commands[::-1]
+
+            for command in commands:
                 if command.executed:
                     try:
                         self.logger.info(f"Running rollback for command {command}")
@@ -0,0 +1,87 @@
+import functools
+import inspect
+import threading
+from collections import Counter
+from concurrent.futures import Future
+
+from cloudshell.cp.azure.utils.cache import get_cache_key
+from cloudshell.cp.azure.utils.singleton_utils import SingletonByArgsMeta
+
+
+class SingleFlight(metaclass=SingletonByArgsMeta):
+    """Share result of the call between all identical concurrent calls.
+
+    The first call for the key is executed, all calls with the same key that
+    come while it is in progress wait for its result (or exception) instead of
+    being executed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._coalesced_calls = Counter()
+
+    def call(self, name, key, func, *args, **kwargs):
+        """Execute function or wait for the result of the identical call.
+
+        :param str name: name of the call used in the statistics
+        :param key: key of the identical calls
+        :param func: function to execute
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            is_leader = future is None
+
+            if is_leader:
+                future = self._calls[key] = Future()
+            else:
+                self._coalesced_calls[name] += 1
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def get_coalesced_calls(self):
+        """Get number of the calls that waited for the identical ones.
+
+        :rtype: dict[str, int]
+        """
+        with self._lock:
+            return dict(self._coalesced_calls)
+
+
+def single_flight(func):
+    """Share result between identical concurrent calls of the method.
+
+    Calls are identical if they are made for the same method with the same
+    arguments within the same 'cache_namespace' and with the same 'credentials_id'
+    of the method owner, so clients with different credentials for the same
+    subscription don't share results.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        bound_args = signature.bind(self, *args, **kwargs)
+        bound_args.apply_defaults()
+        arguments = dict(bound_args.arguments)
+        arguments.pop("self")
+        key = get_cache_key(
+            namespace=(self.cache_namespace, self.credentials_id),
+            resource_type=func.__qualname__,
+            arguments=arguments,
+        )
+        return SingleFlight().call(func.__qualname__, key, func, self, *args, **kwargs)
+
+    return wrapper
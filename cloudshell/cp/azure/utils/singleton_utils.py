@@ -1,4 +1,6 @@
 import threading
+import time
+from collections import OrderedDict
 
 
 class SingletonByArgsMeta(type):
@@ -16,22 +18,93 @@ class SingletonByArgsMeta(type):
         >>>
         >>> Test("a1" , "b1") is Test("a2" , "b2")
         >>> False
+
+    Instances are stored by the key built from the arguments themselves, so
+    arguments must be hashable (objects are compared by identity). Class can
+    override the key with the 'get_singleton_key' classmethod. Number of the
+    instances can be bounded with the SINGLETON_MAX_INSTANCES and
+    SINGLETON_IDLE_TIMEOUT class attributes, least recently used and idle
+    instances are evicted and closed if they have the 'close' method.
+    Instances for different keys are created concurrently.
     """
 
+    SINGLETON_MAX_INSTANCES = None
+    SINGLETON_IDLE_TIMEOUT = None
+
     def __init__(cls, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        cls.__instances_by_cls = {}
+        cls.__instances = OrderedDict()
+        cls.__construction_locks = {}
         cls.__lock = threading.Lock()
 
+    def get_singleton_key(cls, *args, **kwargs):
+        """Get key of the instance created with the given arguments.
+
+        :rtype: collections.abc.Hashable
+        """
+        return args, tuple(sorted(kwargs.items()))
+
     def __call__(cls, *args, **kwargs):
+        key = cls.get_singleton_key(*args, **kwargs)
+        instance = cls.__get_instance(key)
 
-        key = (cls, str(args), str(kwargs))
+        if instance is not None:
+            return instance
 
         with cls.__lock:
-            instance = cls.__instances_by_cls.get(key)
+            construction_lock = cls.__construction_locks.setdefault(
+                key, threading.Lock()
+            )
+
+        try:
+            with construction_lock:
+                instance = cls.__get_instance(key)
 
-            if not instance:
-                instance = super(SingletonByArgsMeta, cls).__call__(*args, **kwargs)
-                cls.__instances_by_cls[key] = instance
+                if instance is None:
+                    instance = super().__call__(*args, **kwargs)
+                    cls.__add_instance(key, instance)
+        finally:
+            with cls.__lock:
+                cls.__construction_locks.pop(key, None)
 
         return instance
+
+    def __get_instance(cls, key):
+        with cls.__lock:
+            _, instance = cls.__instances.get(key, (None, None))
+
+            if instance is not None:
+                cls.__instances[key] = (time.monotonic(), instance)
+                cls.__instances.move_to_end(key)
+
+            return instance
+
+    def __add_instance(cls, key, instance):
+        evicted_instances = []
+
+        with cls.__lock:
+            now = time.monotonic()
+            cls.__instances[key] = (now, instance)
+
+            if cls.SINGLETON_IDLE_TIMEOUT is not None:
+                # instances are ordered by the last usage time
+                while True:
+                    oldest_key, (last_used_time, oldest_instance) = next(
+                        iter(cls.__instances.items())
+                    )
+
+                    if now - last_used_time <= cls.SINGLETON_IDLE_TIMEOUT:
+                        break
+
+                    del cls.__instances[oldest_key]
+                    evicted_instances.append(oldest_instance)
+
+            if cls.SINGLETON_MAX_INSTANCES is not None:
+                while len(cls.__instances) > cls.SINGLETON_MAX_INSTANCES:
+                    evicted_instances.append(cls.__instances.popitem(last=False)[1][1])
+
+        for evicted_instance in evicted_instances:
+            close = getattr(evicted_instance, "close", None)
+
+            if callable(close):
+                close()
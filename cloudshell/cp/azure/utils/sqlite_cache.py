@@ -0,0 +1,146 @@
+import pickle
+import sqlite3
+import threading
+import time
+
+from cloudshell.cp.azure.utils.cache import MISSING, CacheBackend
+from cloudshell.cp.azure.utils.singleton_utils import SingletonByArgsMeta
+
+
+class SQLiteCache(CacheBackend, metaclass=SingletonByArgsMeta):
+    """Persistent cache backend stored in the local SQLite database.
+
+    Cached values survive restarts of the driver process. Each entry keeps the
+    namespace of its key (i.e. subscription ID) and the version of the cache
+    format, entries of other versions are treated as missing. Values are pickled,
+    values that can't be pickled are not cached.
+    """
+
+    VERSION = 1
+    DEFAULT_MAX_SIZE = 10000
+    BUSY_TIMEOUT = 30
+
+    def __init__(self, path, max_size=None):
+        """Init command.
+
+        :param str path: path to the SQLite database file
+        :param int max_size: max number of the cached values
+        """
+        self._max_size = max_size or self.DEFAULT_MAX_SIZE
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path,
+            timeout=self.BUSY_TIMEOUT,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, "
+                "namespace TEXT, "
+                "version INTEGER NOT NULL, "
+                "expiration_time REAL NOT NULL, "
+                "access_time REAL NOT NULL, "
+                "value BLOB NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS cache_namespace ON cache (namespace)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS cache_access_time ON cache (access_time)"
+            )
+
+    @staticmethod
+    def _serialize_key(key):
+        return repr(key)
+
+    @staticmethod
+    def _get_namespace(key):
+        if isinstance(key, tuple) and key:
+            return str(key[0])
+
+        return None
+
+    def get(self, key):
+        serialized_key = self._serialize_key(key)
+        now = time.time()
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT version, expiration_time, value FROM cache WHERE key = ?",
+                (serialized_key,),
+            ).fetchone()
+
+            if row is None:
+                return MISSING
+
+            version, expiration_time, value = row
+
+            if version != self.VERSION or expiration_time < now:
+                self._connection.execute(
+                    "DELETE FROM cache WHERE key = ?", (serialized_key,)
+                )
+                return MISSING
+
+            self._connection.execute(
+                "UPDATE cache SET access_time = ? WHERE key = ?",
+                (now, serialized_key),
+            )
+
+        try:
+            return pickle.loads(value)
+        except Exception:
+            # value was pickled by the incompatible version of the code
+            self.delete(key)
+            return MISSING
+
+    def put(self, key, value, ttl):
+        try:
+            serialized_value = pickle.dumps(value)
+        except Exception:
+            return
+
+        now = time.time()
+
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO cache "
+                "(key, namespace, version, expiration_time, access_time, value) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    self._serialize_key(key),
+                    self._get_namespace(key),
+                    self.VERSION,
+                    now + ttl,
+                    now,
+                    serialized_value,
+                ),
+            )
+            self._connection.execute(
+                "DELETE FROM cache WHERE key IN ("
+                "SELECT key FROM cache ORDER BY access_time DESC LIMIT -1 OFFSET ?)",
+                (self._max_size,),
+            )
+
+    def delete(self, key):
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM cache WHERE key = ?", (self._serialize_key(key),)
+            )
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute("DELETE FROM cache")
+
+    def clear_namespace(self, namespace):
+        """Delete all values of the namespace.
+
+        :param str namespace: namespace of the values, i.e. subscription ID
+        """
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM cache WHERE namespace = ?", (namespace,)
+            )
@@ -0,0 +1,211 @@
+import logging
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from cryptography.hazmat.primitives import serialization as crypto_serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519
+
+from cloudshell.cp.core.utils import generate_ssh_key_pair as generate_rsa_key_pair
+
+from cloudshell.cp.azure.exceptions import UnsupportedSSHKeyTypeException
+from cloudshell.cp.azure.utils.singleton_utils import SingletonByArgsMeta
+
+logger = logging.getLogger(__name__)
+
+RSA_KEY_TYPE = "rsa"
+ED25519_KEY_TYPE = "ed25519"
+
+
+def generate_ed25519_key_pair():
+    """Generate Ed25519 SSH key pair.
+
+    :return: private and public keys
+    :rtype: tuple[str, str]
+    """
+    key = ed25519.Ed25519PrivateKey.generate()
+    private_key = key.private_bytes(
+        encoding=crypto_serialization.Encoding.PEM,
+        format=crypto_serialization.PrivateFormat.OpenSSH,
+        encryption_algorithm=crypto_serialization.NoEncryption(),
+    )
+    public_key = key.public_key().public_bytes(
+        encoding=crypto_serialization.Encoding.OpenSSH,
+        format=crypto_serialization.PublicFormat.OpenSSH,
+    )
+
+    return private_key.decode(), public_key.decode()
+
+
+KEY_PAIR_GENERATORS = {
+    RSA_KEY_TYPE: generate_rsa_key_pair,
+    ED25519_KEY_TYPE: generate_ed25519_key_pair,
+}
+
+
+def get_key_pair_generator(key_type):
+    """Get function that generates SSH key pair of the given type.
+
+    :param str key_type:
+    :rtype: callable
+    """
+    try:
+        return KEY_PAIR_GENERATORS[key_type.lower()]
+    except KeyError:
+        raise UnsupportedSSHKeyTypeException(
+            f"SSH key type '{key_type}' is not supported. Supported types: "
+            f"{', '.join(KEY_PAIR_GENERATORS)}"
+        )
+
+
+def generate_ssh_key_pair(key_type=RSA_KEY_TYPE):
+    """Generate SSH key pair of the given type.
+
+    :param str key_type:
+    :return: private and public keys
+    :rtype: tuple[str, str]
+    """
+    return get_key_pair_generator(key_type)()
+
+
+class SSHKeyPairPool(metaclass=SingletonByArgsMeta):
+    """Bounded pool of the pre-generated SSH key pairs.
+
+    Key pairs are generated by the long-lived worker processes, so the generation
+    doesn't contend for the GIL with the other commands and the interpreters
+    aren't started on each refill. Once the number of the ready and the requested
+    key pairs drops below the low watermark, the pool is refilled up to the high
+    watermark. If the pool is empty the key pair is generated in the calling
+    thread.
+    """
+
+    MAX_WORKERS = 2
+    REFILL_RETRY_INTERVAL = 60
+
+    def __init__(self, key_type=RSA_KEY_TYPE, low_watermark=2, high_watermark=5):
+        """Init command.
+
+        :param str key_type: type of the generated SSH keys, "rsa" or "ed25519"
+        :param int low_watermark: pool is refilled when it has fewer key pairs
+        :param int high_watermark: max number of the pre-generated key pairs
+        """
+        get_key_pair_generator(key_type)
+        self._key_type = key_type.lower()
+        self._low_watermark = low_watermark
+        self._high_watermark = max(high_watermark, low_watermark)
+        self._lock = threading.Lock()
+        self._key_pairs = deque()
+        self._executor = None
+        self._requested_count = 0
+        self._refill_failed_time = None
+        self._closed = False
+
+    def get_key_pair(self, logger):
+        """Get pre-generated key pair and start the refill if needed.
+
+        :param logging.Logger logger:
+        :return: private and public keys
+        :rtype: tuple[str, str]
+        """
+        with self._lock:
+            key_pair = self._key_pairs.popleft() if self._key_pairs else None
+
+        self.fill()
+
+        if key_pair is None:
+            logger.info("SSH key pairs pool is empty, generating the key pair")
+            key_pair = generate_ssh_key_pair(self._key_type)
+
+        return key_pair
+
+    def fill(self):
+        """Start the background refill if the pool is below the low watermark."""
+        with self._lock:
+            missing_count = self._get_missing_count()
+            self._requested_count += missing_count
+            executor = self._get_executor() if missing_count else None
+
+        for _ in range(missing_count):
+            try:
+                future = executor.submit(generate_ssh_key_pair, self._key_type)
+            except Exception as e:
+                self._on_refill_failed(e)
+                # requested key pair won't be generated
+                with self._lock:
+                    self._requested_count -= 1
+            else:
+                future.add_done_callback(self._on_key_pair_generated)
+
+    def get_size(self):
+        """Get number of the ready key pairs.
+
+        :rtype: int
+        """
+        with self._lock:
+            return len(self._key_pairs)
+
+    def close(self):
+        """Stop the worker processes and drop the ready key pairs."""
+        with self._lock:
+            self._closed = True
+            self._key_pairs.clear()
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _get_missing_count(self):
+        available_count = len(self._key_pairs) + self._requested_count
+
+        if self._closed or available_count >= self._low_watermark:
+            return 0
+
+        if (
+            self._refill_failed_time is not None
+            and time.monotonic() - self._refill_failed_time < self.REFILL_RETRY_INTERVAL
+        ):
+            return 0
+
+        return self._high_watermark - available_count
+
+    def _get_executor(self):
+        if self._executor is None:
+            # spawned workers don't inherit locks held by the other threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.MAX_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+        return self._executor
+
+    def _on_key_pair_generated(self, future):
+        with self._lock:
+            self._requested_count -= 1
+
+        try:
+            key_pair = future.result()
+        except Exception as e:
+            self._on_refill_failed(e)
+            return
+
+        with self._lock:
+            if not self._closed and len(self._key_pairs) < self._high_watermark:
+                self._key_pairs.append(key_pair)
+
+    def _on_refill_failed(self, error):
+        with self._lock:
+            self._refill_failed_time = time.monotonic()
+
+            # broken executor can't be used anymore, it will be created again
+            if isinstance(error, BrokenProcessPool):
+                executor, self._executor = self._executor, None
+            else:
+                executor = None
+
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+        logger.warning("Unable to refill SSH key pairs pool", exc_info=error)
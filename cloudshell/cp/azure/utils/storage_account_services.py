@@ -0,0 +1,62 @@
+import threading
+
+from cloudshell.cp.azure.utils.cache import TTLLRUCache
+from cloudshell.cp.azure.utils.lazy_import import LazyModule
+from cloudshell.cp.azure.utils.singleton_utils import SingletonByArgsMeta
+
+storage_blob = LazyModule("azure.storage.blob")
+storage_file = LazyModule("azure.storage.file")
+
+
+class StorageAccountServices:
+    """Storage Account access key with the Blob and File services built on it."""
+
+    def __init__(self, account_name, account_key):
+        """Init command.
+
+        :param str account_name:
+        :param str account_key:
+        """
+        self.account_name = account_name
+        self.account_key = account_key
+        self._lock = threading.Lock()
+        self._blob_service = None
+        self._file_service = None
+
+    @property
+    def blob_service(self):
+        """Get Azure Blob service of the Storage Account.
+
+        :rtype: azure.storage.blob.BlockBlobService
+        """
+        with self._lock:
+            if self._blob_service is None:
+                self._blob_service = storage_blob.BlockBlobService(
+                    account_name=self.account_name, account_key=self.account_key
+                )
+
+            return self._blob_service
+
+    @property
+    def file_service(self):
+        """Get Azure File service of the Storage Account.
+
+        :rtype: azure.storage.file.FileService
+        """
+        with self._lock:
+            if self._file_service is None:
+                self._file_service = storage_file.FileService(
+                    account_name=self.account_name, account_key=self.account_key
+                )
+
+            return self._file_service
+
+
+class StorageAccountServicesCache(TTLLRUCache, metaclass=SingletonByArgsMeta):
+    """Process-wide in-memory cache of the Storage Accounts services.
+
+    Access keys are kept only in memory and are never stored in the pluggable
+    cache backend of the AzureAPIClient.
+    """
+
+    DEFAULT_MAX_SIZE = 100
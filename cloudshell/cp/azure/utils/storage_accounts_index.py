@@ -0,0 +1,191 @@
+import logging
+import threading
+import time
+
+from cloudshell.cp.azure.utils.azure_name_parser import (
+    get_resource_group_name_from_resource_id,
+)
+from cloudshell.cp.azure.utils.singleton_utils import SingletonByArgsMeta
+
+logger = logging.getLogger(__name__)
+
+
+class StorageAccountsIndex(metaclass=SingletonByArgsMeta):
+    """Process-wide index of the Storage Account names to the resource groups.
+
+    Storage Account names are unique across Azure, so the index allows to get
+    the account with a direct GET instead of listing all accounts in the
+    subscription. The index is refreshed incrementally: entries are updated while
+    the pages of the list are received, and the lookup of the missing name stops
+    as soon as the name is found. Removed accounts are dropped at the end of the
+    full scan. While the index is used it is kept hot by the background thread.
+    Index is kept per subscription and credentials of the client, it lists the
+    accounts with its own client created from the settings of the last used
+    client and the module logger, the settings are dropped when the index becomes
+    idle.
+    """
+
+    REFRESH_INTERVAL = 10 * 60
+    MIN_SCAN_INTERVAL = 60
+    IDLE_TIMEOUT = 60 * 60
+
+    def __init__(self, subscription_id, credentials_id):
+        """Init command.
+
+        :param str subscription_id:
+        :param tuple credentials_id: identity of the client credentials, see
+            AzureAPIClient.credentials_id
+        """
+        self._subscription_id = subscription_id
+        self._credentials_id = credentials_id
+        self._lock = threading.Lock()
+        self._scan_lock = threading.Lock()
+        self._resource_groups = {}
+        self._client_class = None
+        self._client_settings = None
+        self._azure_client = None
+        self._scan = None
+        self._scan_generation = 0
+        self._scanned_generations = {}
+        self._last_full_scan_time = None
+        self._last_used_time = None
+        self._refresh_thread = None
+
+    def get_resource_group_name(self, storage_account_name, azure_client):
+        """Get resource group name of the Storage Account.
+
+        :param str storage_account_name:
+        :param cloudshell.cp.azure.azure_client.AzureAPIClient azure_client:
+        :return: resource group name or None if account wasn't found
+        :rtype: str
+        """
+        name = storage_account_name.lower()
+        client_settings = azure_client.get_settings()
+
+        with self._lock:
+            if client_settings != self._client_settings:
+                self._client_class = type(azure_client)
+                self._client_settings = client_settings
+                self._azure_client = None
+
+            self._last_used_time = time.monotonic()
+            self._start_refresh_thread()
+            resource_group_name = self._resource_groups.get(name)
+
+        if resource_group_name is not None:
+            return resource_group_name
+
+        if self._is_scanned_recently():
+            return None
+
+        return self._scan_until_found(name)
+
+    def discard(self, storage_account_name):
+        """Remove outdated entry of the Storage Account.
+
+        :param str storage_account_name:
+        """
+        with self._lock:
+            self._resource_groups.pop(storage_account_name.lower(), None)
+            self._last_full_scan_time = None
+
+    def _is_scanned_recently(self):
+        with self._lock:
+            return (
+                self._last_full_scan_time is not None
+                and time.monotonic() - self._last_full_scan_time
+                < self.MIN_SCAN_INTERVAL
+            )
+
+    def _scan_until_found(self, name):
+        with self._scan_lock:
+            # accounts could be indexed while we were waiting for the scan
+            with self._lock:
+                resource_group_name = self._resource_groups.get(name)
+
+            if resource_group_name is not None:
+                return resource_group_name
+
+            try:
+                for indexed_name, resource_group_name in self._continue_scan():
+                    if indexed_name == name:
+                        return resource_group_name
+            except Exception:
+                # scan will be started from the beginning on the next lookup
+                self._scan = None
+                raise
+
+        return None
+
+    def _continue_scan(self):
+        """Continue the current scan or start the new one, yield indexed accounts.
+
+        Must be called under the scan lock.
+        """
+        if self._scan is None:
+            self._scan_generation += 1
+            self._scan = iter(self._get_azure_client().list_storage_accounts())
+
+        generation = self._scan_generation
+
+        for storage_account in self._scan:
+            name = storage_account.name.lower()
+            resource_group_name = get_resource_group_name_from_resource_id(
+                storage_account.id
+            )
+
+            with self._lock:
+                self._resource_groups[name] = resource_group_name
+                self._scanned_generations[name] = generation
+
+            yield name, resource_group_name
+
+        self._scan = None
+
+        with self._lock:
+            for name, scanned_generation in list(self._scanned_generations.items()):
+                if scanned_generation != generation:
+                    del self._scanned_generations[name]
+                    self._resource_groups.pop(name, None)
+
+            self._last_full_scan_time = time.monotonic()
+
+    def _get_azure_client(self):
+        """Get client of the index created with the last used settings.
+
+        :rtype: cloudshell.cp.azure.azure_client.AzureAPIClient
+        """
+        with self._lock:
+            if self._azure_client is None:
+                self._azure_client = self._client_class(
+                    logger=logger, **self._client_settings
+                )
+
+            return self._azure_client
+
+    def _start_refresh_thread(self):
+        """Start background refresh thread. Must be called under the lock."""
+        if self._refresh_thread is None or not self._refresh_thread.is_alive():
+            self._refresh_thread = threading.Thread(
+                target=self._refresh_periodically, daemon=True
+            )
+            self._refresh_thread.start()
+
+    def _refresh_periodically(self):
+        while True:
+            time.sleep(self.REFRESH_INTERVAL)
+
+            with self._lock:
+                if time.monotonic() - self._last_used_time > self.IDLE_TIMEOUT:
+                    self._refresh_thread = None
+                    self._client_settings = None
+                    self._azure_client = None
+                    return
+
+            with self._scan_lock:
+                try:
+                    for _ in self._continue_scan():
+                        pass
+                except Exception:
+                    # scan will be started from the beginning on the next refresh
+                    self._scan = None
@@ -0,0 +1,138 @@
+import bisect
+import typing
+from dataclasses import dataclass
+
+from netaddr import IPNetwork
+
+from cloudshell.cp.azure.utils.cache import MISSING, TTLLRUCache
+from cloudshell.cp.azure.utils.singleton_utils import SingletonByArgsMeta
+
+SANDBOX_SUBNET_NAME_SEPARATOR = "_"
+
+
+@dataclass(frozen=True)
+class AddressRange:
+    first: int
+    last: int
+    subnet: typing.Any
+
+
+def get_address_range(cidr):
+    """Get first and last addresses of the CIDR as integers.
+
+    :param str cidr:
+    :rtype: tuple[int, int]
+    """
+    network = IPNetwork(cidr)
+    return network.first, network.last
+
+
+class VirtualNetworkAddressIndex:
+    """Index of the vNet subnets by their address ranges and reservations.
+
+    Address ranges of the subnets are kept sorted by the first address. Subnets
+    of the vNet don't overlap each other, so the subnets that overlap with the
+    given range are the neighbours of its position and are found with a binary
+    search. Sandbox subnets are named '<reservation resource group>_<cidr>' and
+    are also indexed by the reservation resource group name.
+    """
+
+    def __init__(self, subnets):
+        """Init command.
+
+        :param list[Subnet] subnets:
+        """
+        ranges = []
+        self._subnets_by_reservation = {}
+
+        for subnet in subnets or []:
+            for cidr in self._get_subnet_cidrs(subnet):
+                first, last = get_address_range(cidr)
+                ranges.append(AddressRange(first=first, last=last, subnet=subnet))
+
+            reservation, separator, _ = subnet.name.rpartition(
+                SANDBOX_SUBNET_NAME_SEPARATOR
+            )
+
+            if separator:
+                self._subnets_by_reservation.setdefault(reservation.lower(), []).append(
+                    subnet
+                )
+
+        self._ranges = sorted(ranges, key=lambda address_range: address_range.first)
+        self._firsts = [address_range.first for address_range in self._ranges]
+
+    @staticmethod
+    def _get_subnet_cidrs(subnet):
+        if subnet.address_prefix:
+            return [subnet.address_prefix]
+
+        return list(getattr(subnet, "address_prefixes", None) or [])
+
+    def find_overlapping(self, cidr):
+        """Get subnets that overlap with the CIDR.
+
+        :param str cidr:
+        :rtype: list[Subnet]
+        """
+        first, last = get_address_range(cidr)
+        index = bisect.bisect_right(self._firsts, last) - 1
+        subnets = []
+
+        # ranges don't overlap, so their last addresses are sorted too
+        while index >= 0 and self._ranges[index].last >= first:
+            subnet = self._ranges[index].subnet
+
+            if subnet not in subnets:
+                subnets.append(subnet)
+
+            index -= 1
+
+        return subnets
+
+    def find_containing(self, cidr):
+        """Get subnet that contains the whole CIDR.
+
+        :param str cidr:
+        :return: subnet or None if there is no such subnet
+        """
+        first, last = get_address_range(cidr)
+        index = bisect.bisect_right(self._firsts, first) - 1
+
+        if index >= 0 and self._ranges[index].last >= last:
+            return self._ranges[index].subnet
+
+        return None
+
+    def get_reservation_subnets(self, resource_group_name):
+        """Get Sandbox subnets of the reservation.
+
+        :param str resource_group_name: reservation resource group name
+        :rtype: list[Subnet]
+        """
+        return list(self._subnets_by_reservation.get(resource_group_name.lower(), []))
+
+
+class VirtualNetworkAddressIndexCache(TTLLRUCache, metaclass=SingletonByArgsMeta):
+    """Process-wide cache of the vNet indexes by the vNet ETag."""
+
+    DEFAULT_MAX_SIZE = 100
+    TTL = 60 * 60
+
+    def get_index(self, vnet):
+        """Get index of the vNet subnets.
+
+        :param VirtualNetwork vnet:
+        :rtype: VirtualNetworkAddressIndex
+        """
+        if not vnet.id or not vnet.etag:
+            return VirtualNetworkAddressIndex(vnet.subnets)
+
+        key = (vnet.id.lower(), vnet.etag)
+        index = self.get(key)
+
+        if index is MISSING:
+            index = VirtualNetworkAddressIndex(vnet.subnets)
+            self.put(key, index, ttl=self.TTL)
+
+        return index
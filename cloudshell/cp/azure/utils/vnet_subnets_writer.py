@@ -0,0 +1,226 @@
+import copy
+import typing
+from dataclasses import dataclass
+
+from cloudshell.cp.azure.utils.coalescing_writer import CoalescingWriter, FailedWrite
+from cloudshell.cp.azure.utils.retrying import PRECONDITION_FAILED_RETRY_POLICY, retry
+from cloudshell.cp.azure.utils.singleton_utils import SingletonByArgsMeta
+from cloudshell.cp.azure.utils.vnet_address_index import (
+    VirtualNetworkAddressIndexCache,
+)
+
+
+@dataclass
+class SubnetOperation:
+    subnet_name: str
+    subnet: typing.Any = None
+    replace_overlapping: bool = False
+
+    @property
+    def is_delete(self) -> bool:
+        return self.subnet is None
+
+
+class VirtualNetworkSubnetsWriter(CoalescingWriter, metaclass=SingletonByArgsMeta):
+    """Per-vNet write queue that merges concurrent subnet operations.
+
+    ARM serializes subnet writes within the vNet, so subnet create, update and
+    delete operations for the vNet are queued and applied to the vNet snapshot
+    with as few conditional (If-Match) vNet updates as possible. The update is
+    repeated on the ETag mismatch. If the merged update fails, requests are
+    written one by one, so a single bad request doesn't fail the others.
+    Queues are separated by the subscription and the credentials, and each
+    request is logged and written with its own network actions and logger.
+    """
+
+    def write_subnets(
+        self,
+        network_actions,
+        vnet_name,
+        resource_group_name,
+        subnets,
+        logger,
+        replace_overlapping=True,
+    ):
+        """Create or update subnets in the existing vNet.
+
+        :param cloudshell.cp.azure.actions.network.NetworkActions network_actions:
+        :param str vnet_name:
+        :param str resource_group_name:
+        :param list[Subnet] subnets:
+        :param logging.Logger logger:
+        :param bool replace_overlapping: remove existing subnets that overlap with
+            the written ones as stale ones
+        :return: written subnets in the order of the requested ones
+        :rtype: list[Subnet]
+        """
+        return self._write_operations(
+            network_actions=network_actions,
+            vnet_name=vnet_name,
+            resource_group_name=resource_group_name,
+            operations=[
+                SubnetOperation(
+                    subnet_name=subnet.name,
+                    subnet=subnet,
+                    replace_overlapping=replace_overlapping,
+                )
+                for subnet in subnets
+            ],
+            logger=logger,
+        )
+
+    def delete_subnets(
+        self, network_actions, vnet_name, resource_group_name, subnet_names, logger
+    ):
+        """Delete subnets from the vNet.
+
+        :param cloudshell.cp.azure.actions.network.NetworkActions network_actions:
+        :param str vnet_name:
+        :param str resource_group_name:
+        :param list[str] subnet_names:
+        :param logging.Logger logger:
+        """
+        self._write_operations(
+            network_actions=network_actions,
+            vnet_name=vnet_name,
+            resource_group_name=resource_group_name,
+            operations=[
+                SubnetOperation(subnet_name=subnet_name) for subnet_name in subnet_names
+            ],
+            logger=logger,
+        )
+
+    def _write_operations(
+        self, network_actions, vnet_name, resource_group_name, operations, logger
+    ):
+        return self.write(
+            key=(
+                network_actions.subscription_id,
+                network_actions.credentials_id,
+                resource_group_name.lower(),
+                vnet_name.lower(),
+            ),
+            items=operations,
+            network_actions=network_actions,
+            vnet_name=vnet_name,
+            resource_group_name=resource_group_name,
+            logger=logger,
+        )
+
+    def _write(self, key, requests_items, requests_kwargs):
+        # requests with the same key share the subscription and the credentials,
+        # so network actions of any request can be used for the merged update
+        vnet_name = requests_kwargs[0]["vnet_name"]
+        logger = requests_kwargs[0]["logger"]
+
+        try:
+            vnet = self._apply_operations(
+                network_actions=requests_kwargs[0]["network_actions"],
+                vnet_name=vnet_name,
+                resource_group_name=requests_kwargs[0]["resource_group_name"],
+                requests_items=requests_items,
+                loggers=[kwargs["logger"] for kwargs in requests_kwargs],
+            )
+        except Exception:
+            if len(requests_items) == 1:
+                raise
+
+            logger.warning(
+                f"Unable to apply {len(requests_items)} merged subnet requests to "
+                f"the vNet {vnet_name}, applying them one by one",
+                exc_info=True,
+            )
+        else:
+            return [
+                self._get_operations_results(vnet, operations)
+                for operations in requests_items
+            ]
+
+        results = []
+
+        for operations, kwargs in zip(requests_items, requests_kwargs):
+            try:
+                vnet = self._apply_operations(
+                    network_actions=kwargs["network_actions"],
+                    vnet_name=kwargs["vnet_name"],
+                    resource_group_name=kwargs["resource_group_name"],
+                    requests_items=[operations],
+                    loggers=[kwargs["logger"]],
+                )
+            except Exception as e:
+                results.append(FailedWrite(exception=e))
+            else:
+                results.append(self._get_operations_results(vnet, operations))
+
+        return results
+
+    @staticmethod
+    def _get_operations_results(vnet, operations):
+        subnets = {subnet.name.lower(): subnet for subnet in vnet.subnets or []}
+
+        return [
+            None if operation.is_delete else subnets[operation.subnet_name.lower()]
+            for operation in operations
+        ]
+
+    @retry(PRECONDITION_FAILED_RETRY_POLICY)
+    def _apply_operations(
+        self, network_actions, vnet_name, resource_group_name, requests_items, loggers
+    ):
+        # vNet could be shared by the client cache, so it is copied before the update
+        vnet = copy.copy(
+            network_actions.get_sandbox_virtual_network(
+                resource_group_name=resource_group_name,
+                sandbox_vnet_name=vnet_name,
+                fresh=True,
+            )
+        )
+        subnets = {subnet.name.lower(): subnet for subnet in vnet.subnets or []}
+        index = VirtualNetworkAddressIndexCache().get_index(vnet)
+        is_changed = False
+
+        for operations, logger in zip(requests_items, loggers):
+            for operation in operations:
+                is_changed |= self._apply_operation(
+                    subnets=subnets, index=index, operation=operation, logger=logger
+                )
+
+        if not is_changed:
+            return vnet
+
+        vnet.subnets = list(subnets.values())
+
+        return network_actions.update_virtual_network(
+            vnet=vnet, resource_group_name=resource_group_name, etag=vnet.etag
+        )
+
+    @staticmethod
+    def _apply_operation(subnets, index, operation, logger):
+        """Apply subnet operation to the vNet subnets.
+
+        :param dict subnets: vNet subnets by the lower-case names
+        :param cloudshell.cp.azure.utils.vnet_address_index.VirtualNetworkAddressIndex index:  # noqa: E501
+        :param SubnetOperation operation:
+        :param logging.Logger logger: logger of the operation request
+        :return: whether subnets were changed
+        :rtype: bool
+        """
+        name = operation.subnet_name.lower()
+
+        if operation.is_delete:
+            return subnets.pop(name, None) is not None
+
+        if operation.replace_overlapping:
+            for subnet in index.find_overlapping(operation.subnet.address_prefix):
+                existing_name = subnet.name.lower()
+
+                if existing_name != name and existing_name in subnets:
+                    logger.info(
+                        f"Subnet {subnet.name} ({subnet.address_prefix}) overlaps "
+                        f"with the subnet {operation.subnet_name}, it will be "
+                        f"removed as a stale one"
+                    )
+                    del subnets[existing_name]
+
+        subnets[name] = operation.subnet
+        return True
@@ -0,0 +1,54 @@
+import unittest
+from unittest import mock
+
+from cloudshell.cp.azure.flows.prepare_sandbox_infra.commands.create_subnets import (
+    CreateSubnetsCommand,
+)
+
+
+class TestCreateSubnetsCommand(unittest.TestCase):
+    def setUp(self):
+        self.network_actions = mock.MagicMock()
+        self.logger = mock.MagicMock()
+        self.vnet = mock.MagicMock()
+        self.vnet.name = "sandbox-vnet"
+        self.command = CreateSubnetsCommand(
+            rollback_manager=mock.MagicMock(),
+            cancellation_manager=mock.MagicMock(),
+            network_actions=self.network_actions,
+            vnet=self.vnet,
+            cidrs=["10.0.1.0/24", "10.0.2.0/24", "10.0.3.0/24"],
+            resource_group_name="sandbox-rg",
+            mgmt_resource_group_name="mgmt-rg",
+            network_security_group=mock.MagicMock(),
+            logger=self.logger,
+        )
+
+    def test_execute(self):
+        result = self.command.execute()
+
+        self.assertIs(result, self.network_actions.create_sandbox_subnets.return_value)
+        self.assertTrue(self.command.executed)
+
+    def test_rollback_continues_after_failure(self):
+        self.network_actions.delete_sandbox_subnet.side_effect = [
+            Exception("failed"),
+            None,
+            None,
+        ]
+
+        self.command.rollback()
+
+        self.assertEqual(
+            self.network_actions.delete_sandbox_subnet.call_args_list,
+            [
+                mock.call(
+                    cidr=cidr,
+                    vnet_name="sandbox-vnet",
+                    resource_group_name="sandbox-rg",
+                    mgmt_resource_group_name="mgmt-rg",
+                )
+                for cidr in ["10.0.1.0/24", "10.0.2.0/24", "10.0.3.0/24"]
+            ],
+        )
+        self.logger.warning.assert_called_once()
@@ -0,0 +1,170 @@
+import json
+import unittest
+from unittest import mock
+
+from cloudshell.cp.azure.flows.prepare_sandbox_infra.flow import (
+    AzurePrepareSandboxInfraFlow,
+)
+
+
+class TestAzurePrepareSandboxInfraFlow(unittest.TestCase):
+    def setUp(self):
+        self.resource_config = mock.MagicMock(parallel_sandbox_preparation=None)
+        self.reservation_info = mock.MagicMock()
+        self.reservation_info.get_resource_group_name.return_value = "sandbox-rg"
+        self.reservation_info.get_storage_account_name.return_value = "account"
+        self.reservation_info.get_network_security_group_name.return_value = "nsg"
+        self.request_actions = mock.MagicMock()
+        self.request_actions.prepare_cloud_infra.actionId = "cloud-infra-action"
+        self.request_actions.create_keys.actionId = "keys-action"
+        self.request_actions.prepare_subnets = [
+            mock.MagicMock(actionId="subnet-action-1"),
+            mock.MagicMock(actionId="subnet-action-2"),
+        ]
+        self.flow = self._get_flow()
+
+    def _get_flow(self, **kwargs):
+        return AzurePrepareSandboxInfraFlow(
+            resource_config=self.resource_config,
+            azure_client=mock.MagicMock(),
+            reservation_info=self.reservation_info,
+            cancellation_manager=mock.MagicMock(),
+            logger=mock.MagicMock(),
+            **kwargs,
+        )
+
+    def _mock_steps(self, predefined_subnets=False):
+        self.ssh_actions = mock.MagicMock()
+        self.ssh_actions.create_ssh_key_pair.return_value = ("private", "public")
+        self.steps = {
+            "prepare_common_objects": mock.MagicMock(),
+            "prepare_cloud_infra": mock.MagicMock(),
+            "_get_ssh_actions": mock.MagicMock(return_value=self.ssh_actions),
+            "_create_storage_account": mock.MagicMock(),
+            "_save_ssh_key_pair": mock.MagicMock(return_value="private"),
+            "_all_subnets_are_predefined": mock.MagicMock(
+                return_value=predefined_subnets
+            ),
+            "_create_nsg": mock.MagicMock(),
+            "_create_nsg_rules_for_nsg": mock.MagicMock(),
+            "_create_subnets_for_nsg": mock.MagicMock(
+                return_value={"subnet-action-1": "subnet-id-1"}
+            ),
+        }
+
+        for name, step in self.steps.items():
+            patcher = mock.patch.object(self.flow, name, step)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_parallel_prepare(self):
+        self._mock_steps()
+
+        response = json.loads(self.flow.prepare(self.request_actions))
+
+        results = {
+            result["actionId"]: result
+            for result in response["driverResponse"]["actionResults"]
+        }
+        self.assertEqual(results["keys-action"]["accessKey"], "private")
+        self.assertEqual(results["subnet-action-1"]["subnetId"], "subnet-id-1")
+        self.assertIsNone(results["subnet-action-2"]["subnetId"])
+        self.assertIn("cloud-infra-action", results)
+        self.steps["prepare_common_objects"].assert_called_once_with(
+            request_actions=self.request_actions
+        )
+        self.steps["_save_ssh_key_pair"].assert_called_once_with(
+            storage_account_name="account",
+            resource_group_name="sandbox-rg",
+            storage_account=self.steps["_create_storage_account"].return_value,
+            ssh_key_pair=("private", "public"),
+        )
+        nsg = self.steps["_create_nsg"].return_value
+        self.steps["_create_nsg_rules_for_nsg"].assert_called_once_with(
+            request_actions=self.request_actions,
+            resource_group_name="sandbox-rg",
+            nsg=nsg,
+        )
+        self.steps["_create_subnets_for_nsg"].assert_called_once_with(
+            request_actions=self.request_actions,
+            resource_group_name="sandbox-rg",
+            nsg=nsg,
+        )
+
+    def test_parallel_prepare_with_predefined_subnets(self):
+        self._mock_steps(predefined_subnets=True)
+
+        self.flow.prepare(self.request_actions)
+
+        self.steps["_create_nsg"].assert_not_called()
+        self.steps["_create_nsg_rules_for_nsg"].assert_not_called()
+        self.steps["_create_subnets_for_nsg"].assert_called_once_with(
+            request_actions=self.request_actions, resource_group_name="sandbox-rg"
+        )
+
+    def test_parallel_prepare_failure(self):
+        self._mock_steps()
+        error = Exception("failed")
+        self.steps["_create_nsg"].side_effect = error
+
+        with self.assertRaises(Exception) as context:
+            self.flow.prepare(self.request_actions)
+
+        self.assertIs(context.exception, error)
+        self.steps["_create_nsg_rules_for_nsg"].assert_not_called()
+        self.steps["_create_subnets_for_nsg"].assert_not_called()
+
+    @mock.patch(
+        "cloudshell.cp.azure.flows.prepare_sandbox_infra.flow."
+        "AbstractPrepareSandboxInfraFlow.prepare"
+    )
+    def test_sequential_prepare(self, base_prepare):
+        self.flow = self._get_flow(parallel_prepare=False)
+        self._mock_steps()
+
+        result = self.flow.prepare(self.request_actions)
+
+        self.assertIs(result, base_prepare.return_value)
+        base_prepare.assert_called_once_with(request_actions=self.request_actions)
+        self.steps["prepare_common_objects"].assert_not_called()
+
+    def test_parallel_prepare_is_taken_from_resource(self):
+        self.assertTrue(self._get_flow()._parallel_prepare)
+
+        self.resource_config.parallel_sandbox_preparation = False
+        self.assertFalse(self._get_flow()._parallel_prepare)
+        self.assertTrue(self._get_flow(parallel_prepare=True)._parallel_prepare)
+
+    def test_create_nsg_rules_for_nsg(self):
+        nsg = mock.MagicMock()
+        nsg.name = "created-nsg"
+
+        with mock.patch.object(self.flow, "_create_nsg_rules") as create_nsg_rules:
+            self.flow._create_nsg_rules_for_nsg(
+                request_actions=self.request_actions,
+                resource_group_name="sandbox-rg",
+                nsg=nsg,
+            )
+
+        create_nsg_rules.assert_called_once_with(
+            request_actions=self.request_actions,
+            resource_group_name="sandbox-rg",
+            nsg_name="created-nsg",
+        )
+
+    def test_create_subnets_for_nsg(self):
+        nsg = mock.MagicMock()
+
+        with mock.patch.object(self.flow, "_create_subnets") as create_subnets:
+            result = self.flow._create_subnets_for_nsg(
+                request_actions=self.request_actions,
+                resource_group_name="sandbox-rg",
+                nsg=nsg,
+            )
+
+        self.assertIs(result, create_subnets.return_value)
+        create_subnets.assert_called_once_with(
+            request_actions=self.request_actions,
+            resource_group_name="sandbox-rg",
+            network_security_group=nsg,
+        )
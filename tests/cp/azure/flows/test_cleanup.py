@@ -0,0 +1,37 @@
+import unittest
+from unittest import mock
+
+from cloudshell.cp.azure.flows.cleanup import AzureCleanupSandboxInfraFlow
+
+
+def _get_subnet(name, address_prefix):
+    subnet = mock.MagicMock(address_prefix=address_prefix, address_prefixes=None)
+    subnet.name = name
+    return subnet
+
+
+class TestAzureCleanupSandboxInfraFlow(unittest.TestCase):
+    def setUp(self):
+        self.flow = AzureCleanupSandboxInfraFlow(
+            resource_config=mock.MagicMock(),
+            azure_client=mock.MagicMock(),
+            reservation_info=mock.MagicMock(),
+            lock_manager=mock.MagicMock(),
+            logger=mock.MagicMock(),
+        )
+
+    def test_find_sandbox_subnets(self):
+        subnet_1 = _get_subnet("rg-1_10.0.1.0-24", "10.0.1.0/24")
+        subnet_2 = _get_subnet("RG-1_10.0.2.0-24", "10.0.2.0/24")
+        # name of another reservation starts with the resource group name
+        subnet_3 = _get_subnet("rg-10_10.0.3.0-24", "10.0.3.0/24")
+        sandbox_vnet = mock.MagicMock(
+            id=None, etag=None, subnets=[subnet_1, subnet_2, subnet_3]
+        )
+
+        self.assertEqual(
+            self.flow._find_sandbox_subnets(
+                resource_group_name="rg-1", sandbox_vnet=sandbox_vnet
+            ),
+            [subnet_1, subnet_2],
+        )
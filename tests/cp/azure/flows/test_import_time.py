@@ -0,0 +1,46 @@
+import json
+import subprocess
+import sys
+import unittest
+
+IMPORT_SCRIPT = """
+import json
+import sys
+import time
+
+start_time = time.perf_counter()
+
+import cloudshell.cp.azure.flows.access_key
+import cloudshell.cp.azure.flows.power_mgmt
+import cloudshell.cp.azure.flows.refresh_ip
+
+print(
+    json.dumps(
+        {
+            "duration": time.perf_counter() - start_time,
+            "modules": [
+                module
+                for module in sys.modules
+                if module.startswith(("azure.mgmt", "azure.storage"))
+            ],
+        }
+    )
+)
+"""
+
+
+class TestFlowsImportTime(unittest.TestCase):
+    # relaxed budget for loaded CI, eager SDK imports are caught by the modules check
+    MAX_IMPORT_DURATION = 10
+
+    @classmethod
+    def setUpClass(cls):
+        # modules are imported in a fresh interpreter to not reuse loaded ones
+        output = subprocess.check_output([sys.executable, "-c", IMPORT_SCRIPT])
+        cls.result = json.loads(output)
+
+    def test_azure_sdk_is_not_imported(self):
+        self.assertEqual(self.result["modules"], [])
+
+    def test_import_fits_time_budget(self):
+        self.assertLess(self.result["duration"], self.MAX_IMPORT_DURATION)
@@ -0,0 +1,63 @@
+import unittest
+from concurrent.futures import Future
+from unittest import mock
+
+from cloudshell.cp.azure.flows.power_mgmt import AzurePowerManagementFlow
+
+
+class TestAzurePowerManagementFlow(unittest.TestCase):
+    def setUp(self):
+        self.azure_client = mock.MagicMock()
+        self.reservation_info = mock.MagicMock()
+        self.reservation_info.get_resource_group_name.return_value = "sandbox-rg"
+        self.deployed_app = mock.MagicMock(resource_group_name=None)
+        self.deployed_app.name = "vm"
+        self.flow = AzurePowerManagementFlow(
+            resource_config=mock.MagicMock(),
+            azure_client=self.azure_client,
+            reservation_info=self.reservation_info,
+            logger=mock.MagicMock(),
+        )
+        operation_future = Future()
+        operation_future.set_result(None)
+        self.poller = mock.MagicMock()
+        self.poller.register.return_value = operation_future
+        patchers = [
+            mock.patch(
+                "cloudshell.cp.azure.async_azure_client.AzureOperationsPoller",
+                return_value=self.poller,
+            ),
+            mock.patch("cloudshell.cp.azure.async_azure_client.OperationStartPolling"),
+        ]
+
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def _get_operation_method():
+        def operation(vm_name, resource_group_name, polling=True):
+            pass
+
+        return mock.create_autospec(operation)
+
+    def test_power_on_awaits_operation(self):
+        self.azure_client.start_vm = self._get_operation_method()
+
+        self.flow.power_on(self.deployed_app)
+
+        self.azure_client.start_vm.assert_called_once_with(
+            vm_name="vm", resource_group_name="sandbox-rg", polling=mock.ANY
+        )
+        self.poller.register.assert_called_once()
+
+    def test_power_off_uses_app_resource_group(self):
+        self.deployed_app.resource_group_name = "vm-rg"
+        self.azure_client.stop_vm = self._get_operation_method()
+
+        self.flow.power_off(self.deployed_app)
+
+        self.azure_client.stop_vm.assert_called_once_with(
+            vm_name="vm", resource_group_name="vm-rg", polling=mock.ANY
+        )
+        self.poller.register.assert_called_once()
@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import unittest
+from concurrent.futures import Future, ThreadPoolExecutor
+from unittest import mock
+
+from cloudshell.cp.azure.async_azure_client import AsyncAzureAPIClient
+from cloudshell.cp.azure.utils.retrying import CONNECTION_ERROR_RETRY_POLICY, retry
+
+
+class FakeAzureAPIClient:
+    retry_policies = {}
+
+    def __init__(self):
+        self.threads = set()
+        self.polling_methods = []
+
+    def get_vm(self, vm_name):
+        self.threads.add(threading.current_thread().name)
+        return f"vm {vm_name}"
+
+    @retry(CONNECTION_ERROR_RETRY_POLICY)
+    def start_vm(self, vm_name, polling=True):
+        self.threads.add(threading.current_thread().name)
+        self.polling_methods.append(polling)
+
+
+class TestAsyncAzureAPIClient(unittest.TestCase):
+    def setUp(self):
+        self.azure_client = FakeAzureAPIClient()
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="test")
+        self.addCleanup(self.executor.shutdown)
+        self.async_client = AsyncAzureAPIClient(
+            azure_client=self.azure_client, executor=self.executor
+        )
+        self.operations_futures = []
+        poller = mock.MagicMock()
+        poller.register.side_effect = self._register_operation
+        patcher = mock.patch(
+            "cloudshell.cp.azure.async_azure_client.AzureOperationsPoller",
+            return_value=poller,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _register_operation(self, arm_polling):
+        future = Future()
+        self.operations_futures.append(future)
+        return future
+
+    def _run(self, coroutine):
+        return asyncio.new_event_loop().run_until_complete(coroutine)
+
+    def test_method_is_executed_in_executor(self):
+        result = self._run(self.async_client.get_vm(vm_name="vm"))
+
+        self.assertEqual(result, "vm vm")
+        self.assertEqual(len(self.azure_client.threads), 1)
+        self.assertTrue(self.azure_client.threads.pop().startswith("test"))
+
+    @mock.patch("cloudshell.cp.azure.async_azure_client.OperationStartPolling")
+    def test_operations_are_awaited_concurrently(self, start_polling_class):
+        operations_count = 100
+
+        async def run_operations():
+            tasks = [
+                asyncio.ensure_future(self.async_client.start_vm(vm_name=f"vm{idx}"))
+                for idx in range(operations_count)
+            ]
+
+            while len(self.operations_futures) < operations_count:
+                await asyncio.sleep(0.01)
+
+            for idx, future in enumerate(self.operations_futures):
+                future.set_result(idx)
+
+            return await asyncio.gather(*tasks)
+
+        results = self._run(run_operations())
+
+        self.assertEqual(sorted(results), list(range(operations_count)))
+        # operations are started with the polling that doesn't wait for them
+        self.assertEqual(
+            self.azure_client.polling_methods,
+            [start_polling_class.return_value] * operations_count,
+        )
+        # threads are held only for the initial requests
+        self.assertLessEqual(len(self.azure_client.threads), 2)
+
+    @mock.patch("cloudshell.cp.azure.async_azure_client.OperationStartPolling")
+    def test_operation_error_is_raised(self, start_polling_class):
+        async def run_operation():
+            task = asyncio.ensure_future(self.async_client.start_vm(vm_name="vm"))
+
+            while not self.operations_futures:
+                await asyncio.sleep(0.01)
+
+            self.operations_futures[0].set_exception(ValueError("failed"))
+            return await task
+
+        with self.assertRaisesRegex(ValueError, "failed"):
+            self._run(run_operation())
+
+    @mock.patch("cloudshell.cp.azure.async_azure_client.OperationStartPolling")
+    def test_cancelled_operation_is_not_polled(self, start_polling_class):
+        async def run_operation():
+            task = asyncio.ensure_future(self.async_client.start_vm(vm_name="vm"))
+
+            while not self.operations_futures:
+                await asyncio.sleep(0.01)
+
+            task.cancel()
+
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        self._run(run_operation())
+
+        self.assertTrue(self.operations_futures[0].cancelled())
+
+    def test_attributes_are_not_wrapped(self):
+        self.assertEqual(self.async_client.retry_policies, {})
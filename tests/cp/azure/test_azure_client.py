@@ -0,0 +1,176 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import requests
+from azure.common import AzureHttpError
+from msrestazure.azure_exceptions import CloudError
+
+from cloudshell.cp.azure.azure_client import AzureAPIClient
+from cloudshell.cp.azure.utils.cache import ProcessCache, TTLLRUCache
+from cloudshell.cp.azure.utils.sqlite_cache import SQLiteCache
+
+
+def _get_cloud_error(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = b""
+    return CloudError(response)
+
+
+class TestGetIfNoneMatch(unittest.TestCase):
+    def setUp(self):
+        self.client = AzureAPIClient(
+            azure_subscription_id="subscription-id",
+            azure_tenant_id="tenant-id",
+            azure_application_id="application-id",
+            azure_application_key="application-key",
+            logger=mock.MagicMock(),
+            cache=TTLLRUCache(),
+        )
+        self.get_resource = mock.MagicMock(
+            side_effect=[
+                SimpleNamespace(etag="etag-1", subnets=["subnet-1"]),
+                _get_cloud_error(AzureAPIClient.NOT_MODIFIED_STATUS_CODE),
+                _get_cloud_error(AzureAPIClient.NOT_MODIFIED_STATUS_CODE),
+            ]
+        )
+
+    def _get_virtual_network(self):
+        return self.client._get_if_none_match(
+            "virtual_network", self.get_resource, virtual_network_name="vnet"
+        )
+
+    def test_not_modified_resource_is_returned_from_cache(self):
+        self._get_virtual_network()
+        vnet = self._get_virtual_network()
+
+        self.assertEqual(vnet.subnets, ["subnet-1"])
+        self.get_resource.assert_called_with(custom_headers={"If-None-Match": "etag-1"})
+
+    def test_changes_of_returned_resource_do_not_affect_cache(self):
+        self._get_virtual_network().subnets.append("subnet-2")
+        self._get_virtual_network().subnets.append("subnet-3")
+
+        self.assertEqual(self._get_virtual_network().subnets, ["subnet-1"])
+
+    def test_other_errors_are_raised(self):
+        self.get_resource.side_effect = [
+            SimpleNamespace(etag="etag-1"),
+            _get_cloud_error(AzureAPIClient.NOT_FOUND_STATUS_CODE),
+        ]
+        self._get_virtual_network()
+
+        with self.assertRaises(CloudError):
+            self._get_virtual_network()
+
+
+class TestFromResourceConfig(unittest.TestCase):
+    def setUp(self):
+        self.resource_config = mock.MagicMock(
+            azure_application_key="application-key",
+            retry_time_budgets={},
+            cache_db_path="",
+        )
+
+    def test_process_cache_is_used_by_default(self):
+        client = AzureAPIClient.from_resource_config(
+            self.resource_config, logger=mock.MagicMock()
+        )
+
+        self.assertIs(client.cache, ProcessCache())
+
+    def test_sqlite_cache_is_used_with_db_path(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.resource_config.cache_db_path = os.path.join(temp_dir.name, "cache.db")
+
+        client = AzureAPIClient.from_resource_config(
+            self.resource_config, logger=mock.MagicMock()
+        )
+
+        self.assertIs(client.cache, SQLiteCache(self.resource_config.cache_db_path))
+        self.assertIs(client.get_settings()["cache"], client.cache)
+
+
+class TestCallStorageAccountServices(unittest.TestCase):
+    def setUp(self):
+        self.client = AzureAPIClient(
+            azure_subscription_id="subscription-id",
+            azure_tenant_id="tenant-id",
+            azure_application_id="application-id",
+            azure_application_key="application-key",
+            logger=mock.MagicMock(),
+        )
+        patchers = [
+            mock.patch(
+                "cloudshell.cp.azure.azure_client.StorageAccountServicesCache",
+                return_value=TTLLRUCache(),
+            ),
+            mock.patch.object(
+                self.client,
+                "_get_storage_account_key",
+                side_effect=["rotated-key", "new-key"],
+            ),
+        ]
+
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.account_keys = []
+
+    def test_access_key_is_refetched_once_when_access_is_forbidden(self):
+        forbidden_error = AzureHttpError(
+            "forbidden", AzureAPIClient.FORBIDDEN_STATUS_CODE
+        )
+        results = iter([forbidden_error, "result", "another result"])
+
+        def func(services):
+            self.account_keys.append(services.account_key)
+            result = next(results)
+
+            if isinstance(result, Exception):
+                raise result
+
+            return result
+
+        for expected_result in ("result", "another result"):
+            self.assertEqual(
+                self.client._call_storage_account_services(
+                    resource_group_name="rg", storage_account_name="account", func=func
+                ),
+                expected_result,
+            )
+
+        # the new key is cached
+        self.assertEqual(self.account_keys, ["rotated-key", "new-key", "new-key"])
+        self.assertEqual(self.client._get_storage_account_key.call_count, 2)
+
+    def test_forbidden_error_after_refetch_is_raised(self):
+        func = mock.MagicMock(
+            side_effect=AzureHttpError(
+                "forbidden", AzureAPIClient.FORBIDDEN_STATUS_CODE
+            )
+        )
+
+        with self.assertRaises(AzureHttpError):
+            self.client._call_storage_account_services(
+                resource_group_name="rg", storage_account_name="account", func=func
+            )
+
+        self.assertEqual(func.call_count, 2)
+        self.assertEqual(self.client._get_storage_account_key.call_count, 2)
+
+    def test_other_errors_are_raised_without_refetch(self):
+        func = mock.MagicMock(side_effect=AzureHttpError("not found", 404))
+
+        with self.assertRaises(AzureHttpError):
+            self.client._call_storage_account_services(
+                resource_group_name="rg", storage_account_name="account", func=func
+            )
+
+        func.assert_called_once()
+        self.client._get_storage_account_key.assert_called_once()
@@ -0,0 +1,69 @@
+import unittest
+from unittest import mock
+
+from cloudshell.cp.azure.utils.arm_throttling import ARMThrottleGovernor, TokenBucket
+
+
+class TestTokenBucket(unittest.TestCase):
+    def setUp(self):
+        self.now = 0
+        patcher = mock.patch(
+            "cloudshell.cp.azure.utils.arm_throttling.time",
+            monotonic=lambda: self.now,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.bucket = TokenBucket(capacity=2, refill_rate=0.5)
+
+    def test_free_tokens_are_given_without_delay(self):
+        self.assertEqual(self.bucket.reserve(), 0)
+        self.assertEqual(self.bucket.reserve(), 0)
+        self.assertEqual(self.bucket.tokens, 0)
+
+    def test_callers_are_delayed_with_refill_rate(self):
+        self.bucket.reserve()
+        self.bucket.reserve()
+
+        self.assertEqual(self.bucket.reserve(), 2)
+        self.assertEqual(self.bucket.reserve(), 4)
+
+    def test_tokens_are_refilled_up_to_capacity(self):
+        self.bucket.reserve()
+        self.bucket.reserve()
+        self.now = 100
+
+        self.assertEqual(self.bucket.tokens, 2)
+
+    def test_debt_is_capped_by_max_delay(self):
+        delays = [self.bucket.reserve(max_delay=5) for _ in range(100)]
+
+        self.assertEqual(delays[:5], [0, 0, 2, 4, 5])
+        self.assertEqual(set(delays[5:]), {5})
+        self.assertEqual(self.bucket.tokens, -2.5)
+
+        # debt is paid off in max delay
+        self.now = 5
+        self.assertEqual(self.bucket.tokens, 0)
+
+    def test_sync_with_remaining_tokens(self):
+        self.bucket.sync(1)
+        self.assertEqual(self.bucket.tokens, 1)
+
+        # server can't give more tokens than the bucket has
+        self.bucket.sync(10)
+        self.assertEqual(self.bucket.tokens, 1)
+
+    def test_block_is_kept_by_callers_with_max_delay(self):
+        self.bucket.block(30)
+
+        self.assertEqual(self.bucket.reserve(max_delay=5), 30)
+        self.assertEqual(self.bucket.tokens, -15)
+
+
+class TestARMThrottleGovernor(unittest.TestCase):
+    def test_get_operation_class(self):
+        self.assertEqual(ARMThrottleGovernor.get_operation_class("get"), "reads")
+        self.assertEqual(ARMThrottleGovernor.get_operation_class("HEAD"), "reads")
+        self.assertEqual(ARMThrottleGovernor.get_operation_class("PUT"), "writes")
+        self.assertEqual(ARMThrottleGovernor.get_operation_class("PATCH"), "writes")
+        self.assertEqual(ARMThrottleGovernor.get_operation_class("DELETE"), "deletes")
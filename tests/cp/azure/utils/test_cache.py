@@ -0,0 +1,73 @@
+import unittest
+from unittest import mock
+
+from cloudshell.cp.azure.utils.cache import MISSING, TTLLRUCache, cached
+
+
+class CachedResourcesOwner:
+    CACHE_TTLS = {"virtual_network": 60}
+
+    def __init__(self):
+        self.cache = TTLLRUCache()
+        self.cache_namespace = "subscription-id"
+        self.get_resource = mock.MagicMock(
+            side_effect=lambda name: {"name": name, "subnets": ["subnet-1"]}
+        )
+
+    @cached("virtual_network")
+    def get_virtual_network(self, name):
+        return self.get_resource(name)
+
+
+class TestCached(unittest.TestCase):
+    def setUp(self):
+        self.owner = CachedResourcesOwner()
+
+    def test_value_is_fetched_once(self):
+        self.owner.get_virtual_network("vnet")
+        self.owner.get_virtual_network("VNET")
+
+        self.owner.get_resource.assert_called_once_with("vnet")
+
+    def test_fresh_value_replaces_cached_one(self):
+        self.owner.get_virtual_network("vnet")
+        self.owner.get_virtual_network("vnet", fresh=True)
+        self.owner.get_virtual_network("vnet")
+
+        self.assertEqual(self.owner.get_resource.call_count, 2)
+
+    def test_changes_of_returned_value_do_not_affect_cache(self):
+        vnet = self.owner.get_virtual_network("vnet")
+        vnet["subnets"].append("subnet-2")
+
+        cached_vnet = self.owner.get_virtual_network("vnet")
+        cached_vnet["name"] = "changed"
+
+        self.assertEqual(
+            self.owner.get_virtual_network("vnet"),
+            {"name": "vnet", "subnets": ["subnet-1"]},
+        )
+        self.owner.get_resource.assert_called_once_with("vnet")
+
+
+class TestTTLLRUCache(unittest.TestCase):
+    @mock.patch("cloudshell.cp.azure.utils.cache.time")
+    def test_expired_value_is_missing(self, time):
+        time.monotonic.return_value = 100
+        cache = TTLLRUCache()
+        cache.put("key", "value", ttl=10)
+
+        time.monotonic.return_value = 111
+
+        self.assertIs(cache.get("key"), MISSING)
+
+    def test_least_recently_used_value_is_evicted(self):
+        cache = TTLLRUCache(max_size=2)
+        cache.put("key-1", "value-1", ttl=60)
+        cache.put("key-2", "value-2", ttl=60)
+        cache.get("key-1")
+        cache.put("key-3", "value-3", ttl=60)
+
+        self.assertEqual(cache.get("key-1"), "value-1")
+        self.assertIs(cache.get("key-2"), MISSING)
+        self.assertEqual(cache.get("key-3"), "value-3")
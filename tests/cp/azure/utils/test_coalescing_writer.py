@@ -0,0 +1,160 @@
+import threading
+import unittest
+from collections import defaultdict
+
+from cloudshell.cp.azure.utils.coalescing_writer import CoalescingWriter, FailedWrite
+
+
+class BlockingWriter(CoalescingWriter):
+    """Writer whose writes are blocked until they are released by the test."""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+        self.batches_started = defaultdict(threading.Event)
+        self.batches_released = defaultdict(threading.Event)
+        self.is_released = False
+
+    def wait_batch_started(self, batch_number):
+        self.batches_started[batch_number].wait(timeout=5)
+
+    def release_batch(self, batch_number):
+        self.batches_released[batch_number].set()
+
+    def release_all(self):
+        self.is_released = True
+
+        for released in list(self.batches_released.values()):
+            released.set()
+
+    def _write(self, key, requests_items, requests_kwargs):
+        batch_number = len(self.batches)
+        self.batches.append([kwargs["caller"] for kwargs in requests_kwargs])
+        released = self.batches_released[batch_number]
+        self.batches_started[batch_number].set()
+
+        if not self.is_released:
+            released.wait(timeout=5)
+
+        return [
+            FailedWrite(exception=ValueError(items)) if "bad" in items else items
+            for items in requests_items
+        ]
+
+
+class TestCoalescingWriter(unittest.TestCase):
+    def setUp(self):
+        self.writer = BlockingWriter()
+        self.results = {}
+
+    def _write_in_thread(self, caller, items, key="key"):
+        def write():
+            try:
+                self.results[caller] = self.writer.write(
+                    key=key, items=items, caller=caller
+                )
+            except Exception as e:
+                self.results[caller] = e
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        return thread
+
+    def _wait_for_queue_depth(self, depth, key="key"):
+        for _ in range(500):
+            metrics = self.writer.get_metrics().get(key)
+
+            if metrics and metrics.queue_depth == depth:
+                return
+
+            threading.Event().wait(0.01)
+
+        self.fail(f"Queue depth {depth} wasn't reached")
+
+    def test_single_request_is_written(self):
+        self.writer.release_all()
+
+        self.assertEqual(self.writer.write(key="key", items=[1], caller=1), [1])
+        self.assertEqual(self.writer.batches, [[1]])
+
+    def test_concurrent_requests_are_merged(self):
+        leader = self._write_in_thread(caller="leader", items=[0])
+        self.writer.wait_batch_started(0)
+        followers = [
+            self._write_in_thread(caller=caller, items=[caller]) for caller in (1, 2)
+        ]
+        self._wait_for_queue_depth(2)
+        self.writer.release_all()
+
+        for thread in [leader, *followers]:
+            thread.join(timeout=5)
+
+        self.assertEqual(self.writer.batches, [["leader"], [1, 2]])
+        self.assertEqual(self.results, {"leader": [0], 1: [1], 2: [2]})
+        metrics = self.writer.get_metrics()["key"]
+        self.assertEqual(metrics.requests, 3)
+        self.assertEqual(metrics.writes, 2)
+        self.assertEqual(metrics.merge_ratio, 1.5)
+        self.assertEqual(metrics.max_queue_depth, 2)
+
+    def test_leader_returns_after_its_own_batch(self):
+        leader = self._write_in_thread(caller="leader", items=[0])
+        self.writer.wait_batch_started(0)
+        follower = self._write_in_thread(caller="follower", items=[1])
+        self._wait_for_queue_depth(1)
+        # let the leader finish its write, the follower write stays blocked
+        self.writer.release_batch(0)
+        self.writer.wait_batch_started(1)
+
+        leader.join(timeout=5)
+
+        self.assertFalse(leader.is_alive())
+        self.assertTrue(follower.is_alive())
+        self.assertEqual(self.results, {"leader": [0]})
+
+        self.writer.release_batch(1)
+        follower.join(timeout=5)
+
+        self.assertEqual(self.results["follower"], [1])
+
+    def test_failed_write_fails_only_its_request(self):
+        leader = self._write_in_thread(caller="leader", items=[0])
+        self.writer.wait_batch_started(0)
+        bad = self._write_in_thread(caller="bad", items=["bad"])
+        good = self._write_in_thread(caller="good", items=["good"])
+        self._wait_for_queue_depth(2)
+        self.writer.release_all()
+
+        for thread in (leader, bad, good):
+            thread.join(timeout=5)
+
+        self.assertIsInstance(self.results["bad"], ValueError)
+        self.assertEqual(self.results["good"], ["good"])
+
+    def test_write_error_fails_all_merged_requests(self):
+        class FailingWriter(CoalescingWriter):
+            def _write(self, key, requests_items, requests_kwargs):
+                raise ValueError()
+
+        writer = FailingWriter()
+
+        with self.assertRaises(ValueError):
+            writer.write(key="key", items=[1])
+
+        # key is released after the failure, so the next request is written
+        with self.assertRaises(ValueError):
+            writer.write(key="key", items=[2])
+
+        self.assertEqual(writer.get_metrics()["key"].writes, 2)
+
+    def test_requests_for_different_keys_are_not_merged(self):
+        self.writer.release_all()
+        threads = [
+            self._write_in_thread(caller=key, items=[key], key=key)
+            for key in ("key1", "key2")
+        ]
+
+        for thread in threads:
+            thread.join(timeout=5)
+
+        self.assertEqual(sorted(self.writer.batches), [["key1"], ["key2"]])
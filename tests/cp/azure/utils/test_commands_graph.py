@@ -0,0 +1,93 @@
+import threading
+import unittest
+from unittest import mock
+
+from cloudshell.cp.azure.utils.commands_graph import RollbackCommandsGraph
+
+
+class TestRollbackCommandsGraph(unittest.TestCase):
+    def setUp(self):
+        self.failure_logged = threading.Event()
+        self.logger = mock.MagicMock()
+        self.logger.warning.side_effect = lambda *args, **kwargs: (
+            self.failure_logged.set()
+        )
+        self.graph = RollbackCommandsGraph(logger=self.logger, max_workers=3)
+
+    def test_dependency_results_are_passed_as_kwargs(self):
+        self.graph.add_node("vm_nsg", lambda: "nsg")
+        self.graph.add_node("data_disks", lambda: ["disk"])
+        self.graph.add_node(
+            "vm_interfaces",
+            lambda vm_nsg: [f"interface-{vm_nsg}"],
+            depends_on=["vm_nsg"],
+        )
+        self.graph.add_node(
+            "vm",
+            lambda vm_interfaces, data_disks: (vm_interfaces, data_disks),
+            depends_on=["vm_interfaces", "data_disks"],
+        )
+
+        self.assertEqual(
+            self.graph.execute(),
+            {
+                "vm_nsg": "nsg",
+                "data_disks": ["disk"],
+                "vm_interfaces": ["interface-nsg"],
+                "vm": (["interface-nsg"], ["disk"]),
+            },
+        )
+
+    def test_unknown_dependency(self):
+        with self.assertRaises(ValueError):
+            self.graph.add_node("vm", mock.MagicMock(), depends_on=["vm_nsg"])
+
+    def test_duplicated_node(self):
+        self.graph.add_node("vm", mock.MagicMock())
+
+        with self.assertRaises(ValueError):
+            self.graph.add_node("vm", mock.MagicMock())
+
+    def test_running_nodes_are_awaited_and_no_nodes_are_started_after_failure(self):
+        executed = []
+        error = Exception("failed")
+
+        def fail():
+            raise error
+
+        def wait_for_failure():
+            # finishes only after the graph has processed the failure
+            self.failure_logged.wait(timeout=5)
+            executed.append("slow")
+
+        self.graph.add_node("failed", fail)
+        self.graph.add_node("slow", wait_for_failure)
+        self.graph.add_node(
+            "dependent", lambda slow: executed.append("dependent"), ["slow"]
+        )
+
+        with self.assertRaises(Exception) as context:
+            self.graph.execute()
+
+        self.assertIs(context.exception, error)
+        self.assertEqual(executed, ["slow"])
+
+    def test_first_error_is_raised(self):
+        first_error = Exception("first")
+        second_error = Exception("second")
+
+        def fail_first():
+            raise first_error
+
+        def fail_second():
+            self.failure_logged.wait(timeout=5)
+            raise second_error
+
+        self.graph.add_node("first", fail_first)
+        self.graph.add_node("second", fail_second)
+
+        with self.assertRaises(Exception) as context:
+            self.graph.execute()
+
+        self.assertIs(context.exception, first_error)
+        self.assertEqual(self.logger.warning.call_count, 2)
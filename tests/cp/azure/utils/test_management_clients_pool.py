@@ -0,0 +1,113 @@
+import threading
+import time
+import unittest
+from concurrent import futures
+from unittest import mock
+
+from cloudshell.cp.azure.utils.management_clients_pool import ManagementClientsPool
+
+
+class TestManagementClientsPool(unittest.TestCase):
+    def setUp(self):
+        self.now = 0
+        patcher = mock.patch(
+            "cloudshell.cp.azure.utils.management_clients_pool.time",
+            monotonic=lambda: self.now,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        # separate class keeps its own singleton instance
+        class Pool(ManagementClientsPool):
+            MAX_SIZE = 2
+            IDLE_TIMEOUT = 60
+
+        self.pool = Pool()
+
+    def test_client_is_shared_by_key(self):
+        create_client = mock.MagicMock(side_effect=lambda: mock.MagicMock())
+
+        client = self.pool.get_client(("network", "subscription-1"), create_client)
+
+        self.assertIs(
+            self.pool.get_client(("network", "subscription-1"), create_client), client
+        )
+        self.assertIsNot(
+            self.pool.get_client(("network", "subscription-2"), create_client), client
+        )
+        self.assertEqual(create_client.call_count, 2)
+        self.assertTrue(client.config.keep_alive)
+
+    def test_client_is_created_once_for_concurrent_requests(self):
+        creation_started = threading.Event()
+        release_creation = threading.Event()
+        client = mock.MagicMock()
+
+        def create_client():
+            creation_started.set()
+            release_creation.wait(timeout=5)
+            return client
+
+        create_client = mock.MagicMock(side_effect=create_client)
+
+        with futures.ThreadPoolExecutor(max_workers=5) as executor:
+            results = [
+                executor.submit(self.pool.get_client, "network", create_client)
+                for _ in range(5)
+            ]
+            creation_started.wait(timeout=5)
+            # client for another key isn't blocked by the pending creation
+            another_client = self.pool.get_client("compute", mock.MagicMock)
+            release_creation.set()
+
+        self.assertTrue(all(result.result() is client for result in results))
+        self.assertIsNot(another_client, client)
+        create_client.assert_called_once_with()
+
+    def test_creation_error_is_raised_to_waiting_requests(self):
+        creation_started = threading.Event()
+        release_creation = threading.Event()
+        error = Exception("unable to get token")
+
+        def create_client():
+            creation_started.set()
+            release_creation.wait(timeout=5)
+            raise error
+
+        with futures.ThreadPoolExecutor(max_workers=2) as executor:
+            creator = executor.submit(self.pool.get_client, "network", create_client)
+            creation_started.wait(timeout=5)
+            waiter = executor.submit(self.pool.get_client, "network", mock.MagicMock)
+            # let the waiter find the pending client
+            time.sleep(0.1)
+            release_creation.set()
+
+        self.assertIs(creator.exception(), error)
+        self.assertIs(waiter.exception(), error)
+
+        # failed client isn't kept in the pool
+        client = self.pool.get_client("network", mock.MagicMock)
+        self.assertIsInstance(client, mock.MagicMock)
+
+    def test_least_recently_used_client_is_closed(self):
+        client_1 = self.pool.get_client("client-1", mock.MagicMock)
+        client_2 = self.pool.get_client("client-2", mock.MagicMock)
+        self.pool.get_client("client-1", mock.MagicMock)
+
+        self.pool.get_client("client-3", mock.MagicMock)
+
+        client_2.close.assert_called_once_with()
+        client_1.close.assert_not_called()
+        self.assertIs(self.pool.get_client("client-1", mock.MagicMock), client_1)
+
+    def test_idle_client_is_closed(self):
+        client_1 = self.pool.get_client("client-1", mock.MagicMock)
+        self.now = 30
+        client_2 = self.pool.get_client("client-2", mock.MagicMock)
+        self.now = 61
+
+        self.pool.get_client("client-2", mock.MagicMock)
+
+        client_1.close.assert_called_once_with()
+        client_2.close.assert_not_called()
+        self.assertIsNot(self.pool.get_client("client-1", mock.MagicMock), client_1)
@@ -0,0 +1,142 @@
+import unittest
+from unittest import mock
+
+from cloudshell.cp.azure.utils import marketplace_images_warmer
+from cloudshell.cp.azure.utils.marketplace_images_warmer import (
+    MarketplaceImagesWarmer,
+)
+
+HOUR = 60 * 60
+
+refresh_periodically = MarketplaceImagesWarmer._refresh_periodically
+
+
+class FakeAzureAPIClient:
+    instances = []
+
+    def __init__(self, logger, **settings):
+        self.logger = logger
+        self.settings = settings
+        self.get_latest_virtual_machine_image = mock.MagicMock()
+        self.instances.append(self)
+
+    def get_settings(self):
+        return self.settings
+
+
+class TestMarketplaceImagesWarmer(unittest.TestCase):
+    def setUp(self):
+        self.now = 0
+        patchers = [
+            mock.patch(
+                "cloudshell.cp.azure.utils.marketplace_images_warmer.time",
+                monotonic=lambda: self.now,
+            ),
+            mock.patch.object(MarketplaceImagesWarmer, "_refresh_periodically"),
+        ]
+
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        # separate class keeps its own singleton instances
+        class Warmer(MarketplaceImagesWarmer):
+            pass
+
+        self.warmer = Warmer("subscription-id")
+        FakeAzureAPIClient.instances = []
+        self.caller_client = FakeAzureAPIClient(
+            logger=mock.MagicMock(),
+            azure_application_key="key",
+            cache_ttls={"marketplace_image": 6 * HOUR},
+        )
+
+    def _track(self, region, sku):
+        self.warmer.track(
+            azure_client=self.caller_client,
+            region=region,
+            publisher_name="Canonical",
+            offer="UbuntuServer",
+            sku=sku,
+        )
+
+    def test_track(self):
+        self._track("EastUS", "18.04-LTS")
+        self._track("westus", "20.04-LTS")
+        self._track("eastus", "18.04-LTS")
+
+        self.assertEqual(
+            self.warmer.get_tracked_images(),
+            [
+                ("eastus", "Canonical", "UbuntuServer", "18.04-LTS"),
+                ("westus", "Canonical", "UbuntuServer", "20.04-LTS"),
+            ],
+        )
+        self.assertEqual(
+            self.warmer.get_tracked_images(region="WestUS"),
+            [("westus", "Canonical", "UbuntuServer", "20.04-LTS")],
+        )
+
+    def test_warm_region_with_own_client(self):
+        self._track("eastus", "18.04-LTS")
+        self._track("westus", "20.04-LTS")
+
+        self.warmer.warm(region="eastus", fresh=False)
+
+        warmer_client = FakeAzureAPIClient.instances[-1]
+        self.assertIsNot(warmer_client, self.caller_client)
+        self.assertIs(warmer_client.logger, marketplace_images_warmer.logger)
+        self.assertEqual(warmer_client.settings, self.caller_client.settings)
+        warmer_client.get_latest_virtual_machine_image.assert_called_once_with(
+            region="eastus",
+            publisher_name="Canonical",
+            offer="UbuntuServer",
+            sku="18.04-LTS",
+            fresh=False,
+        )
+        self.caller_client.get_latest_virtual_machine_image.assert_not_called()
+
+    def test_warm_continues_after_failed_image(self):
+        self._track("eastus", "18.04-LTS")
+        self._track("eastus", "20.04-LTS")
+        self.warmer.warm()
+        warmer_client = FakeAzureAPIClient.instances[-1]
+        warmer_client.get_latest_virtual_machine_image.reset_mock()
+        warmer_client.get_latest_virtual_machine_image.side_effect = [
+            Exception("failed"),
+            None,
+        ]
+
+        self.warmer.warm()
+
+        self.assertEqual(warmer_client.get_latest_virtual_machine_image.call_count, 2)
+
+    def test_warm_without_tracked_client(self):
+        self.warmer.warm()
+
+        self.assertEqual(FakeAzureAPIClient.instances, [self.caller_client])
+
+    @mock.patch.object(MarketplaceImagesWarmer, "warm")
+    def test_idle_images_and_credentials_are_dropped(self, warm):
+        self._track("eastus", "18.04-LTS")
+        self.now = 5 * HOUR
+        self._track("eastus", "20.04-LTS")
+        self.now = 7 * HOUR
+        tracked_images = []
+
+        def warm_and_become_idle():
+            tracked_images.extend(self.warmer.get_tracked_images())
+            self.now = 12 * HOUR
+
+        warm.side_effect = warm_and_become_idle
+
+        refresh_periodically(self.warmer)
+
+        warm.assert_called_once_with()
+        self.assertEqual(
+            tracked_images, [("eastus", "Canonical", "UbuntuServer", "20.04-LTS")]
+        )
+        marketplace_images_warmer.time.sleep.assert_called_with(3 * HOUR)
+        self.assertEqual(self.warmer.get_tracked_images(), [])
+        self.assertIsNone(self.warmer._client_settings)
+        self.assertIsNone(self.warmer._get_azure_client())
@@ -0,0 +1,183 @@
+import time
+import unittest
+from unittest import mock
+
+from cloudshell.cp.azure.exceptions import NoFreeNSGRulePriorityException
+from cloudshell.cp.azure.utils.nsg_rules_priority_generator import (
+    FreeSlotsTree,
+    NSGRulesPriorityAllocator,
+    NSGRulesPriorityAllocatorsCache,
+    NSGRulesPriorityGenerator,
+)
+
+
+def _get_rule(name, priority):
+    rule = mock.MagicMock(priority=priority)
+    rule.name = name
+    return rule
+
+
+class TestFreeSlotsTree(unittest.TestCase):
+    def test_find_first_free(self):
+        tree = FreeSlotsTree(slots_count=10)
+
+        for idx in (0, 1, 2, 5):
+            tree.set_free(idx=idx, is_free=False)
+
+        self.assertEqual(tree.find_first_free(start=0), 3)
+        self.assertEqual(tree.find_first_free(start=4), 4)
+        self.assertEqual(tree.find_first_free(start=5), 6)
+
+    def test_find_first_free_after_release(self):
+        tree = FreeSlotsTree(slots_count=4)
+
+        for idx in range(4):
+            tree.set_free(idx=idx, is_free=False)
+
+        self.assertIsNone(tree.find_first_free(start=0))
+
+        tree.set_free(idx=1, is_free=True)
+
+        self.assertEqual(tree.find_first_free(start=0), 1)
+        self.assertIsNone(tree.find_first_free(start=2))
+
+    def test_slots_out_of_range_are_not_free(self):
+        tree = FreeSlotsTree(slots_count=5)
+
+        self.assertEqual(tree.find_first_free(start=4), 4)
+        self.assertIsNone(tree.find_first_free(start=5))
+        self.assertIsNone(tree.find_first_free(start=100))
+
+
+class TestNSGRulesPriorityAllocator(unittest.TestCase):
+    def test_allocate_skips_existing_priorities(self):
+        allocator = NSGRulesPriorityAllocator(
+            existing_rules=[_get_rule("r1", 1000), _get_rule("r2", 1005)]
+        )
+
+        self.assertEqual(allocator.allocate(start_from=1000, step=5), 1010)
+        self.assertEqual(allocator.allocate(start_from=1000, step=5), 1015)
+        self.assertEqual(allocator.allocate(start_from=1000, step=1), 1001)
+
+    def test_allocate_raises_when_range_is_exhausted(self):
+        allocator = NSGRulesPriorityAllocator()
+
+        self.assertEqual(allocator.allocate(start_from=4096, step=5), 4096)
+        with self.assertRaises(NoFreeNSGRulePriorityException):
+            allocator.allocate(start_from=4096, step=5)
+
+    def test_release_pending_priority(self):
+        allocator = NSGRulesPriorityAllocator()
+        priority = allocator.allocate(start_from=1000, step=5)
+
+        allocator.release(priority)
+
+        self.assertEqual(allocator.allocate(start_from=1000, step=5), priority)
+
+    def test_release_ignores_created_rule_priority(self):
+        allocator = NSGRulesPriorityAllocator()
+        priority = allocator.allocate(start_from=1000, step=5)
+        allocator.add_rule(rule_name="r1", priority=priority)
+
+        allocator.release(priority)
+
+        self.assertEqual(allocator.allocate(start_from=1000, step=5), 1005)
+
+    def test_remove_rule_frees_priority(self):
+        allocator = NSGRulesPriorityAllocator(existing_rules=[_get_rule("r1", 1000)])
+
+        allocator.remove_rule(rule_name="r1")
+
+        self.assertEqual(allocator.allocate(start_from=1000, step=5), 1000)
+
+    def test_refresh_keeps_pending_priorities(self):
+        allocator = NSGRulesPriorityAllocator(etag="1")
+        pending_priority = allocator.allocate(start_from=1000, step=5)
+
+        allocator.refresh(existing_rules=[_get_rule("r1", 1005)], etag="2")
+
+        self.assertEqual(allocator.etag, "2")
+        self.assertEqual(allocator.allocate(start_from=1000, step=5), 1010)
+
+        allocator.release(pending_priority)
+
+        self.assertEqual(allocator.allocate(start_from=1000, step=5), 1000)
+
+    def test_refresh_drops_expired_pending_priorities(self):
+        allocator = NSGRulesPriorityAllocator()
+        allocator.allocate(start_from=1000, step=5)
+
+        with mock.patch.object(allocator, "PENDING_PRIORITY_TIMEOUT", -1):
+            allocator.refresh(existing_rules=[], etag="2")
+
+        self.assertEqual(allocator.allocate(start_from=1000, step=5), 1000)
+
+
+class TestNSGRulesPriorityAllocatorsCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = NSGRulesPriorityAllocatorsCache()
+        self.cache.clear()
+        self.nsg = mock.MagicMock(etag="1", security_rules=[_get_rule("r1", 1000)])
+        self.nsg_actions = mock.MagicMock(subscription_id="subscription")
+        self.nsg_actions.get_network_security_group.return_value = self.nsg
+
+    def _get_allocator(self):
+        return self.cache.get_allocator(
+            nsg_name="nsg",
+            resource_group_name="rg",
+            nsg_actions=self.nsg_actions,
+        )
+
+    def test_allocator_is_cached_while_nsg_is_not_changed(self):
+        allocator = self._get_allocator()
+        allocator.allocate(start_from=1000, step=5)
+
+        self.assertIs(self._get_allocator(), allocator)
+        self.assertEqual(allocator.allocate(start_from=1000, step=5), 1010)
+
+    def test_allocator_is_refreshed_when_nsg_is_changed(self):
+        allocator = self._get_allocator()
+        self.nsg.etag = "2"
+        self.nsg.security_rules = [_get_rule("r1", 1000), _get_rule("r2", 1005)]
+
+        self.assertIs(self._get_allocator(), allocator)
+        self.assertEqual(allocator.allocate(start_from=1000, step=5), 1010)
+
+    def test_allocators_are_separated_by_subscription(self):
+        allocator = self._get_allocator()
+        self.nsg_actions.subscription_id = "another subscription"
+
+        self.assertIsNot(self._get_allocator(), allocator)
+
+    def test_remove_allocator(self):
+        allocator = self._get_allocator()
+
+        self.cache.remove_allocator(
+            subscription_id="subscription", nsg_name="NSG", resource_group_name="RG"
+        )
+
+        self.assertIsNot(self._get_allocator(), allocator)
+
+
+class TestNSGRulesPriorityGeneratorBenchmark(unittest.TestCase):
+    RULES_COUNT = 3900
+    OPERATIONS_COUNT = 10000
+    MAX_DURATION = 5
+
+    def test_allocate_and_release_on_nsg_with_thousands_of_rules(self):
+        rules = [
+            _get_rule(f"rule_{priority}", priority)
+            for priority in range(100, 100 + self.RULES_COUNT)
+        ]
+        generator = NSGRulesPriorityGenerator(
+            nsg_name="nsg", resource_group_name="rg", existing_rules=rules
+        )
+        start_time = time.perf_counter()
+
+        for _ in range(self.OPERATIONS_COUNT):
+            priority = generator.get_priority(start_from=100, increase_step=1)
+            generator.release_priority(priority)
+
+        duration = time.perf_counter() - start_time
+        self.assertEqual(priority, 100 + self.RULES_COUNT)
+        self.assertLess(duration, self.MAX_DURATION)
@@ -0,0 +1,185 @@
+import json
+import unittest
+from unittest import mock
+
+import requests
+from msrestazure.azure_exceptions import CloudError
+
+from cloudshell.cp.azure.utils.retrying import (
+    THROTTLING_RETRY_POLICY,
+    RetryPoliciesEngine,
+    RetryPolicy,
+    get_retry_policies,
+    retry,
+)
+
+
+def _get_cloud_error(status_code, message="error", retry_after=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = message
+    response.headers["Content-Type"] = "application/json"
+    response._content = json.dumps(
+        {"error": {"code": "Error", "message": message}}
+    ).encode()
+
+    if retry_after is not None:
+        response.headers["Retry-After"] = str(retry_after)
+
+    return CloudError(response)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestRetryPoliciesEngine(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch(
+            "cloudshell.cp.azure.utils.retrying.time",
+            monotonic=self.clock.monotonic,
+            sleep=self.clock.sleep,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.policy = RetryPolicy(
+            name="value_error",
+            retry_on_exception=lambda e: isinstance(e, ValueError),
+            max_time=10,
+            wait_exponential_multiplier=1,
+            wait_exponential_max=4,
+        )
+
+    def test_returns_result_after_retries(self):
+        func = mock.MagicMock(side_effect=[ValueError(), ValueError(), "result"])
+        engine = RetryPoliciesEngine(policies=[self.policy])
+
+        self.assertEqual(engine.call(func), "result")
+        self.assertEqual(func.call_count, 3)
+
+    def test_not_retryable_error_is_raised_at_once(self):
+        func = mock.MagicMock(side_effect=KeyError())
+        engine = RetryPoliciesEngine(policies=[self.policy])
+
+        with self.assertRaises(KeyError):
+            engine.call(func)
+
+        self.assertEqual(func.call_count, 1)
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_error_is_raised_when_time_budget_is_exhausted(self):
+        func = mock.MagicMock(side_effect=ValueError())
+        engine = RetryPoliciesEngine(policies=[self.policy])
+
+        with self.assertRaises(ValueError):
+            engine.call(func)
+
+        self.assertLessEqual(sum(self.clock.sleeps), self.policy.max_time)
+        self.assertGreater(func.call_count, 1)
+
+    def test_wait_time_grows_exponentially_up_to_max(self):
+        for attempt_number, (min_wait, max_wait) in enumerate(
+            [(0.5, 1), (1, 2), (2, 4), (2, 4)], start=1
+        ):
+            wait_time = self.policy.get_wait_time(attempt_number)
+            self.assertGreaterEqual(wait_time, min_wait)
+            self.assertLessEqual(wait_time, max_wait)
+
+    def test_budgets_are_counted_per_policy(self):
+        other_policy = RetryPolicy(
+            name="key_error",
+            retry_on_exception=lambda e: isinstance(e, KeyError),
+            max_time=12,
+            wait_exponential_multiplier=4,
+            wait_exponential_max=4,
+        )
+        self.policy = self.policy.with_options(
+            max_time=12, wait_exponential_multiplier=4, wait_exponential_max=4
+        )
+        # each error class fits its own budget, but not the shared one
+        errors = [ValueError(), KeyError(), ValueError(), KeyError()]
+        func = mock.MagicMock(side_effect=[*errors, "result"])
+        engine = RetryPoliciesEngine(policies=[self.policy, other_policy])
+
+        with mock.patch("random.uniform", side_effect=lambda a, b: b):
+            self.assertEqual(engine.call(func), "result")
+
+        self.assertEqual(self.clock.sleeps, [4, 4, 4, 4])
+
+    def test_retry_after_header_is_used_as_wait_time(self):
+        error = _get_cloud_error(status_code=400, retry_after=7)
+        policy = self.policy.with_options(
+            retry_on_exception=lambda e: isinstance(e, CloudError)
+        )
+        func = mock.MagicMock(side_effect=[error, "result"])
+        engine = RetryPoliciesEngine(policies=[policy])
+
+        self.assertEqual(engine.call(func), "result")
+        self.assertEqual(self.clock.sleeps, [7])
+
+    def test_retry_after_beyond_budget_is_not_waited(self):
+        error = _get_cloud_error(status_code=400, retry_after=60)
+        policy = self.policy.with_options(
+            retry_on_exception=lambda e: isinstance(e, CloudError)
+        )
+        func = mock.MagicMock(side_effect=[error, "result"])
+        engine = RetryPoliciesEngine(policies=[policy])
+
+        with self.assertRaises(CloudError):
+            engine.call(func)
+
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_throttled_requests_are_always_retried(self):
+        error = _get_cloud_error(status_code=429, retry_after=3)
+        func = mock.MagicMock(side_effect=[error, error, "result"])
+        engine = RetryPoliciesEngine(policies=[self.policy])
+
+        self.assertEqual(engine.call(func), "result")
+        self.assertEqual(self.clock.sleeps, [3, 3])
+
+    def test_policies_are_overridden_by_name(self):
+        func = mock.MagicMock(side_effect=[ValueError(), "result"])
+        engine = RetryPoliciesEngine(
+            policies=[self.policy],
+            policies_overrides={"value_error": self.policy.with_options(max_time=0)},
+        )
+
+        with self.assertRaises(ValueError):
+            engine.call(func)
+
+    def test_retry_decorator_uses_policies_of_the_owner(self):
+        policy = self.policy
+
+        class Client:
+            retry_policies = {"value_error": policy.with_options(max_time=0)}
+
+            @retry(policy)
+            def get(self):
+                raise ValueError()
+
+        with self.assertRaises(ValueError):
+            Client().get()
+
+        self.assertEqual(self.clock.sleeps, [])
+
+
+class TestGetRetryPolicies(unittest.TestCase):
+    def test_time_budgets_override_default_policies(self):
+        (policy,) = get_retry_policies({THROTTLING_RETRY_POLICY.name: 42})
+
+        self.assertEqual(policy.name, THROTTLING_RETRY_POLICY.name)
+        self.assertEqual(policy.max_time, 42)
+        self.assertEqual(
+            policy.wait_exponential_max, THROTTLING_RETRY_POLICY.wait_exponential_max
+        )
@@ -0,0 +1,101 @@
+import unittest
+from concurrent import futures
+from unittest import mock
+
+from cloudshell.cp.azure.utils.commands_graph import RollbackCommandsGraph
+from cloudshell.cp.azure.utils.rollback import RollbackCommand, RollbackCommandsManager
+
+
+class Command(RollbackCommand):
+    def __init__(self, rollback_manager, cancellation_manager, error=None):
+        super().__init__(
+            rollback_manager=rollback_manager,
+            cancellation_manager=cancellation_manager,
+        )
+        self.error = error
+        self.rollback = mock.MagicMock()
+
+    def _execute(self):
+        if self.error is not None:
+            raise self.error
+
+
+class TestRollbackCommandsManager(unittest.TestCase):
+    def setUp(self):
+        self.logger = mock.MagicMock()
+        self.cancellation_manager = mock.MagicMock()
+
+    def _get_command(self, rollback_manager, error=None):
+        return Command(
+            rollback_manager=rollback_manager,
+            cancellation_manager=self.cancellation_manager,
+            error=error,
+        )
+
+    def test_commands_are_registered_concurrently(self):
+        rollback_manager = RollbackCommandsManager(logger=self.logger)
+
+        with futures.ThreadPoolExecutor(max_workers=10) as executor:
+            commands = list(
+                executor.map(lambda _: self._get_command(rollback_manager), range(100))
+            )
+
+        self.assertCountEqual(rollback_manager.commands, commands)
+
+    def test_executed_commands_are_rolled_back_once_in_reverse_order(self):
+        rollback_order = []
+
+        with self.assertRaises(Exception):
+            with RollbackCommandsManager(logger=self.logger) as rollback_manager:
+                commands = [self._get_command(rollback_manager) for _ in range(3)]
+
+                for number, command in enumerate(commands):
+                    command.rollback.side_effect = (
+                        lambda number=number: rollback_order.append(number)
+                    )
+
+                commands[0].execute()
+                commands[1].execute()
+                raise Exception("failed")
+
+        self.assertEqual(rollback_order, [1, 0])
+
+        for command in commands[:2]:
+            command.rollback.assert_called_once_with()
+
+        commands[2].rollback.assert_not_called()
+
+    def test_rollback_continues_after_failed_rollback(self):
+        with self.assertRaises(Exception):
+            with RollbackCommandsManager(logger=self.logger) as rollback_manager:
+                first_command = self._get_command(rollback_manager)
+                second_command = self._get_command(rollback_manager)
+                first_command.execute()
+                second_command.execute()
+                second_command.rollback.side_effect = Exception("rollback failed")
+                raise Exception("failed")
+
+        first_command.rollback.assert_called_once_with()
+        self.logger.warning.assert_called_once()
+
+    def test_commands_executed_by_graph_are_rolled_back_once(self):
+        error = Exception("failed")
+
+        with self.assertRaises(Exception) as context:
+            with RollbackCommandsManager(logger=self.logger) as rollback_manager:
+                commands = [self._get_command(rollback_manager) for _ in range(10)]
+                failed_command = self._get_command(rollback_manager, error=error)
+                graph = RollbackCommandsGraph(logger=self.logger)
+
+                for number, command in enumerate(commands):
+                    graph.add_node(f"command-{number}", command.execute)
+
+                graph.add_node("failed_command", failed_command.execute)
+                graph.execute()
+
+        self.assertIs(context.exception, error)
+        failed_command.rollback.assert_not_called()
+
+        for command in commands:
+            self.assertTrue(command.executed)
+            command.rollback.assert_called_once_with()
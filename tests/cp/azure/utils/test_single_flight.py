@@ -0,0 +1,120 @@
+import threading
+import time
+import unittest
+
+from cloudshell.cp.azure.utils.single_flight import SingleFlight, single_flight
+
+
+class Owner:
+    def __init__(self, get_resource, credentials_id="credentials"):
+        self.cache_namespace = "subscription-id"
+        self.credentials_id = credentials_id
+        self._get_resource = get_resource
+
+    @single_flight
+    def get_resource(self, name):
+        return self._get_resource(name)
+
+
+class TestSingleFlight(unittest.TestCase):
+    THREADS_COUNT = 10
+
+    def setUp(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+        self.result = object()
+        self.error = None
+
+    def _get_resource(self, name):
+        self.calls.append(name)
+        self.release.wait(timeout=5)
+
+        if self.error is not None:
+            raise self.error
+
+        return self.result
+
+    @staticmethod
+    def _get_coalesced_calls():
+        return (
+            SingleFlight().get_coalesced_calls().get(Owner.get_resource.__qualname__, 0)
+        )
+
+    def _wait_for_coalesced_calls(self, count):
+        deadline = time.monotonic() + 5
+
+        while self._get_coalesced_calls() < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(self._get_coalesced_calls(), count)
+
+    def _call_concurrently(self, owner, name="vnet"):
+        results = []
+        coalesced_calls = self._get_coalesced_calls()
+
+        def call():
+            try:
+                results.append(owner.get_resource(name))
+            except Exception as e:
+                results.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(self.THREADS_COUNT)]
+
+        for thread in threads:
+            thread.start()
+
+        self._wait_for_coalesced_calls(coalesced_calls + self.THREADS_COUNT - 1)
+        self.release.set()
+
+        for thread in threads:
+            thread.join(timeout=5)
+
+        return results
+
+    def test_concurrent_calls_share_result(self):
+        results = self._call_concurrently(Owner(self._get_resource))
+
+        self.assertEqual(self.calls, ["vnet"])
+        self.assertEqual(len(results), self.THREADS_COUNT)
+        self.assertTrue(all(result is self.result for result in results))
+
+    def test_concurrent_calls_share_exception(self):
+        self.error = Exception("failed")
+
+        results = self._call_concurrently(Owner(self._get_resource))
+
+        self.assertEqual(self.calls, ["vnet"])
+        self.assertEqual(len(results), self.THREADS_COUNT)
+        self.assertTrue(all(result is self.error for result in results))
+
+    def test_calls_after_finished_one_are_executed(self):
+        self.release.set()
+        owner = Owner(self._get_resource)
+
+        owner.get_resource("vnet")
+        owner.get_resource("vnet")
+
+        self.assertEqual(self.calls, ["vnet", "vnet"])
+
+    def test_calls_with_different_credentials_are_not_coalesced(self):
+        owner = Owner(self._get_resource)
+        another_owner = Owner(
+            lambda name: self.calls.append(name) or "another result",
+            credentials_id="another credentials",
+        )
+        thread = threading.Thread(target=owner.get_resource, args=("vnet",))
+        thread.start()
+        deadline = time.monotonic() + 5
+
+        # wait until the first call is in progress
+        while not self.calls and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        try:
+            self.assertEqual(another_owner.get_resource("vnet"), "another result")
+        finally:
+            self.release.set()
+            thread.join(timeout=5)
+
+        self.assertEqual(self.calls.count("vnet"), 2)
@@ -0,0 +1,114 @@
+import threading
+import unittest
+from unittest import mock
+
+from cloudshell.cp.azure.utils.singleton_utils import SingletonByArgsMeta
+
+
+class TestSingletonByArgsMeta(unittest.TestCase):
+    def setUp(self):
+        self.now = 0
+        patcher = mock.patch(
+            "cloudshell.cp.azure.utils.singleton_utils.time",
+            monotonic=lambda: self.now,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        class Resource(metaclass=SingletonByArgsMeta):
+            SINGLETON_MAX_INSTANCES = 2
+            SINGLETON_IDLE_TIMEOUT = 60
+
+            def __init__(self, name, region=None):
+                self.name = name
+                self.region = region
+                self.close = mock.MagicMock()
+
+        self.Resource = Resource
+
+    def test_instances_are_shared_by_arguments(self):
+        resource = self.Resource("a", region="eastus")
+
+        self.assertIs(self.Resource("a", region="eastus"), resource)
+        self.assertIsNot(self.Resource("a", region="westus"), resource)
+        self.assertIsNot(self.Resource("b", region="eastus"), resource)
+
+    def test_instances_are_shared_by_custom_key(self):
+        class Client(metaclass=SingletonByArgsMeta):
+            @classmethod
+            def get_singleton_key(cls, subscription_id, logger):
+                return subscription_id
+
+            def __init__(self, subscription_id, logger):
+                self.logger = logger
+
+        client = Client("subscription-id", logger=mock.MagicMock())
+
+        self.assertIs(Client("subscription-id", logger=mock.MagicMock()), client)
+        self.assertIsNot(Client("another-id", logger=mock.MagicMock()), client)
+
+    def test_least_recently_used_instance_is_evicted(self):
+        resource_a = self.Resource("a")
+        resource_b = self.Resource("b")
+        # make "a" the most recently used one
+        self.Resource("a")
+
+        self.Resource("c")
+
+        resource_b.close.assert_called_once_with()
+        resource_a.close.assert_not_called()
+        self.assertIs(self.Resource("a"), resource_a)
+        self.assertIsNot(self.Resource("b"), resource_b)
+
+    def test_idle_instances_are_evicted(self):
+        resource_a = self.Resource("a")
+        self.now = 61
+
+        self.Resource("b")
+
+        resource_a.close.assert_called_once_with()
+        self.assertIsNot(self.Resource("a"), resource_a)
+
+    def test_used_instances_are_not_idle(self):
+        resource_a = self.Resource("a")
+        self.now = 50
+        self.Resource("a")
+        self.now = 100
+
+        self.Resource("b")
+
+        resource_a.close.assert_not_called()
+        self.assertIs(self.Resource("a"), resource_a)
+
+    def test_instances_are_created_once_for_concurrent_calls(self):
+        created = []
+        construction_started = threading.Event()
+        release_construction = threading.Event()
+
+        class SlowResource(metaclass=SingletonByArgsMeta):
+            def __init__(self, name):
+                created.append(name)
+
+                if name == "a":
+                    construction_started.set()
+                    release_construction.wait(timeout=5)
+
+        instances = []
+        threads = [
+            threading.Thread(target=lambda: instances.append(SlowResource("a")))
+            for _ in range(5)
+        ]
+
+        for thread in threads:
+            thread.start()
+
+        construction_started.wait(timeout=5)
+        # instance for another key isn't blocked by the slow construction
+        SlowResource("b")
+        release_construction.set()
+
+        for thread in threads:
+            thread.join(timeout=5)
+
+        self.assertEqual(created, ["a", "b"])
+        self.assertEqual(len({id(instance) for instance in instances}), 1)
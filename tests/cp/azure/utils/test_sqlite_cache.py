@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from cloudshell.cp.azure.utils.cache import MISSING
+from cloudshell.cp.azure.utils.sqlite_cache import SQLiteCache
+
+
+class TestSQLiteCache(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = os.path.join(temp_dir.name, "cache.db")
+        self.cache = SQLiteCache(self.path)
+
+    def test_value_is_kept_between_instances(self):
+        self.cache.put(("subscription-id", "vnet"), {"name": "vnet"}, ttl=60)
+
+        self.assertEqual(
+            SQLiteCache(self.path, max_size=5).get(("subscription-id", "vnet")),
+            {"name": "vnet"},
+        )
+
+    @mock.patch("cloudshell.cp.azure.utils.sqlite_cache.time")
+    def test_expired_value_is_missing(self, time):
+        time.time.return_value = 100
+        self.cache.put(("subscription-id", "vnet"), "value", ttl=10)
+
+        time.time.return_value = 109
+        self.assertEqual(self.cache.get(("subscription-id", "vnet")), "value")
+
+        time.time.return_value = 111
+        self.assertIs(self.cache.get(("subscription-id", "vnet")), MISSING)
+
+    def test_value_of_another_version_is_missing(self):
+        self.cache.put(("subscription-id", "vnet"), "value", ttl=60)
+
+        with mock.patch.object(SQLiteCache, "VERSION", SQLiteCache.VERSION + 1):
+            self.assertIs(self.cache.get(("subscription-id", "vnet")), MISSING)
+
+        self.assertIs(self.cache.get(("subscription-id", "vnet")), MISSING)
+
+    def test_value_that_cant_be_pickled_is_not_cached(self):
+        self.cache.put(("subscription-id", "lock"), lambda: None, ttl=60)
+
+        self.assertIs(self.cache.get(("subscription-id", "lock")), MISSING)
+
+    def test_clear_namespace(self):
+        self.cache.put(("subscription-1", "vnet"), "value-1", ttl=60)
+        self.cache.put(("subscription-2", "vnet"), "value-2", ttl=60)
+
+        self.cache.clear_namespace("subscription-1")
+
+        self.assertIs(self.cache.get(("subscription-1", "vnet")), MISSING)
+        self.assertEqual(self.cache.get(("subscription-2", "vnet")), "value-2")
+
+    @mock.patch("cloudshell.cp.azure.utils.sqlite_cache.time")
+    def test_least_recently_used_values_are_trimmed(self, time):
+        time.time.return_value = 100
+        cache = SQLiteCache(self.path, max_size=2)
+        cache.put(("subscription-id", "key-1"), "value-1", ttl=60)
+
+        time.time.return_value = 101
+        cache.put(("subscription-id", "key-2"), "value-2", ttl=60)
+
+        time.time.return_value = 102
+        cache.get(("subscription-id", "key-1"))
+
+        time.time.return_value = 103
+        cache.put(("subscription-id", "key-3"), "value-3", ttl=60)
+
+        self.assertEqual(cache.get(("subscription-id", "key-1")), "value-1")
+        self.assertIs(cache.get(("subscription-id", "key-2")), MISSING)
+        self.assertEqual(cache.get(("subscription-id", "key-3")), "value-3")
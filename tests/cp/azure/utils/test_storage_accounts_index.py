@@ -0,0 +1,109 @@
+import unittest
+from unittest import mock
+
+from cloudshell.cp.azure.utils import storage_accounts_index
+from cloudshell.cp.azure.utils.storage_accounts_index import StorageAccountsIndex
+
+
+def _get_storage_account(name, resource_group_name):
+    storage_account = mock.MagicMock(
+        id=(
+            f"/subscriptions/subscription-id/resourceGroups/{resource_group_name}"
+            f"/providers/Microsoft.Storage/storageAccounts/{name}"
+        )
+    )
+    storage_account.name = name
+    return storage_account
+
+
+class FakeAzureAPIClient:
+    storage_accounts = []
+    instances = []
+
+    def __init__(self, logger, **settings):
+        self.logger = logger
+        self.settings = settings
+        self.list_storage_accounts = mock.MagicMock(
+            side_effect=lambda: iter(self.storage_accounts)
+        )
+        self.instances.append(self)
+
+    def get_settings(self):
+        return self.settings
+
+
+class TestStorageAccountsIndex(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(StorageAccountsIndex, "_start_refresh_thread")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        FakeAzureAPIClient.storage_accounts = [
+            _get_storage_account("account1", "rg-1"),
+            _get_storage_account("account2", "rg-2"),
+            _get_storage_account("account3", "rg-3"),
+        ]
+        FakeAzureAPIClient.instances = []
+        self.caller_client = FakeAzureAPIClient(
+            logger=mock.MagicMock(), azure_application_key="key-1"
+        )
+        self.index = StorageAccountsIndex("subscription-id", self.id())
+
+    def test_accounts_are_listed_with_own_client(self):
+        resource_group_name = self.index.get_resource_group_name(
+            "account2", azure_client=self.caller_client
+        )
+
+        self.assertEqual(resource_group_name, "rg-2")
+        self.caller_client.list_storage_accounts.assert_not_called()
+        index_client = FakeAzureAPIClient.instances[-1]
+        self.assertIsNot(index_client, self.caller_client)
+        self.assertIs(index_client.logger, storage_accounts_index.logger)
+        self.assertEqual(index_client.settings, {"azure_application_key": "key-1"})
+
+    def test_client_is_recreated_when_settings_are_changed(self):
+        self.index.get_resource_group_name("account1", azure_client=self.caller_client)
+        self.index.discard("account1")
+        another_client = FakeAzureAPIClient(
+            logger=mock.MagicMock(), azure_application_key="key-2"
+        )
+
+        self.index.get_resource_group_name("account1", azure_client=another_client)
+
+        self.assertEqual(
+            FakeAzureAPIClient.instances[-1].settings,
+            {"azure_application_key": "key-2"},
+        )
+
+    def test_scan_stops_when_account_is_found(self):
+        self.index.get_resource_group_name("ACCOUNT1", azure_client=self.caller_client)
+        index_client = FakeAzureAPIClient.instances[-1]
+
+        self.assertEqual(
+            self.index.get_resource_group_name(
+                "account3", azure_client=self.caller_client
+            ),
+            "rg-3",
+        )
+        # the second lookup continued the scan started by the first one
+        index_client.list_storage_accounts.assert_called_once_with()
+
+    def test_missing_account_after_recent_full_scan(self):
+        self.assertIsNone(
+            self.index.get_resource_group_name(
+                "account4", azure_client=self.caller_client
+            )
+        )
+        self.assertIsNone(
+            self.index.get_resource_group_name(
+                "account4", azure_client=self.caller_client
+            )
+        )
+
+        FakeAzureAPIClient.instances[-1].list_storage_accounts.assert_called_once_with()
+
+    def test_indexes_are_kept_per_subscription_and_credentials(self):
+        self.assertIs(StorageAccountsIndex("subscription-id", self.id()), self.index)
+        self.assertIsNot(
+            StorageAccountsIndex("subscription-id", "another-credentials"),
+            self.index,
+        )
@@ -0,0 +1,98 @@
+import unittest
+from unittest import mock
+
+from cloudshell.cp.azure.utils.vnet_address_index import (
+    VirtualNetworkAddressIndex,
+    VirtualNetworkAddressIndexCache,
+)
+
+
+def _get_subnet(name, address_prefix=None, address_prefixes=None):
+    subnet = mock.MagicMock(
+        address_prefix=address_prefix, address_prefixes=address_prefixes
+    )
+    subnet.name = name
+    return subnet
+
+
+class TestVirtualNetworkAddressIndex(unittest.TestCase):
+    def setUp(self):
+        self.subnet_1 = _get_subnet("rg-1_10.0.1.0-24", "10.0.1.0/24")
+        self.subnet_2 = _get_subnet("rg-1_10.0.2.0-24", "10.0.2.0/24")
+        self.subnet_3 = _get_subnet("RG-2_10.0.4.0-22", "10.0.4.0/22")
+        self.index = VirtualNetworkAddressIndex(
+            [self.subnet_3, self.subnet_1, self.subnet_2]
+        )
+
+    def test_find_overlapping(self):
+        self.assertEqual(
+            self.index.find_overlapping("10.0.0.0/22"), [self.subnet_2, self.subnet_1]
+        )
+        self.assertEqual(self.index.find_overlapping("10.0.5.0/24"), [self.subnet_3])
+
+    def test_find_overlapping_on_range_edges(self):
+        self.assertEqual(self.index.find_overlapping("10.0.1.255/32"), [self.subnet_1])
+        self.assertEqual(self.index.find_overlapping("10.0.2.0/32"), [self.subnet_2])
+        self.assertEqual(self.index.find_overlapping("10.0.7.255/32"), [self.subnet_3])
+
+    def test_adjacent_ranges_do_not_overlap(self):
+        self.assertEqual(self.index.find_overlapping("10.0.0.0/24"), [])
+        self.assertEqual(self.index.find_overlapping("10.0.3.0/24"), [])
+        self.assertEqual(self.index.find_overlapping("10.0.8.0/24"), [])
+
+    def test_find_containing(self):
+        self.assertIs(self.index.find_containing("10.0.4.128/25"), self.subnet_3)
+        self.assertIs(self.index.find_containing("10.0.2.0/24"), self.subnet_2)
+        self.assertIsNone(self.index.find_containing("10.0.2.0/23"))
+        self.assertIsNone(self.index.find_containing("10.0.3.0/24"))
+
+    def test_subnet_with_multiple_prefixes(self):
+        subnet = _get_subnet("subnet", address_prefixes=["10.1.0.0/24", "10.1.8.0/24"])
+        index = VirtualNetworkAddressIndex([subnet, self.subnet_1])
+
+        self.assertEqual(index.find_overlapping("10.1.8.128/25"), [subnet])
+        self.assertEqual(index.find_overlapping("10.1.0.0/20"), [subnet])
+        self.assertEqual(index.find_overlapping("10.1.4.0/24"), [])
+        self.assertIs(index.find_containing("10.1.0.0/25"), subnet)
+        self.assertIsNone(index.find_containing("10.1.0.0/20"))
+
+    def test_get_reservation_subnets(self):
+        self.assertEqual(
+            self.index.get_reservation_subnets("RG-1"), [self.subnet_1, self.subnet_2]
+        )
+        self.assertEqual(self.index.get_reservation_subnets("rg-2"), [self.subnet_3])
+
+    def test_reservation_prefix_must_match_whole_name(self):
+        self.assertEqual(self.index.get_reservation_subnets("rg"), [])
+        self.assertEqual(self.index.get_reservation_subnets("rg-1_10.0.1.0"), [])
+
+    def test_empty_vnet(self):
+        index = VirtualNetworkAddressIndex(None)
+
+        self.assertEqual(index.find_overlapping("10.0.0.0/8"), [])
+        self.assertIsNone(index.find_containing("10.0.0.0/24"))
+
+
+class TestVirtualNetworkAddressIndexCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = VirtualNetworkAddressIndexCache()
+        self.cache.clear()
+        self.vnet = mock.MagicMock(
+            id="/VNET-ID", etag="1", subnets=[_get_subnet("s", "10.0.0.0/24")]
+        )
+
+    def test_index_is_cached_by_etag(self):
+        index = self.cache.get_index(self.vnet)
+
+        self.assertIs(self.cache.get_index(self.vnet), index)
+
+        self.vnet.etag = "2"
+
+        self.assertIsNot(self.cache.get_index(self.vnet), index)
+
+    def test_index_is_not_cached_without_etag(self):
+        self.vnet.etag = None
+
+        self.assertIsNot(
+            self.cache.get_index(self.vnet), self.cache.get_index(self.vnet)
+        )
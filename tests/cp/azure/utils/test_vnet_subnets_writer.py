@@ -0,0 +1,198 @@
+import unittest
+from unittest import mock
+
+import requests
+from msrestazure.azure_exceptions import CloudError
+
+from cloudshell.cp.azure.utils.coalescing_writer import FailedWrite
+from cloudshell.cp.azure.utils.vnet_subnets_writer import (
+    SubnetOperation,
+    VirtualNetworkSubnetsWriter,
+)
+
+
+def _get_cloud_error(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = b""
+    return CloudError(response)
+
+
+def _get_subnet(name, address_prefix):
+    subnet = mock.MagicMock(address_prefix=address_prefix, address_prefixes=None)
+    subnet.name = name
+    return subnet
+
+
+class TestVirtualNetworkSubnetsWriter(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch(
+            "cloudshell.cp.azure.utils.retrying.time", monotonic=lambda: 0
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.stale_subnet = _get_subnet("old-rg_10.0.1.0-24", "10.0.1.0/24")
+        self.vnet = mock.MagicMock(id=None, etag="etag-1", subnets=[self.stale_subnet])
+        self.vnet.name = self.id()
+        self.network_actions = self._get_network_actions()
+        self.writer = VirtualNetworkSubnetsWriter()
+        self.logger = mock.MagicMock()
+
+    def _get_network_actions(self):
+        network_actions = mock.MagicMock(
+            subscription_id="subscription-id", credentials_id=("credentials",)
+        )
+        network_actions.get_sandbox_virtual_network.return_value = self.vnet
+        network_actions.update_virtual_network.side_effect = (
+            lambda vnet, resource_group_name, etag: vnet
+        )
+        return network_actions
+
+    def _write_subnets(self, subnets, **kwargs):
+        return self.writer.write_subnets(
+            network_actions=self.network_actions,
+            vnet_name=self.vnet.name,
+            resource_group_name="mgmt-rg",
+            subnets=subnets,
+            logger=self.logger,
+            **kwargs,
+        )
+
+    def _get_written_subnets(self):
+        return self.network_actions.update_virtual_network.call_args[1]["vnet"].subnets
+
+    def test_written_subnets_are_returned_in_requested_order(self):
+        subnet_1 = _get_subnet("rg_10.0.2.0-24", "10.0.2.0/24")
+        subnet_2 = _get_subnet("rg_10.0.3.0-24", "10.0.3.0/24")
+
+        self.assertEqual(
+            self._write_subnets([subnet_2, subnet_1]), [subnet_2, subnet_1]
+        )
+        self.network_actions.update_virtual_network.assert_called_once_with(
+            vnet=mock.ANY, resource_group_name="mgmt-rg", etag="etag-1"
+        )
+        self.assertCountEqual(
+            self._get_written_subnets(), [self.stale_subnet, subnet_1, subnet_2]
+        )
+
+    def test_cached_vnet_is_not_changed(self):
+        self._write_subnets([_get_subnet("rg_10.0.2.0-24", "10.0.2.0/24")])
+
+        self.assertEqual(self.vnet.subnets, [self.stale_subnet])
+
+    def test_update_is_retried_on_etag_mismatch(self):
+        subnet = _get_subnet("rg_10.0.2.0-24", "10.0.2.0/24")
+        self.network_actions.update_virtual_network.side_effect = [
+            _get_cloud_error(412),
+            mock.DEFAULT,
+        ]
+        self.network_actions.update_virtual_network.return_value = mock.MagicMock(
+            subnets=[subnet]
+        )
+
+        self.assertEqual(self._write_subnets([subnet]), [subnet])
+        self.assertEqual(self.network_actions.update_virtual_network.call_count, 2)
+        self.assertEqual(
+            self.network_actions.get_sandbox_virtual_network.call_args_list,
+            [
+                mock.call(
+                    resource_group_name="mgmt-rg",
+                    sandbox_vnet_name=self.vnet.name,
+                    fresh=True,
+                )
+            ]
+            * 2,
+        )
+
+    def test_overlapping_subnets_are_replaced(self):
+        subnet = _get_subnet("rg_10.0.0.0-16", "10.0.0.0/16")
+
+        self._write_subnets([subnet])
+
+        self.assertEqual(self._get_written_subnets(), [subnet])
+
+    def test_overlapping_subnets_are_kept(self):
+        subnet = _get_subnet("rg_10.0.0.0-16", "10.0.0.0/16")
+
+        self._write_subnets([subnet], replace_overlapping=False)
+
+        self.assertEqual(self._get_written_subnets(), [self.stale_subnet, subnet])
+
+    def test_delete_subnets(self):
+        self.writer.delete_subnets(
+            network_actions=self.network_actions,
+            vnet_name=self.vnet.name,
+            resource_group_name="mgmt-rg",
+            subnet_names=["OLD-RG_10.0.1.0-24", "missing-subnet"],
+            logger=self.logger,
+        )
+
+        self.assertEqual(self._get_written_subnets(), [])
+
+    def test_unchanged_vnet_is_not_updated(self):
+        self.writer.delete_subnets(
+            network_actions=self.network_actions,
+            vnet_name=self.vnet.name,
+            resource_group_name="mgmt-rg",
+            subnet_names=["missing-subnet"],
+            logger=self.logger,
+        )
+
+        self.network_actions.update_virtual_network.assert_not_called()
+
+    def test_merged_requests_are_written_one_by_one_after_failure(self):
+        good_subnet = _get_subnet("rg-1_10.0.2.0-24", "10.0.2.0/24")
+        bad_subnet = _get_subnet("rg-2_10.0.3.0-24", "10.0.3.0/24")
+        another_subnet = _get_subnet("rg-3_10.0.4.0-24", "10.0.4.0/24")
+        error = _get_cloud_error(400)
+
+        def update_virtual_network(vnet, resource_group_name, etag):
+            if bad_subnet in vnet.subnets:
+                raise error
+            return vnet
+
+        requests_kwargs = []
+
+        for _ in range(3):
+            network_actions = self._get_network_actions()
+            network_actions.update_virtual_network.side_effect = update_virtual_network
+            requests_kwargs.append(
+                {
+                    "network_actions": network_actions,
+                    "vnet_name": self.vnet.name,
+                    "resource_group_name": "mgmt-rg",
+                    "logger": mock.MagicMock(),
+                }
+            )
+
+        results = self.writer._write(
+            key=None,
+            requests_items=[
+                [SubnetOperation(subnet_name=good_subnet.name, subnet=good_subnet)],
+                [SubnetOperation(subnet_name=bad_subnet.name, subnet=bad_subnet)],
+                [
+                    SubnetOperation(
+                        subnet_name=another_subnet.name, subnet=another_subnet
+                    )
+                ],
+            ],
+            requests_kwargs=requests_kwargs,
+        )
+
+        self.assertEqual(
+            results, [[good_subnet], FailedWrite(exception=error), [another_subnet]]
+        )
+        requests_kwargs[0]["logger"].warning.assert_called_once()
+
+        # each request is written with its own network actions
+        for kwargs in requests_kwargs:
+            self.assertIn(
+                mock.call(vnet=mock.ANY, resource_group_name="mgmt-rg", etag="etag-1"),
+                kwargs["network_actions"].update_virtual_network.call_args_list,
+            )
+
+    def test_single_request_error_is_raised(self):
+        self.network_actions.update_virtual_network.side_effect = _get_cloud_error(400)
+
+        with self.assertRaises(CloudError):
+            self._write_subnets([_get_subnet("rg_10.0.2.0-24", "10.0.2.0/24")])